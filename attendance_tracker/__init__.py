@@ -1,11 +1,48 @@
-from .cli import (
-    initialize_db, add_student, list_students, mark_attendance,
-    view_attendance, mark_all_present, export_to_csv,
-    view_database_tables, check_database
+# Commands are imported on first use so that "import attendance_tracker"
+# and the batch CLI do not pay for SQLAlchemy until they need it.
+_CLI_COMMANDS = (
+    "initialize_db", "add_student", "list_students", "mark_attendance",
+    "view_attendance", "mark_all_present", "export_to_csv",
+    "view_database_tables", "check_database", "import_students",
+    "show_statistics",
 )
 
-def main():
-    """Main function to run the attendance tracker."""
+
+def __getattr__(name):
+    if name in _CLI_COMMANDS:
+        from . import cli
+        return getattr(cli, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(profile=False):
+    """Main function to run the attendance tracker.
+
+    With profile true, a query summary is printed after every command.
+    """
+    from .cli import (
+        initialize_db, add_student, list_students, mark_attendance,
+        view_attendance, mark_all_present, export_to_csv,
+        view_database_tables, check_database, import_students,
+        show_statistics
+    )
+    from .profiling import enable, track
+    
+    commands = {
+        '1': add_student,
+        '2': mark_attendance,
+        '3': view_attendance,
+        '4': list_students,
+        '5': check_database,
+        '6': mark_all_present,
+        '7': export_to_csv,
+        '8': view_database_tables,
+        '10': import_students,
+        '11': show_statistics,
+    }
+    
+    if profile:
+        enable()
     initialize_db()
     print("Welcome to the Class Attendance Tracker!")
     
@@ -20,28 +57,18 @@ def main():
         print("7. Export to CSV")
         print("8. View Database Tables")
         print("9. Exit")
+        print("10. Import Students from CSV")
+        print("11. Attendance Statistics")
         
-        choice = input("Enter your choice (1-9): ")
+        choice = input("Enter your choice (1-11): ")
         
-        if choice == '1':
-            add_student()
-        elif choice == '2':
-            mark_attendance()
-        elif choice == '3':
-            view_attendance()
-        elif choice == '4':
-            list_students()
-        elif choice == '5':
-            check_database()
-        elif choice == '6':
-            mark_all_present()
-        elif choice == '7':
-            export_to_csv()
-        elif choice == '8':
-            view_database_tables()
-        elif choice == '9':
+        if choice == '9':
             print("Goodbye!")
             break
+        elif choice in commands:
+            command = commands[choice]
+            with track(command.__name__):
+                command()
         else:
             print("Invalid choice. Try again.")
         
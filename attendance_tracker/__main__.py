@@ -0,0 +1,9 @@
+import sys
+
+from . import main
+from .cli.batch import run
+
+# "--profile" on its own starts the interactive menu with profiling on
+if sys.argv[1:] and sys.argv[1:] != ["--profile"]:
+    sys.exit(run())
+main(profile="--profile" in sys.argv)
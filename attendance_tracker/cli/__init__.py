@@ -1,5 +1,15 @@
-from .commands import (
-    initialize_db, add_student, list_students, mark_attendance,
-    view_attendance, mark_all_present, export_to_csv,
-    view_database_tables, check_database
-)
\ No newline at end of file
+# The interactive commands pull in the ORM, so they are only imported when
+# one is first used; "from attendance_tracker.cli import batch" stays cheap.
+_COMMANDS = (
+    "initialize_db", "add_student", "list_students", "mark_attendance",
+    "view_attendance", "mark_all_present", "export_to_csv",
+    "view_database_tables", "check_database", "import_students",
+    "show_statistics",
+)
+
+
+def __getattr__(name):
+    if name in _COMMANDS:
+        from . import commands
+        return getattr(commands, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,501 @@
+"""Non-interactive command line for scripted and high-volume use.
+
+Examples:
+    python -m attendance_tracker mark --date 2025-05-30 --status absent --ids 4,17
+    python -m attendance_tracker mark --records-file marks.csv
+    python -m attendance_tracker mark-all --date 2025-05-30 --absent-file absent.txt
+    python -m attendance_tracker import roster.csv
+    python -m attendance_tracker export --output - --gzip > attendance.csv.gz
+    python -m attendance_tracker export --format columnar --output attendance.atc
+    python -m attendance_tracker export --changes --consumer warehouse --output delta.csv
+    python -m attendance_tracker find "jo sm"
+    python -m attendance_tracker stats --month 2025-05
+    python -m attendance_tracker at-risk --absent 3 --of 10 --below 0.9
+    python -m attendance_tracker report --output-dir nightly --by month --workers 8
+    python -m attendance_tracker serve --port 8000 --workers 8
+    python -m attendance_tracker --profile stats
+
+Every command runs in a single transaction. For mark and mark-all, any
+invalid input line means nothing is written and the exit status is 1;
+import skips invalid rows, reports them and exits with status 1. A CSV
+export with no records writes no file and exits with status 1.
+"""
+import argparse
+import contextlib
+import csv
+import math
+import sys
+
+from ..utils import (
+    validate_date, validate_month, format_date, parse_id_list, STATUS_CODES
+)
+
+# Modules that need SQLAlchemy are imported inside each command, so
+# --help and argument errors return without loading the ORM.
+
+CHUNK_SIZE = 5000
+MAX_ERRORS_SHOWN = 20
+
+
+class BatchInputError(Exception):
+    """Raised for an invalid line in a batch input file."""
+
+
+def _open_text(path):
+    """Open a text file for reading, or wrap stdin for "-"."""
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, newline="", encoding="utf-8")
+
+
+def _read_ids(ids_arg, ids_file):
+    """Collect student IDs from a comma-separated argument and/or a file."""
+    ids = set()
+    sources = [("--ids", ids_arg)] if ids_arg else []
+    if ids_file:
+        with _open_text(ids_file) as f:
+            sources.extend((f"{ids_file}:{num}", line) for num, line in enumerate(f, 1))
+    for where, text in sources:
+        parsed, error = parse_id_list(text)
+        if error:
+            raise BatchInputError(f"{where}: {error}")
+        ids |= parsed
+    return ids
+
+
+def _parse_date(date_str):
+    """Validate a date argument, defaulting to today."""
+    date_obj, error = validate_date(date_str or "")
+    if error:
+        raise BatchInputError(error)
+    return format_date(date_obj)
+
+
+def _iter_record_file(path, errors):
+    """Yield (where, student_id, date, status) from a student_id,date,status CSV.
+
+    Malformed lines are noted in errors and skipped.
+    """
+    with _open_text(path) as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if not row or not "".join(row).strip():
+                continue
+            if reader.line_num == 1 and not row[0].strip().isdigit():
+                continue  # header
+            where = f"{path}:{reader.line_num}"
+            if len(row) != 3:
+                errors.append(f"{where}: expected student_id,date,status")
+                continue
+            student_id, date_str, status = (cell.strip() for cell in row)
+            if not student_id.isdigit():
+                errors.append(f"{where}: invalid student ID '{student_id}'")
+                continue
+            date_obj, error = validate_date(date_str, allow_empty=False)
+            if error:
+                errors.append(f"{where}: {error}")
+                continue
+            yield where, int(student_id), format_date(date_obj), status.lower()
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _check_records(records, known_ids, errors):
+    """Drop records with an unknown student or status, noting each one."""
+    valid = []
+    for where, student_id, date_str, status in records:
+        if student_id not in known_ids:
+            errors.append(f"{where}: student ID {student_id} not found")
+        elif status not in STATUS_CODES:
+            errors.append(f"{where}: invalid status '{status}'")
+        else:
+            valid.append((student_id, date_str, status))
+    return valid
+
+
+def _report_errors(errors):
+    for error in errors[:MAX_ERRORS_SHOWN]:
+        print(error, file=sys.stderr)
+    if len(errors) > MAX_ERRORS_SHOWN:
+        print(f"... and {len(errors) - MAX_ERRORS_SHOWN} more errors", file=sys.stderr)
+    print("Nothing was written.", file=sys.stderr)
+    return 1
+
+
+def cmd_mark(args):
+    """Mark attendance for listed students, or for every record in a file."""
+    from ..models import Session, begin_write
+    from ..roster import roster_cache
+    from ..storage import attendance_backend
+
+    if args.records_file and (args.ids or args.ids_file):
+        raise BatchInputError("use either --records-file or --ids/--ids-file, not both")
+
+    errors = []
+    if args.records_file:
+        records = _iter_record_file(args.records_file, errors)
+    else:
+        ids = _read_ids(args.ids, args.ids_file)
+        if not ids:
+            raise BatchInputError("no student IDs given; use --ids, --ids-file or --records-file")
+        date_str = _parse_date(args.date)
+        records = (("--ids", student_id, date_str, args.status) for student_id in sorted(ids))
+
+    known_ids = roster_cache.names()
+    mark_records = attendance_backend().mark_records
+    marked = skipped = 0
+
+    # Input may be a stream that cannot be read twice, so this transaction
+    # is not retried; BEGIN IMMEDIATE waits for other writers up front.
+    session = begin_write(Session())
+    try:
+        for chunk in _chunks(records, CHUNK_SIZE):
+            valid = _check_records(chunk, known_ids, errors)
+            if errors:
+                continue  # keep validating so every problem is reported at once
+            chunk_marked, chunk_skipped = mark_records(session, valid, args.overwrite)
+            marked += chunk_marked
+            skipped += chunk_skipped
+        if errors:
+            session.rollback()
+            return _report_errors(errors)
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    print(f"Marked {marked} records, skipped {skipped} already recorded.")
+    return 0
+
+
+def cmd_mark_all(args):
+    """Mark every student for one date, with optional absentees."""
+    from ..marking import mark_date
+    from ..models import run_write
+    from ..roster import roster_cache
+
+    date_str = _parse_date(args.date)
+    absent_ids = _read_ids(args.absent, args.absent_file)
+
+    unknown_ids = sorted(absent_ids - roster_cache.names().keys())
+    if unknown_ids:
+        return _report_errors([f"absent student ID {sid} not found" for sid in unknown_ids])
+    marked, skipped, _ = run_write(
+        lambda session: mark_date(session, date_str, absent_ids, overwrite=args.overwrite)
+    )
+
+    print(f"Marked {marked} students for {date_str} ({len(absent_ids)} absent), "
+          f"skipped {skipped} already recorded.")
+    return 0
+
+
+def cmd_import(args):
+    """Import a roster CSV file."""
+    from ..transfer import import_roster
+
+    summary = import_roster(args.file)
+    for line_num, name, error in summary["invalid"][:MAX_ERRORS_SHOWN]:
+        print(f"{args.file}:{line_num}: '{name}' - {error}", file=sys.stderr)
+    print(f"Imported {summary['imported']} students from {summary['rows']} rows; "
+          f"{len(summary['duplicates'])} duplicates, {len(summary['invalid'])} invalid.")
+    return 1 if summary["invalid"] else 0
+
+
+def cmd_find(args):
+    """Print students matching a name search as id,name CSV lines."""
+    from ..models import Session
+    from ..search import search_students, fuzzy_search_students
+
+    session = Session()
+    try:
+        matches = search_students(session, args.query, args.limit)
+        if not matches and not args.exact:
+            matches = fuzzy_search_students(session, args.query, args.limit)
+    finally:
+        session.close()
+
+    writer = csv.writer(sys.stdout)
+    for student_id, name in matches:
+        writer.writerow((student_id, name))
+    return 0 if matches else 1
+
+
+def cmd_export(args):
+    """Export attendance to CSV or the columnar binary format."""
+    from ..transfer import export_attendance, export_columnar
+
+    if args.changes:
+        return _export_changes(args)
+    if args.consumer or args.since is not None or args.prune:
+        raise BatchInputError("--consumer, --since and --prune need --changes")
+    if args.format == "columnar":
+        if args.output == "-" or args.gzip:
+            raise BatchInputError("columnar export needs a file path and cannot be gzipped")
+        count = export_columnar(args.output)
+    else:
+        count = export_attendance(args.output, compress=args.gzip or None)
+        if not count:
+            # export_attendance creates no file when there are no records
+            if args.output == "-":
+                print("No attendance records to export.", file=sys.stderr)
+            else:
+                print(f"No attendance records to export; {args.output} was not written.")
+            return 1
+    if args.output != "-":
+        print(f"Exported {count} attendance records to {args.output}")
+    return 0
+
+
+def _export_changes(args):
+    """Export the records changed since the consumer's watermark."""
+    from ..models import run_write
+    from ..transfer import export_changes, prune_changes
+    from ..transfer.incremental import DEFAULT_CONSUMER
+
+    if args.format == "columnar":
+        raise BatchInputError("--changes writes CSV only")
+    try:
+        result = export_changes(args.output, args.consumer or DEFAULT_CONSUMER,
+                                args.since, compress=args.gzip or None)
+    except ValueError as e:
+        raise BatchInputError(str(e)) from None
+
+    if args.output != "-":
+        if result["full"]:
+            print(f"Exported {result['rows']} records (full snapshot) to {args.output}; "
+                  f"watermark is now {result['until']}")
+        elif result["until"] > result["since"]:
+            print(f"Exported {result['rows']} records changed in {result['since'] + 1}-{result['until']} "
+                  f"to {args.output}; watermark is now {result['until']}")
+        else:
+            print(f"No changes since {result['since']}; nothing written.")
+    if args.prune:
+        pruned = run_write(prune_changes)
+        print(f"Pruned {pruned} change log entries.", file=sys.stderr if args.output == "-" else sys.stdout)
+    return 0
+
+
+def cmd_stats(args):
+    """Print monthly totals and the lowest attendance rates."""
+    from ..models import Session
+    from ..reports import student_rates, monthly_totals
+
+    month = None
+    if args.month:
+        month, error = validate_month(args.month)
+        if error:
+            raise BatchInputError(error)
+
+    session = Session()
+    try:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(("month", "present", "absent", "rate"))
+        for row_month, present, absent, rate in monthly_totals(session, month, month):
+            writer.writerow((row_month, present, absent, f"{rate:.4f}"))
+        if args.lowest:
+            writer.writerow(())
+            writer.writerow(("student_id", "name", "present", "absent", "rate"))
+            for student_id, name, present, absent, rate in student_rates(session, month, month, args.lowest):
+                if rate is not None:
+                    writer.writerow((student_id, name, present, absent, f"{rate:.4f}"))
+    finally:
+        session.close()
+    return 0
+
+
+def cmd_at_risk(args):
+    """List students with recent absences or a low rate, using the NumPy matrix."""
+    from ..models import Session
+    from ..reports import load_matrix
+    from ..roster import roster_cache
+
+    if args.absent < 1 or args.of < args.absent:
+        raise BatchInputError("--of must be at least --absent, and --absent at least 1")
+
+    session = Session()
+    try:
+        matrix = load_matrix(session)
+    finally:
+        session.close()
+
+    flagged = set(matrix.absent_in_last(args.absent, args.of).tolist())
+    if args.below is not None:
+        flagged |= set(matrix.below_rate(args.below).tolist())
+
+    names = roster_cache.names()
+    rates = matrix.rates()
+    streaks = matrix.longest_streak("absent")
+    recent = matrix.mask("absent")[:, -args.of:].sum(axis=1)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(("student_id", "name", "rate", f"absent_last_{args.of}", "longest_absence"))
+    for row in matrix.rows_for(sorted(flagged)):
+        student_id = int(matrix.student_ids[row])
+        rate = "" if math.isnan(rates[row]) else f"{rates[row]:.4f}"
+        writer.writerow((student_id, names.get(student_id, ""), rate, int(recent[row]), int(streaks[row])))
+    return 0
+
+
+def cmd_report(args):
+    """Write the attendance export and summary with parallel workers."""
+    from ..models import Session
+    from ..reports import run_reports
+
+    session = Session()
+    try:
+        result = run_reports(session, args.output_dir, args.by, args.workers, args.partitions)
+    except ValueError as e:
+        raise BatchInputError(str(e)) from None
+    finally:
+        session.close()
+
+    print(f"Wrote {result['rows']} rows from {result['partitions']} partitions with "
+          f"{result['workers']} workers in {result['elapsed']:.2f}s: "
+          f"{result['export']}, {result['summary']}")
+    return 0
+
+
+def cmd_serve(args):
+    """Run the JSON HTTP API."""
+    from ..server import serve
+
+    if args.batch_size < 1 or args.batch_ms < 0:
+        raise BatchInputError("--batch-size must be at least 1 and --batch-ms not negative")
+    if args.idle_timeout <= 0:
+        raise BatchInputError("--idle-timeout must be positive")
+    serve(args.host, args.port, args.workers, args.quiet,
+          args.group_commit, args.batch_size, args.batch_ms / 1000, args.idle_timeout)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m attendance_tracker",
+        description="Run attendance tracker commands without prompts. "
+                    "Run without arguments for the interactive menu.",
+    )
+    parser.add_argument("--profile", action="store_true",
+                        help="print query counts and timings to stderr after the command")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    mark = subparsers.add_parser("mark", help="mark attendance for listed students or from a records file")
+    mark.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    mark.add_argument("--status", choices=sorted(STATUS_CODES), default="present")
+    mark.add_argument("--ids", help="comma-separated student IDs")
+    mark.add_argument("--ids-file", help="file of student IDs, one or more per line ('-' for stdin)")
+    mark.add_argument("--records-file",
+                      help="CSV of student_id,date,status lines ('-' for stdin); ignores --date/--status")
+    mark.add_argument("--overwrite", action="store_true", help="replace existing records")
+    mark.set_defaults(func=cmd_mark)
+
+    mark_all_parser = subparsers.add_parser("mark-all", help="mark every student for one date")
+    mark_all_parser.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    mark_all_parser.add_argument("--absent", help="comma-separated IDs of absent students")
+    mark_all_parser.add_argument("--absent-file", help="file of absent student IDs ('-' for stdin)")
+    mark_all_parser.add_argument("--overwrite", action="store_true", help="replace existing records")
+    mark_all_parser.set_defaults(func=cmd_mark_all)
+
+    import_parser = subparsers.add_parser("import", help="import students from a roster CSV")
+    import_parser.add_argument("file", help="roster CSV file ('-' for stdin)")
+    import_parser.set_defaults(func=cmd_import)
+
+    find = subparsers.add_parser("find", help="look students up by name (exit status 1 if none match)")
+    find.add_argument("query", help="name or the starts of its words, e.g. 'jo sm'")
+    find.add_argument("--limit", type=int, default=10, help="most matches to print (default: 10)")
+    find.add_argument("--exact", action="store_true", help="no fuzzy matches when nothing starts with the query")
+    find.set_defaults(func=cmd_find)
+
+    export = subparsers.add_parser("export", help="export attendance as CSV or columnar binary")
+    export.add_argument("--output", "-o", default="attendance_export.csv",
+                        help="output path ('-' for stdout, default: attendance_export.csv)")
+    export.add_argument("--format", choices=("csv", "columnar"), default="csv",
+                        help="csv, or columnar for the mmap-friendly binary format "
+                             "read by attendance_tracker.transfer.columnar_reader")
+    export.add_argument("--gzip", action="store_true", help="gzip the output")
+    export.add_argument("--changes", action="store_true",
+                        help="only records changed since the consumer's last --changes export "
+                             "(a full snapshot the first time); deletions have status 'deleted'")
+    export.add_argument("--consumer", help="name of the watermark to read and advance (default: default)")
+    export.add_argument("--since", type=int, help="change sequence number to start after, "
+                                                  "instead of the stored watermark")
+    export.add_argument("--prune", action="store_true",
+                        help="afterwards, delete change log entries every consumer has exported")
+    export.set_defaults(func=cmd_export)
+
+    stats = subparsers.add_parser("stats", help="print attendance statistics as CSV")
+    stats.add_argument("--month", help="YYYY-MM (default: all time)")
+    stats.add_argument("--lowest", type=int, default=10,
+                       help="also list the N students with the lowest rates (default: 10, 0 to skip)")
+    stats.set_defaults(func=cmd_stats)
+
+    at_risk = subparsers.add_parser("at-risk",
+                                    help="list students absent N of the last M days (needs NumPy)")
+    at_risk.add_argument("--absent", type=int, default=3, help="absences that flag a student (default: 3)")
+    at_risk.add_argument("--of", type=int, default=10, help="recorded days to look back over (default: 10)")
+    at_risk.add_argument("--below", type=float, help="also flag students with an overall rate below this, e.g. 0.9")
+    at_risk.set_defaults(func=cmd_at_risk)
+
+    report = subparsers.add_parser("report", help="write attendance.csv and summary.csv using a process pool")
+    report.add_argument("--output-dir", default="reports", help="directory for the files (default: reports)")
+    report.add_argument("--by", choices=("students", "month", "shard"),
+                        help="how to split the work (default: shard with storage = sharded, "
+                             "otherwise students)")
+    report.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    report.add_argument("--partitions", type=int,
+                        help="student ID ranges with --by students (default: 4 per worker)")
+    report.set_defaults(func=cmd_report)
+
+    serve_parser = subparsers.add_parser("serve", help="run the JSON HTTP API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=8, help="request threads (default: 8)")
+    serve_parser.add_argument("--quiet", action="store_true", help="do not log each request")
+    serve_parser.add_argument("--idle-timeout", type=float, default=5,
+                              help="seconds a kept-alive connection may stay idle (default: 5)")
+    serve_parser.add_argument("--group-commit", action="store_true",
+                              help="commit POST /attendance marks in batches instead of one by one")
+    serve_parser.add_argument("--batch-size", type=int, default=500,
+                              help="with --group-commit, marks per batch (default: 500)")
+    serve_parser.add_argument("--batch-ms", type=float, default=0,
+                              help="with --group-commit, how long a partial batch may wait for more "
+                                   "marks (default: 0, write as soon as the last batch is committed)")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def run(argv=None):
+    """Parse arguments, run one command and return the exit status."""
+    args = build_parser().parse_args(argv)
+
+    from ..models import create_schema, WriteConflict
+    from ..profiling import enable, track
+    if args.profile:
+        enable()
+    create_schema()
+    try:
+        with track(args.command):
+            return args.func(args)
+    except BatchInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except ImportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except WriteConflict as e:
+        print(f"error: {e}; nothing was written", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
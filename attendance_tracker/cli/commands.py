@@ -1,13 +1,29 @@
+import csv
 import os
 from datetime import datetime
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from ..models import Session, Base, engine, Student, Attendance
-from ..utils import validate_date, format_date, validate_name
+from ..models import (
+    Session, get_engine, get_settings, create_schema, Student, Attendance, run_write, WriteConflict
+)
+from ..marking import mark_date
+from ..search import search_students, fuzzy_search_students
+from ..utils import (
+    validate_date, validate_month, format_date, validate_name, parse_student_range, parse_id_list
+)
+from ..storage import attendance_backend
+from ..roster import roster_cache
+from ..transfer import import_roster, export_attendance
+from ..reports import (
+    DEFAULT_PAGE_SIZE, iter_student_record_pages, student_rates, monthly_totals, daily_counts,
+    table_counts, table_page, attendance_details_page
+)
+
+LOWEST_RATES_SHOWN = 10
 
 def initialize_db():
     """Initialize the database and create tables if they don't exist."""
-    Base.metadata.create_all(engine)
+    create_schema()
     print("Database initialized.")
 
 def add_student():
@@ -19,220 +35,342 @@ def add_student():
         print(error)
         return
     
-    session = Session()
     try:
-        student = Student(name=name)
-        session.add(student)
-        session.commit()
-        print(f"Student '{name}' added.")
+        run_write(lambda session: session.add(Student(name=name)))
     except IntegrityError:
-        session.rollback()
         print("This student already exists.")
-    finally:
-        session.close()
+        return
+    except WriteConflict as e:
+        print(f"Student not added: {e}")
+        return
+    roster_cache.invalidate()
+    print(f"Student '{name}' added.")
+
+def import_students():
+    """Import students in bulk from a CSV roster file."""
+    path = input("Enter the path of the roster CSV file: ").strip()
+    if not os.path.isfile(path):
+        print("File not found.")
+        return
+
+    try:
+        summary = import_roster(path)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Error reading roster: {e}")
+        return
+
+    print(f"\nImported {summary['imported']} students from {summary['rows']} rows.")
+
+    duplicates = summary["duplicates"]
+    if duplicates:
+        print(f"Skipped {len(duplicates)} duplicate names, e.g. {', '.join(duplicates[:5])}")
+
+    invalid = summary["invalid"]
+    if invalid:
+        print(f"Skipped {len(invalid)} invalid rows:")
+        for line_num, name, error in invalid[:10]:
+            print(f"  Line {line_num}: '{name}' - {error}")
+
+    if summary["elapsed"] > 0:
+        rate = summary["rows"] / summary["elapsed"]
+        print(f"Processed in {summary['elapsed']:.2f}s ({rate:,.0f} rows/s)")
 
 def list_students():
     """List all students in the roster."""
-    session = Session()
-    students = session.query(Student).order_by(Student.name).all()
+    students = roster_cache.sorted_names()
     
     if not students:
         print("No students found.")
     else:
         print("\nStudent List:")
-        for student in students:
-            print(f"{student.id}. {student.name}")
+        for name, student_id in students:
+            print(f"{student_id}. {name}")
         print(f"\nTotal students: {len(students)}")
-    
-    session.close()
 
-def mark_attendance():
-    """Mark attendance for a student on a specific date."""
-    session = Session()
-    students = session.query(Student).all()
+def _find_student(answer):
+    """Resolve an ID or a name search to a student ID, asking when several match.
+
+    Returns None, after saying why, when no single student is chosen.
+    """
+    if answer.isdigit():
+        if roster_cache.get_name(int(answer)) is None:
+            print("Student ID not found.")
+            return None
+        return int(answer)
     
-    if not students:
-        print("No students found. Add some first.")
+    session = Session()
+    try:
+        matches = search_students(session, answer)
+        if not matches:
+            matches = fuzzy_search_students(session, answer)
+            if matches:
+                print("No exact match. Did you mean:")
+    finally:
         session.close()
-        return
     
-    print("\nStudents:")
-    for student in students:
-        print(f"{student.id}. {student.name}")
+    if not matches:
+        print(f"No student matches '{answer}'.")
+        return None
+    if len(matches) == 1 and matches[0][1].casefold() == answer.casefold():
+        return matches[0][0]
+    for student_id, name in matches:
+        print(f"{student_id}. {name}")
+    if len(matches) == 1:
+        if input("Use this student? (Y/n): ").strip().lower() in ("", "y"):
+            return matches[0][0]
+        print("No student selected.")
+        return None
     
     try:
         student_id = int(input("Enter student ID: "))
-        student = session.query(Student).filter_by(id=student_id).first()
-        if not student:
-            print("Student ID not found.")
-            session.close()
-            return
     except ValueError:
         print("Invalid ID. Use a number.")
-        session.close()
+        return None
+    if roster_cache.get_name(student_id) is None:
+        print("Student ID not found.")
+        return None
+    return student_id
+
+def mark_attendance():
+    """Mark attendance for a student on a specific date."""
+    if not roster_cache.names():
+        print("No students found. Add some first.")
+        return
+    
+    answer = input("Enter student ID or name: ").strip()
+    if not answer:
+        print("Enter an ID or part of a name.")
+        return
+    student_id = _find_student(answer)
+    if student_id is None:
         return
     
     date_input = input("Enter date (YYYY-MM-DD) [leave blank for today]: ").strip()
     date_obj, error = validate_date(date_input)
     if error:
         print(error)
-        session.close()
         return
     
     status = input("Status (present/absent): ").lower()
     if status not in ("present", "absent"):
         print("Invalid status. Use 'present' or 'absent'.")
-        session.close()
         return
     
+    record = (student_id, format_date(date_obj), status)
     try:
-        # Check if record already exists
-        existing = session.query(Attendance).filter_by(
-            student_id=student_id, 
-            date=format_date(date_obj)
-        ).first()
-        
-        if existing:
-            print("Attendance already recorded for this date.")
-            session.close()
-            return
-            
-        attendance = Attendance(
-            student_id=student_id,
-            date=format_date(date_obj),
-            status=status
-        )
-        session.add(attendance)
-        session.commit()
-        print("Attendance marked.")
-    except Exception as e:
-        session.rollback()
-        print(f"Error: {e}")
-    finally:
-        session.close()
+        marked, _ = run_write(lambda session: attendance_backend().mark_records(session, [record]))
+    except (WriteConflict, SQLAlchemyError) as e:
+        print(f"Attendance not saved: {e}")
+        return
+    if not marked:
+        print("Attendance already recorded for this date.")
+        return
+    print("Attendance marked.")
 
 def view_attendance():
-    """View attendance records for all students."""
-    session = Session()
-    students = session.query(Student).order_by(Student.name).all()
-    
-    if not students:
-        print("No students in database.")
-        session.close()
+    """View attendance records page by page."""
+    page_input = input(f"Students per page [leave blank for {DEFAULT_PAGE_SIZE}]: ").strip()
+    try:
+        page_size = int(page_input) if page_input else DEFAULT_PAGE_SIZE
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        print("Invalid page size. Use a positive number.")
         return
-    
+
+    range_input = input("Student range, IDs (1-100) or names (A-M) [leave blank for all]: ").strip()
+    name_range, id_range, error = parse_student_range(range_input)
+    if error:
+        print(error)
+        return
+
+    session = Session()
     print("\n===== ATTENDANCE RECORDS =====\n")
-    
+
+    total_students = 0
     total_records = 0
-    for student in students:
-        print(f"Student: {student.name} (ID: {student.id})")
-        
-        attendance_records = session.query(Attendance).filter_by(student_id=student.id).order_by(Attendance.date).all()
-        
-        if attendance_records:
-            print("  Date       | Status")
-            print("  -----------|--------")
-            for record in attendance_records:
-                print(f"  {record.date} | {record.status}")
-            total_records += len(attendance_records)
-        else:
-            print("  No attendance records")
-        
-        print("")  # Empty line between students
-    
-    print(f"Total attendance records: {total_records}")
+    fetch_page = attendance_backend().student_records_page
+    for page in iter_student_record_pages(session, page_size, name_range, id_range, fetch_page):
+        for student_id, name, records in page:
+            print(f"Student: {name} (ID: {student_id})")
+            if records:
+                print("  Date       | Status")
+                print("  -----------|--------")
+                for date, status in records:
+                    print(f"  {date} | {status}")
+                total_records += len(records)
+            else:
+                print("  No attendance records")
+            print("")  # Empty line between students
+        total_students += len(page)
+
+        if len(page) == page_size:
+            session.commit()  # don't hold a read transaction while waiting for the user
+            if input("Press Enter for the next page, or q to stop: ").strip().lower() == "q":
+                break
+
     session.close()
 
+    if not total_students:
+        print("No students found.")
+        return
+    print(f"Total attendance records: {total_records}")
+
 def mark_all_present():
     """Mark all students present for a specific date."""
-    session = Session()
-    students = session.query(Student).all()
-    
-    if not students:
+    if not roster_cache.names():
         print("No students found. Add some first.")
-        session.close()
         return
     
     date_input = input("Enter date for all students (YYYY-MM-DD) [leave blank for today]: ").strip()
     date_obj, error = validate_date(date_input)
     if error:
         print(error)
-        session.close()
         return
     
-    date_str = format_date(date_obj)
+    absent_input = input("IDs of absent students, comma-separated [leave blank for none]: ").strip()
+    absent_ids, error = parse_id_list(absent_input)
+    if error:
+        print(error)
+        return
     
-    # Delete existing records for this date
-    session.query(Attendance).filter_by(date=date_str).delete()
+    overwrite = input("Overwrite records already entered for this date? (y/N): ").strip().lower() == "y"
     
-    marked_count = 0
-    for student in students:
-        attendance = Attendance(
-            student_id=student.id,
-            date=date_str,
-            status="present"
+    date_str = format_date(date_obj)
+    try:
+        marked, skipped, unknown_ids = run_write(
+            lambda session: mark_date(session, date_str, absent_ids, overwrite=overwrite)
         )
-        session.add(attendance)
-        marked_count += 1
-    
-    session.commit()
-    session.close()
+    except (WriteConflict, SQLAlchemyError) as e:
+        print(f"Attendance not saved: {e}")
+        return
     
-    print(f"\nMarked {marked_count} students present for {date_str}")
+    print(f"\nMarked {marked} students for {date_str}")
+    if absent_ids:
+        print(f"Students listed as absent: {len(absent_ids) - len(unknown_ids)}")
+    if skipped:
+        print(f"Skipped {skipped} students who already had attendance recorded for this date")
+    if unknown_ids:
+        print(f"Ignored unknown student IDs: {', '.join(map(str, unknown_ids))}")
 
 def export_to_csv():
     """Export attendance data to a CSV file."""
-    session = Session()
-    
-    # Get all attendance records with student names
-    records = session.query(
-        Student.name,
-        Attendance.date,
-        Attendance.status
-    ).join(
-        Attendance, Student.id == Attendance.student_id
-    ).order_by(
-        Student.name, Attendance.date
-    ).all()
-    
-    session.close()
-    
-    if not records:
+    path = input("Enter output file [leave blank for attendance_export.csv, '-' for screen]: ").strip()
+    path = path or "attendance_export.csv"
+
+    try:
+        count = export_attendance(path)
+    except OSError as e:
+        print(f"Error writing export: {e}")
+        return
+    if not count:
         print("No attendance records to export.")
         return
-    
-    with open("attendance_export.csv", "w") as f:
-        f.write("Student,Date,Status\n")
-        for name, date, status in records:
-            f.write(f"{name},{date},{status}\n")
-    
-    print(f"Attendance data exported to {os.path.abspath('attendance_export.csv')}")
+
+    if path == "-":
+        print(f"\nExported {count} attendance records.")
+    else:
+        print(f"Exported {count} attendance records to {os.path.abspath(path)}")
+
+def _read_page_options():
+    """Ask for a page size and a starting ID; returns (page_size, after_id) or None."""
+    page_input = input(f"Rows per page [leave blank for {DEFAULT_PAGE_SIZE}]: ").strip()
+    start_input = input("Start from ID [leave blank for the first row]: ").strip()
+    try:
+        page_size = int(page_input) if page_input else DEFAULT_PAGE_SIZE
+        start_id = int(start_input) if start_input else None
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        print("Invalid number. Use positive whole numbers.")
+        return None
+    return page_size, (start_id - 1 if start_id else None)
+
+def _browse(fetch_page, print_row, page_size, after_id=None, session=None, cursor=None):
+    """Print pages from fetch_page(page_size, after_id) until the user stops.
+
+    Each row's first value is its ID. Between pages the user can press
+    Enter for the next page, type an ID to jump to it, or q to stop.
+    cursor(row) gives the after_id that continues after a row; by default
+    it is the row's ID. session's read transaction is ended before each
+    prompt. Returns the number of rows shown.
+    """
+    shown = 0
+    while True:
+        rows = fetch_page(page_size, after_id)
+        for row in rows:
+            print_row(row)
+        shown += len(rows)
+        if len(rows) < page_size:
+            return shown
+        
+        if session is not None:
+            session.commit()
+        answer = input("Enter for the next page, an ID to jump to, or q to stop: ").strip().lower()
+        if answer == "q":
+            return shown
+        if answer.isdigit():
+            after_id = int(answer) - 1
+        else:
+            after_id = cursor(rows[-1]) if cursor else rows[-1][0]
+
+def _record_page(session, page_size, after):
+    """Return (student_id, date, status) records from the storage backend.
+
+    after is the (student_id, date) of the last record shown, or a student
+    ID to start after.
+    """
+    if isinstance(after, int):
+        after = (after, "~")  # "~" sorts after every date
+    return attendance_backend().attendance_page(session, page_size, after=after)
 
 def view_database_tables():
-    """View the raw database tables."""
+    """View the raw database tables one page at a time."""
+    options = _read_page_options()
+    if options is None:
+        return
+    page_size, after_id = options
+    
     session = Session()
+    student_count, attendance_count = table_counts(session)
     
     # Students table
-    students = session.query(Student).all()
-    print("\n=== TABLE: students ===")
-    if students:
+    print(f"\n=== TABLE: students ({student_count} rows) ===")
+    if student_count:
         print("id | name")
         print("---|-----")
-        for student in students:
-            print(f"{student.id} | {student.name}")
+        _browse(
+            lambda size, after: table_page(session, Student, size, after),
+            lambda row: print(f"{row[0]} | {row[1]}"),
+            page_size, after_id, session
+        )
     else:
         print("No records")
     
-    # Attendance table
-    attendance_records = session.query(Attendance).all()
-    print("\n=== TABLE: attendance ===")
-    if attendance_records:
+    # Attendance table, or the records of another storage backend
+    storage = get_settings()["storage"]
+    if storage == "rows":
+        print(f"\n=== TABLE: attendance ({attendance_count} rows) ===")
+    else:
+        print(f"\n=== ATTENDANCE RECORDS: storage = {storage} ({attendance_count} records) ===")
+    if not attendance_count:
+        print("No records")
+    elif storage == "rows":
         print("id | student_id | date | status")
         print("---|------------|------|-------")
-        for record in attendance_records:
-            print(f"{record.id} | {record.student_id} | {record.date} | {record.status}")
+        _browse(
+            lambda size, after: table_page(session, Attendance, size, after),
+            lambda row: print(" | ".join(str(value) for value in row)),
+            page_size, after_id, session
+        )
     else:
-        print("No records")
+        print("student_id | date | status")
+        print("-----------|------|-------")
+        _browse(
+            lambda size, after: _record_page(session, size, after),
+            lambda row: print(" | ".join(str(value) for value in row)),
+            page_size, after_id, session, cursor=lambda row: row[:2]
+        )
     
     session.close()
 
@@ -242,33 +380,84 @@ def check_database():
     
     print("\n--- Database Check ---")
     
-    # Check students table
-    student_count = session.query(Student).count()
+    # Counts come from cheap aggregates, so they appear immediately
+    student_count, attendance_count = table_counts(session)
     print(f"Students in database: {student_count}")
+    print(f"Attendance records in database: {attendance_count}")
+    
+    # Show file location
+    db_path = get_engine().url.database
+    print(f"\nDatabase location: {os.path.abspath(db_path) if db_path else 'in memory'}")
+    
+    cache_stats = roster_cache.stats()
+    print(f"Roster cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
     
     if student_count > 0:
         print("\nStudent records:")
-        students = session.query(Student).all()
-        for student in students:
-            print(f"  ID: {student.id}, Name: {student.name}")
-    
-    # Check attendance table
-    attendance_count = session.query(Attendance).count()
-    print(f"\nAttendance records in database: {attendance_count}")
+        _browse(
+            lambda size, after: table_page(session, Student, size, after),
+            lambda row: print(f"  ID: {row[0]}, Name: {row[1]}"),
+            DEFAULT_PAGE_SIZE, session=session
+        )
     
-    if attendance_count > 0:
+    if attendance_count > 0 and get_settings()["storage"] == "rows":
         print("\nAttendance details:")
-        records = session.query(
-            Student.name, Attendance.date, Attendance.status
-        ).join(
-            Attendance, Student.id == Attendance.student_id
-        ).all()
-        
-        for name, date, status in records:
-            print(f"  {name} on {date}: {status}")
+        _browse(
+            lambda size, after: attendance_details_page(session, size, after),
+            lambda row: print(f"  {row[1]} on {row[2]}: {row[3]} (record {row[0]})"),
+            DEFAULT_PAGE_SIZE, session=session
+        )
+    elif attendance_count > 0:
+        print("\nAttendance details:")
+        names = roster_cache.names()
+        _browse(
+            lambda size, after: _record_page(session, size, after),
+            lambda row: print(f"  {names.get(row[0], '?')} on {row[1]}: {row[2]} (student {row[0]})"),
+            DEFAULT_PAGE_SIZE, session=session, cursor=lambda row: row[:2]
+        )
     
-    # Show file location
-    db_path = os.path.abspath("attendance.db")
-    print(f"\nDatabase location: {db_path}")
+    session.close()
+
+def _format_rate(rate):
+    """Format an attendance rate as a percentage."""
+    return "-" if rate is None else f"{rate:.1%}"
+
+def show_statistics():
+    """Show attendance totals and rates for a month or for all time."""
+    month_input = input("Enter month (YYYY-MM) [leave blank for all time]: ").strip()
+    month = None
+    if month_input:
+        month, error = validate_month(month_input)
+        if error:
+            print(error)
+            return
     
-    session.close()
\ No newline at end of file
+    session = Session()
+    
+    totals = monthly_totals(session, month, month)
+    if not totals:
+        print("No attendance records found.")
+        session.close()
+        return
+    
+    print("\n=== MONTHLY TOTALS ===")
+    print("Month   | Present | Absent | Rate")
+    print("--------|---------|--------|------")
+    for row_month, present, absent, rate in totals:
+        print(f"{row_month} | {present:7} | {absent:6} | {_format_rate(rate)}")
+    
+    if month:
+        print(f"\n=== DAILY COUNTS FOR {month} ===")
+        print("Date       | Present | Absent")
+        print("-----------|---------|-------")
+        for date, present, absent in daily_counts(session, month, month):
+            print(f"{date} | {present:7} | {absent:6}")
+    
+    print("\n=== LOWEST ATTENDANCE RATES ===")
+    for student_id, name, present, absent, rate in student_rates(session, month, month, LOWEST_RATES_SHOWN):
+        if rate is None:
+            break
+        print(f"  {name} (ID: {student_id}): {_format_rate(rate)} ({present} present, {absent} absent)")
+    
+    session.close()
+
@@ -0,0 +1,60 @@
+import configparser
+import os
+
+CONFIG_ENV_VAR = "ATTENDANCE_CONFIG"
+DEFAULT_CONFIG_FILE = "attendance.ini"
+CONFIG_SECTION = "database"
+
+# Setting name -> (default, type). Every setting can be overridden by an
+# ATTENDANCE_<NAME> environment variable, e.g. ATTENDANCE_URL.
+DEFAULTS = {
+    "url": ("sqlite:///attendance.db", str),
+    "journal_mode": ("WAL", str),
+    "synchronous": ("NORMAL", str),
+    "cache_size": (-65536, int),        # negative values are KiB, so 64 MiB
+    "mmap_size": (268435456, int),      # 256 MiB
+    "busy_timeout": (5000, int),        # milliseconds
+    "write_retries": (5, int),          # retries of a write that still finds the database locked
+    "retry_backoff_ms": (50, int),      # first retry delay, doubled each time, with jitter
+    "temp_store": ("MEMORY", str),
+    "pool_size": (5, int),
+    "max_overflow": (10, int),
+    "pool_timeout": (30, int),          # seconds
+    "storage": ("rows", str),           # "rows", "bitmap", "compact" or "sharded", see storage
+    "shard_pattern": ("{stem}_{term}.db", str),  # shard file names for storage = sharded
+    "slow_query_ms": (200, int),        # slow query log threshold with --profile, 0 for off
+}
+
+
+def _read_config_file(path):
+    """Return the [database] section of an INI file as a dict."""
+    parser = configparser.ConfigParser()
+    if not parser.read(path):
+        return {}
+    if not parser.has_section(CONFIG_SECTION):
+        return {}
+    return dict(parser.items(CONFIG_SECTION))
+
+
+def load_settings(path=None, environ=None):
+    """Load database settings from defaults, a config file and the environment.
+
+    The config file is path, the file named by ATTENDANCE_CONFIG, or
+    attendance.ini in the working directory, in that order. Environment
+    variables take precedence over the file.
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(CONFIG_ENV_VAR) or DEFAULT_CONFIG_FILE
+    file_values = _read_config_file(path)
+
+    settings = {}
+    for name, (default, cast) in DEFAULTS.items():
+        value = environ.get(f"ATTENDANCE_{name.upper()}", file_values.get(name))
+        if value is None:
+            settings[name] = default
+            continue
+        try:
+            settings[name] = cast(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for setting '{name}': {value!r}") from None
+    return settings
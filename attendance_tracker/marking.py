@@ -0,0 +1,106 @@
+from collections.abc import Mapping
+
+from sqlalchemy import case, func, literal, select, true
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .models import Student, Attendance
+from .utils import STATUS_CODES
+
+
+def _on_conflict(stmt, overwrite):
+    """Replace or keep existing (student_id, date) records."""
+    if overwrite:
+        return stmt.on_conflict_do_update(
+            index_elements=["student_id", "date"],
+            set_={"status": stmt.excluded.status},
+        )
+    return stmt.on_conflict_do_nothing(index_elements=["student_id", "date"])
+
+
+def mark_records(session, records, overwrite=False):
+    """Insert (student_id, date, status) records in one executemany.
+
+    Records must already be validated. Existing records are skipped, or
+    replaced when overwrite is true. The caller owns the transaction.
+    Returns (marked, skipped).
+    """
+    rows = [
+        {"student_id": student_id, "date": date_str, "status": status}
+        for student_id, date_str, status in records
+    ]
+    if not rows:
+        return 0, 0
+    stmt = _on_conflict(sqlite_insert(Attendance.__table__), overwrite)
+    marked = session.execute(stmt, rows).rowcount
+    return marked, len(rows) - marked
+
+
+def mark_all(session, date_str, absent_ids=(), overwrite=False):
+    """Mark every student for one date with a single INSERT ... SELECT.
+
+    Students listed in absent_ids are marked absent and everyone else
+    present. Existing records for the date are skipped, or replaced when
+    overwrite is true. The caller owns the transaction. Returns
+    (marked, skipped, unknown_ids), where unknown_ids are absent IDs that
+    match no student.
+    """
+    absent_ids = set(absent_ids)
+    if absent_ids:
+        status = case((Student.id.in_(absent_ids), "absent"), else_="present")
+    else:
+        status = literal("present")
+
+    # "WHERE true" keeps SQLite from parsing ON CONFLICT as a join constraint
+    rows = select(Student.id, literal(date_str), status).where(true())
+    stmt = sqlite_insert(Attendance.__table__).from_select(
+        ["student_id", "date", "status"], rows
+    )
+    stmt = _on_conflict(stmt, overwrite)
+
+    total = session.execute(select(func.count(Student.id))).scalar()
+    marked = session.execute(stmt).rowcount
+
+    unknown_ids = set()
+    if absent_ids:
+        found = set(session.execute(
+            select(Student.id).where(Student.id.in_(absent_ids))
+        ).scalars())
+        unknown_ids = absent_ids - found
+
+    return marked, total - marked, sorted(unknown_ids)
+
+
+def mark_date(session, date_str, statuses=(), default="present", overwrite=False):
+    """Mark every student for one date through the configured storage backend.
+
+    statuses is either a mapping of student_id to status, or a collection
+    of student IDs that get the other status (the absentees, with the
+    default of "present"). Every other student gets default. Existing
+    records for the date are skipped, or replaced when overwrite is true.
+    The caller owns the transaction. Returns (marked, skipped, unknown_ids),
+    where unknown_ids are listed IDs that match no student.
+    """
+    from .storage import attendance_backend
+
+    if default not in STATUS_CODES:
+        raise ValueError(f"Invalid status '{default}'")
+    if isinstance(statuses, Mapping):
+        for status in statuses.values():
+            if status not in STATUS_CODES:
+                raise ValueError(f"Invalid status '{status}'")
+        exceptions = {student_id: status for student_id, status in statuses.items() if status != default}
+    else:
+        other = "absent" if default == "present" else "present"
+        exceptions = dict.fromkeys(statuses, other)
+
+    backend = attendance_backend()
+    if default == "present" and set(exceptions.values()) <= {"absent"}:
+        return backend.mark_all(session, date_str, set(exceptions), overwrite)
+
+    student_ids = session.execute(select(Student.id)).scalars().all()
+    records = [
+        (student_id, date_str, exceptions.get(student_id, default))
+        for student_id in student_ids
+    ]
+    marked, skipped = backend.mark_records(session, records, overwrite)
+    return marked, skipped, sorted(exceptions.keys() - set(student_ids))
@@ -1,3 +1,17 @@
-from .base import Base, Session, engine
+from .base import Base, Session, ScopedSession, get_engine, get_settings, configure_engine
+from .transactions import begin_write, run_write, is_lock_error, WriteConflict
 from .student import Student
-from .attendance import Attendance
\ No newline at end of file
+from .attendance import Attendance
+from .compact import CompactAttendance
+from .bitmap import AttendanceBitmap
+from .summary import AttendanceSummary, ensure_summary_table, rebuild_summary
+from .changes import AttendanceChange, ExportWatermark, ensure_change_tracking
+from .name_index import ensure_name_index
+from .roster_version import RosterVersion, ensure_roster_version
+from .schema import SCHEMA_VERSION, create_schema, get_schema_version
+
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,126 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
+
+from ..config import load_settings
 
 Base = declarative_base()
-engine = create_engine('sqlite:///attendance.db')
-Session = sessionmaker(bind=engine)
\ No newline at end of file
+
+_engine = None
+_settings = None
+
+_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "busy_timeout", "temp_store")
+
+
+def _set_sqlite_pragmas(settings):
+    """Return a connect listener that applies the tuning pragmas."""
+    def on_connect(dbapi_connection, connection_record):
+        # Let _begin below issue BEGIN instead of the sqlite3 module, which
+        # would only start a transaction at the first write.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in _PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma} = {settings[pragma]}")
+        cursor.close()
+    return on_connect
+
+
+def _begin(conn):
+    """Start a transaction; BEGIN IMMEDIATE when the connection is for writing.
+
+    IMMEDIATE takes the write lock up front, waiting up to busy_timeout,
+    instead of failing with "database is locked" when a read transaction
+    later tries to write. See transactions.begin_write.
+    """
+    immediate = conn.get_execution_options().get("sqlite_immediate")
+    conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+
+def build_engine(settings):
+    """Create an engine for the given settings.
+
+    File-backed SQLite databases get a sized connection pool and have the
+    journal, cache, mmap and busy-timeout pragmas applied to every new
+    connection. With the default WAL journal, readers are not blocked by
+    an active writer.
+    """
+    url = make_url(settings["url"])
+    kwargs = {}
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+    if is_sqlite and not in_memory:
+        kwargs.update(
+            poolclass=QueuePool,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings["busy_timeout"] / 1000,
+            },
+        )
+
+    engine = create_engine(url, **kwargs)
+    if is_sqlite:
+        event.listen(engine, "connect", _set_sqlite_pragmas(settings))
+        event.listen(engine, "begin", _begin)
+    return engine
+
+
+def get_engine():
+    """Return the shared engine, creating it on first use."""
+    global _engine, _settings
+    if _engine is None:
+        if _settings is None:
+            _settings = load_settings()
+        _engine = build_engine(_settings)
+        Session.configure(bind=_engine)
+    return _engine
+
+
+def get_settings():
+    """Return the settings the shared engine is (or will be) built from."""
+    global _settings
+    if _settings is None:
+        _settings = load_settings()
+    return _settings
+
+
+def configure_engine(**overrides):
+    """Replace the shared engine, e.g. to point at another database URL.
+
+    Settings not given in overrides come from load_settings(). The engine
+    itself is still only created on first use.
+    """
+    global _engine, _settings
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _settings = {**load_settings(), **overrides}
+
+
+class _LazySessionmaker(sessionmaker):
+    """Session factory that binds to the shared engine on first use."""
+
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+Session = _LazySessionmaker()
+
+# One session per thread, for code that shares sessions across calls in
+# worker threads; call ScopedSession.remove() when a thread's work is done.
+ScopedSession = scoped_session(Session)
+
+
+def __getattr__(name):
+    # Keeps "from attendance_tracker.models import engine" working without
+    # building the engine at import time.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
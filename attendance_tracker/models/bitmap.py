@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from .base import Base
+
+class AttendanceBitmap(Base):
+    """Attendance for one student and term stored as two packed bitsets.
+
+    A term is a calendar year. Bit n of each BLOB is day n of the year
+    (January 1 is bit 0, least significant bit first): recorded has the bit
+    set when attendance was taken, present when the student was present.
+    See storage.bitmap for reading and writing.
+    """
+    __tablename__ = 'attendance_bitmap'
+    
+    student_id = Column(Integer, ForeignKey('students.id'), primary_key=True)
+    term = Column(Integer, primary_key=True, autoincrement=False)
+    present = Column(LargeBinary, nullable=False)
+    recorded = Column(LargeBinary, nullable=False)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    def __repr__(self):
+        return f"<AttendanceBitmap(student_id={self.student_id}, term={self.term})>"
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, Integer, String, text
+from .base import Base
+
+class AttendanceChange(Base):
+    """One entry per write to the attendance table, in commit order.
+
+    seq is an AUTOINCREMENT key, so it only ever grows, even after old
+    entries are pruned. status is NULL when the (student_id, date) record
+    was deleted. Rows are written by triggers, so every write path is
+    tracked, including raw SQL and upserts.
+    """
+    __tablename__ = 'attendance_changes'
+    
+    seq = Column(Integer, primary_key=True)
+    student_id = Column(Integer, nullable=False)
+    date = Column(String, nullable=False)
+    status = Column(String)
+    changed_at = Column(String, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    def __repr__(self):
+        return f"<AttendanceChange(seq={self.seq}, student_id={self.student_id}, date='{self.date}', status={self.status!r})>"
+
+
+class ExportWatermark(Base):
+    """The last change sequence number exported to each consumer."""
+    __tablename__ = 'export_watermarks'
+    
+    consumer = Column(String, primary_key=True)
+    seq = Column(Integer, nullable=False)
+    exported_at = Column(String, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    
+    def __repr__(self):
+        return f"<ExportWatermark(consumer='{self.consumer}', seq={self.seq})>"
+
+
+_LOG_NEW = """
+    INSERT INTO attendance_changes (student_id, date, status)
+    VALUES (NEW.student_id, NEW.date, NEW.status);
+"""
+
+CHANGE_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_changes_insert
+        AFTER INSERT ON attendance BEGIN {_LOG_NEW} END""",
+    """CREATE TRIGGER IF NOT EXISTS attendance_changes_delete
+        AFTER DELETE ON attendance BEGIN
+            INSERT INTO attendance_changes (student_id, date, status)
+            VALUES (OLD.student_id, OLD.date, NULL);
+        END""",
+    # Moving a record to another student or date deletes the old key
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_changes_update
+        AFTER UPDATE OF student_id, date, status ON attendance BEGIN
+            INSERT INTO attendance_changes (student_id, date, status)
+            SELECT OLD.student_id, OLD.date, NULL
+            WHERE OLD.student_id IS NOT NEW.student_id OR OLD.date IS NOT NEW.date;
+            {_LOG_NEW}
+        END""",
+)
+
+
+def ensure_change_tracking(engine):
+    """Create the change log tables and install their triggers if missing.
+
+    Existing attendance rows are not copied into the log; the first
+    incremental export for a consumer exports the whole table instead.
+    """
+    with engine.begin() as conn:
+        AttendanceChange.__table__.create(conn, checkfirst=True)
+        ExportWatermark.__table__.create(conn, checkfirst=True)
+        for trigger in CHANGE_TRIGGERS:
+            conn.execute(text(trigger))
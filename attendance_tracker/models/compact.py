@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, SmallInteger, ForeignKey
+from .base import Base
+
+class CompactAttendance(Base):
+    """Attendance stored as integer day numbers and status codes.
+
+    The table is clustered on (student_id, day) with no rowid, so a
+    student's history is one contiguous range of the primary key B-tree.
+    See utils.date_to_day and utils.STATUS_CODES for the encodings, and
+    storage.compact for reading and writing.
+    """
+    __tablename__ = 'attendance_compact'
+    
+    student_id = Column(Integer, ForeignKey('students.id'), primary_key=True)
+    day = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(SmallInteger, nullable=False)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    def __repr__(self):
+        return f"<CompactAttendance(student_id={self.student_id}, day={self.day}, status={self.status})>"
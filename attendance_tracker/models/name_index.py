@@ -0,0 +1,83 @@
+"""Full-text index over student names.
+
+students_fts is an FTS5 table that reads its text from the students table
+(an external-content index), so it only stores the index itself. Names
+are split into words, lower-cased and stripped of accents, and prefixes
+of one to three characters are indexed as well, which makes "jo sm" a
+single index lookup. Triggers on students keep it current; bulk loads
+can suspend the insert trigger and rebuild the index once instead. The
+students_fts_terms table lists the indexed words for fuzzy matching.
+"""
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+NAME_INDEX_TABLE = "students_fts"
+
+CREATE_NAME_INDEX = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+        name, content='students', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+"""
+
+CREATE_TERMS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS students_fts_terms USING fts5vocab(students_fts, 'row')
+"""
+
+REBUILD_NAME_INDEX = "INSERT INTO students_fts (students_fts) VALUES ('rebuild')"
+
+_ADD_NAME = "INSERT INTO students_fts (rowid, name) VALUES (NEW.id, NEW.name);"
+_REMOVE_NAME = "INSERT INTO students_fts (students_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);"
+
+NAME_INDEX_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_insert
+        AFTER INSERT ON students BEGIN {_ADD_NAME} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_delete
+        AFTER DELETE ON students BEGIN {_REMOVE_NAME} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_update
+        AFTER UPDATE OF id, name ON students BEGIN {_REMOVE_NAME} {_ADD_NAME} END""",
+)
+
+
+def ensure_name_index(engine):
+    """Create the name index and its triggers if missing, indexing existing students.
+
+    Returns False, leaving the schema unchanged, when SQLite was built
+    without FTS5; name search then falls back to scanning the roster.
+    """
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": NAME_INDEX_TABLE}
+        ).first()
+        try:
+            conn.execute(text(CREATE_NAME_INDEX))
+        except OperationalError:
+            return False
+        conn.execute(text(CREATE_TERMS_TABLE))
+        for trigger in NAME_INDEX_TRIGGERS:
+            conn.execute(text(trigger))
+        if not exists:
+            conn.execute(text(REBUILD_NAME_INDEX))
+    return True
+
+
+def suspend_name_index(conn):
+    """Drop the insert trigger for a bulk load inside conn's transaction.
+
+    Returns True if there was an index to suspend; pass it to
+    resume_name_index before committing. Rebuilding the index once is
+    several times faster than updating it row by row.
+    """
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": NAME_INDEX_TABLE}
+    ).first()
+    if exists:
+        conn.execute(text("DROP TRIGGER IF EXISTS students_fts_insert"))
+    return bool(exists)
+
+
+def resume_name_index(conn, suspended):
+    """Put back the insert trigger and rebuild the index after a bulk load."""
+    if suspended:
+        conn.execute(text(NAME_INDEX_TRIGGERS[0]))
+        conn.execute(text(REBUILD_NAME_INDEX))
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, text
+from .base import Base
+
+class RosterVersion(Base):
+    """A single counter that triggers bump on every write to students.
+
+    Caches of the roster compare it to tell whether any student was added,
+    renamed or removed, by any program, since they were filled.
+    """
+    __tablename__ = 'roster_version'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<RosterVersion(version={self.version})>"
+
+
+_BUMP = "UPDATE roster_version SET version = version + 1 WHERE id = 1;"
+
+ROSTER_VERSION_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS roster_version_insert
+        AFTER INSERT ON students BEGIN {_BUMP} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS roster_version_delete
+        AFTER DELETE ON students BEGIN {_BUMP} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS roster_version_update
+        AFTER UPDATE ON students BEGIN {_BUMP} END""",
+)
+
+
+def ensure_roster_version(engine):
+    """Create the roster_version counter and install its triggers if missing."""
+    with engine.begin() as conn:
+        RosterVersion.__table__.create(conn, checkfirst=True)
+        conn.execute(text("INSERT OR IGNORE INTO roster_version (id, version) VALUES (1, 0)"))
+        for trigger in ROSTER_VERSION_TRIGGERS:
+            conn.execute(text(trigger))
+
+
+def suspend_roster_version(conn):
+    """Drop the insert trigger for a bulk load inside conn's transaction.
+
+    Returns True if there was a trigger to suspend; pass it to
+    resume_roster_version, which bumps the counter once, before committing.
+    """
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = 'roster_version_insert'")
+    ).first()
+    if exists:
+        conn.execute(text("DROP TRIGGER roster_version_insert"))
+    return bool(exists)
+
+
+def resume_roster_version(conn, suspended):
+    """Put back the insert trigger and bump the counter after a bulk load."""
+    if suspended:
+        conn.execute(text(ROSTER_VERSION_TRIGGERS[0]))
+        conn.execute(text(_BUMP))
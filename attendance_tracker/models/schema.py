@@ -0,0 +1,39 @@
+from sqlalchemy import text
+
+from .base import Base, get_engine
+from .summary import ensure_summary_table
+from .changes import ensure_change_tracking
+from .name_index import ensure_name_index
+from .roster_version import ensure_roster_version
+
+# Bump whenever a table, index or trigger is added so that existing
+# databases get create_schema() run against them once.
+SCHEMA_VERSION = 6
+
+
+def create_schema(engine=None, force=False):
+    """Create missing tables, indexes and triggers.
+
+    The schema version is kept in SQLite's user_version header field. When
+    it is already current this costs one PRAGMA read, so scripted commands
+    can call it on every start.
+    """
+    engine = engine or get_engine()
+    if not force and get_schema_version(engine) >= SCHEMA_VERSION:
+        return False
+
+    Base.metadata.create_all(engine)
+    ensure_summary_table(engine)
+    ensure_change_tracking(engine)
+    ensure_name_index(engine)
+    ensure_roster_version(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    return True
+
+
+def get_schema_version(engine=None):
+    """Return the schema version recorded in the database."""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
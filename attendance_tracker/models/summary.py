@@ -0,0 +1,79 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, text
+from .base import Base
+
+class AttendanceSummary(Base):
+    """Present/absent counts per student per month (YYYY-MM).
+
+    Rows are maintained by triggers on the attendance table, so every write
+    path keeps them current, including raw SQL and upserts.
+    """
+    __tablename__ = 'attendance_monthly'
+    
+    student_id = Column(Integer, ForeignKey('students.id'), primary_key=True)
+    month = Column(String, primary_key=True)
+    present = Column(Integer, nullable=False, default=0)
+    absent = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    def __repr__(self):
+        return f"<AttendanceSummary(student_id={self.student_id}, month='{self.month}', present={self.present}, absent={self.absent})>"
+
+
+_ADD_ROW = """
+    INSERT INTO attendance_monthly (student_id, month, present, absent)
+    VALUES (NEW.student_id, substr(NEW.date, 1, 7),
+            NEW.status = 'present', NEW.status = 'absent')
+    ON CONFLICT (student_id, month) DO UPDATE SET
+        present = present + excluded.present,
+        absent = absent + excluded.absent;
+"""
+
+_REMOVE_ROW = """
+    UPDATE attendance_monthly SET
+        present = present - (OLD.status = 'present'),
+        absent = absent - (OLD.status = 'absent')
+    WHERE student_id = OLD.student_id AND month = substr(OLD.date, 1, 7);
+"""
+
+SUMMARY_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_monthly_insert
+        AFTER INSERT ON attendance BEGIN {_ADD_ROW} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_monthly_delete
+        AFTER DELETE ON attendance BEGIN {_REMOVE_ROW} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS attendance_monthly_update
+        AFTER UPDATE OF student_id, date, status ON attendance
+        BEGIN {_REMOVE_ROW} {_ADD_ROW} END""",
+)
+
+REBUILD_SUMMARY = """
+    INSERT INTO attendance_monthly (student_id, month, present, absent)
+    SELECT student_id, substr(date, 1, 7),
+           SUM(status = 'present'), SUM(status = 'absent')
+    FROM attendance
+    GROUP BY student_id, substr(date, 1, 7)
+"""
+
+
+def ensure_summary_table(engine):
+    """Create the summary table and its triggers if they are missing.
+
+    When the triggers are not installed yet, the table is rebuilt from the
+    existing attendance rows in the same transaction that installs them.
+    """
+    with engine.begin() as conn:
+        AttendanceSummary.__table__.create(conn, checkfirst=True)
+        installed = conn.execute(text(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'attendance_monthly_%'"
+        )).scalar()
+        if installed == len(SUMMARY_TRIGGERS):
+            return
+        rebuild_summary(conn)
+        for trigger in SUMMARY_TRIGGERS:
+            conn.execute(text(trigger))
+
+
+def rebuild_summary(connection):
+    """Recompute every summary row from the attendance table."""
+    connection.execute(text("DELETE FROM attendance_monthly"))
+    connection.execute(text(REBUILD_SUMMARY))
@@ -0,0 +1,107 @@
+"""Write transactions that survive concurrent writers.
+
+SQLite allows one writer at a time. Every connection waits up to the
+busy_timeout setting for the lock, but a transaction that started as a
+reader and then tries to write can still fail at once with "database is
+locked", and a busy timeout can run out under load. begin_write starts a
+session's transaction with BEGIN IMMEDIATE so the lock is taken (or
+waited for) before any work is done; run_write also retries the whole
+unit of work with jittered exponential backoff while the database stays
+locked.
+
+With storage = sharded, attendance is written to per-term shard files, so
+the main database is not locked up front: storage.sharded begins each
+shard session a write transaction opens with BEGIN IMMEDIATE instead, and
+writers of different terms do not wait for each other.
+"""
+import random
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from .base import Session, get_settings
+
+# SQLite primary result codes for "database is locked" and "table is locked"
+_SQLITE_BUSY = 5
+_SQLITE_LOCKED = 6
+MAX_BACKOFF_SECONDS = 2.0
+
+
+class WriteConflict(Exception):
+    """Raised by run_write when the database stayed locked through every retry."""
+
+
+def is_lock_error(error):
+    """Return True for an error caused by another connection holding a lock."""
+    if not isinstance(error, OperationalError):
+        return False
+    code = getattr(error.orig, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (_SQLITE_BUSY, _SQLITE_LOCKED)
+    return "locked" in str(error.orig).lower()
+
+
+def begin_immediate(session):
+    """Start session's transaction with BEGIN IMMEDIATE.
+
+    Must be called before the session runs any statement; otherwise the
+    transaction has already begun and this has no effect.
+    """
+    session.connection(execution_options={"sqlite_immediate": True})
+    return session
+
+
+def begin_write(session):
+    """Mark session as a write transaction and take the write lock it needs.
+
+    That is the main database's lock, unless storage is sharded; then the
+    lock of each shard written to is taken when the shard is first used.
+    Like begin_immediate, call it before the session runs any statement.
+    """
+    session.info["write_transaction"] = True
+    if get_settings()["storage"] != "sharded":
+        begin_immediate(session)
+    return session
+
+
+def backoff(attempt, base_ms=None):
+    """Return the delay in seconds before retry number attempt (0-based)."""
+    if base_ms is None:
+        base_ms = get_settings()["retry_backoff_ms"]
+    delay = min(MAX_BACKOFF_SECONDS, base_ms / 1000 * 2 ** attempt)
+    return delay * random.uniform(0.5, 1.5)
+
+
+def run_write(work, retries=None, session_factory=Session):
+    """Run work(session) in a write transaction and commit, retrying on lock errors.
+
+    Each attempt uses a new session that begins with BEGIN IMMEDIATE, so
+    work must not have effects outside the database it would repeat. Up
+    to retries (default: the write_retries setting) further attempts are
+    made while the database is locked, with jittered exponential backoff
+    between them. Returns work's result; raises WriteConflict when every
+    attempt found the database locked. Other errors are raised at once.
+    """
+    if retries is None:
+        retries = get_settings()["write_retries"]
+    for attempt in range(retries + 1):
+        session = session_factory()
+        try:
+            begin_write(session)
+            result = work(session)
+            session.commit()
+            return result
+        except OperationalError as e:
+            session.rollback()
+            if not is_lock_error(e):
+                raise
+            if attempt == retries:
+                raise WriteConflict(
+                    f"database still locked after {retries + 1} attempts: {e.orig}"
+                ) from e
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        time.sleep(backoff(attempt))
@@ -0,0 +1,149 @@
+"""Opt-in SQL instrumentation for commands.
+
+enable() attaches before/after_cursor_execute listeners to every engine.
+While a command runs inside track(name), each statement's count and time
+are recorded against it, and the summary printed afterwards lists the
+statements run most often, which makes N+1 query patterns stand out.
+Statements slower than the slow_query_ms setting are reported on stderr
+as they finish, inside or outside a tracked command.
+
+Reads that go straight to the DBAPI cursor (the bulk loaders in
+reports.matrix and storage.rows) bypass these hooks.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# A statement run at least this many times in one command is flagged as
+# a likely N+1 pattern.
+REPEATED_STATEMENT_THRESHOLD = 20
+TOP_STATEMENTS_SHOWN = 5
+
+_enabled = False
+_slow_query_seconds = None
+_current = threading.local()
+
+
+class CommandStats:
+    """Query counts and timings collected for one command."""
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.slow_queries = 0
+        # statement text -> [executions, seconds]
+        self.statements = {}
+
+    def add(self, statement, seconds):
+        self.queries += 1
+        self.query_seconds += seconds
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def top_statements(self, limit=TOP_STATEMENTS_SHOWN):
+        """Return (statement, executions, seconds) for the most-run statements."""
+        ranked = sorted(self.statements.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        return [(statement, count, seconds) for statement, (count, seconds) in ranked[:limit]]
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the connection, so a
+    # statement that fails (and never reaches _after_execute) leaves
+    # nothing behind for the next one to pick up.
+    if context is not None:
+        context._profiling_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profiling_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+
+    stats = getattr(_current, "stats", None)
+    if stats is not None:
+        stats.add(statement, seconds)
+    if _slow_query_seconds is not None and seconds >= _slow_query_seconds:
+        if stats is not None:
+            stats.slow_queries += 1
+        where = f" in {stats.name}" if stats is not None else ""
+        print(f"[slow query{where}] {seconds * 1000:.1f} ms: {_one_line(statement)}", file=sys.stderr)
+
+
+def _one_line(statement, width=200):
+    text = " ".join(statement.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def enable(slow_query_ms=None):
+    """Start timing every SQL statement on every engine.
+
+    slow_query_ms defaults to the slow_query_ms setting; 0 turns the slow
+    query log off.
+    """
+    global _enabled, _slow_query_seconds
+    if slow_query_ms is None:
+        from .models import get_settings
+        slow_query_ms = get_settings()["slow_query_ms"]
+    _slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+
+    if not _enabled:
+        event.listen(Engine, "before_cursor_execute", _before_execute)
+        event.listen(Engine, "after_cursor_execute", _after_execute)
+        _enabled = True
+
+
+def disable():
+    """Remove the statement hooks."""
+    global _enabled
+    if _enabled:
+        event.remove(Engine, "before_cursor_execute", _before_execute)
+        event.remove(Engine, "after_cursor_execute", _after_execute)
+        _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+@contextmanager
+def track(name, report=True):
+    """Collect statement stats for the code run inside the block.
+
+    Yields a CommandStats, or None when instrumentation is off. With
+    report true the summary is printed to stderr when the block ends.
+    """
+    if not _enabled:
+        yield None
+        return
+
+    stats = CommandStats(name)
+    previous = getattr(_current, "stats", None)
+    _current.stats = stats
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.wall_seconds = time.perf_counter() - started
+        _current.stats = previous
+        if report:
+            print_summary(stats)
+
+
+def print_summary(stats, file=None):
+    """Print a command's query count, timings and most frequent statements."""
+    file = file or sys.stderr
+    print(f"\n[profile] {stats.name}: {stats.queries} queries, "
+          f"{stats.query_seconds * 1000:.1f} ms in SQL, "
+          f"{stats.wall_seconds * 1000:.1f} ms total"
+          + (f", {stats.slow_queries} slow" if stats.slow_queries else ""), file=file)
+    for statement, count, seconds in stats.top_statements():
+        flag = "  <- repeated, possible N+1" if count >= REPEATED_STATEMENT_THRESHOLD else ""
+        print(f"  {count:6}x {seconds * 1000:9.1f} ms  {_one_line(statement, 120)}{flag}", file=file)
@@ -0,0 +1,15 @@
+from .records import DEFAULT_PAGE_SIZE, student_records_page, iter_student_record_pages
+from .stats import attendance_rate, student_rates, monthly_totals, daily_counts
+from .browse import table_counts, table_page, attendance_details_page
+from .runner import PARTITION_KINDS, plan_partitions, run_reports
+
+# The matrix module needs NumPy, which is optional, so it is only
+# imported when one of its names is used.
+_MATRIX_NAMES = ("AttendanceMatrix", "load_matrix")
+
+
+def __getattr__(name):
+    if name in _MATRIX_NAMES:
+        from . import matrix
+        return getattr(matrix, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
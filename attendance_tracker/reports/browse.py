@@ -0,0 +1,44 @@
+from sqlalchemy import func, select
+
+from ..models import Student, Attendance
+from ..storage import attendance_backend
+
+
+def table_counts(session):
+    """Return (student_count, attendance_count) without scanning attendance.
+
+    The attendance count is summed from the storage backend's per-student
+    counts: the monthly summary table with storage = rows, which is
+    O(students x months) instead of O(attendance rows), and popcounts with
+    bitmap.
+    """
+    students = session.execute(select(func.count(Student.id))).scalar()
+    counts = attendance_backend().student_counts(session)
+    return students, sum(present + absent for present, absent in counts.values())
+
+
+def table_page(session, model, page_size, after_id=None):
+    """Return up to page_size rows of a table with id > after_id, in id order.
+
+    Rows are tuples of the table's columns, id first. Walking by primary key
+    makes every page an index range scan, however deep it is.
+    """
+    table = model.__table__
+    query = select(*table.columns).order_by(table.c.id).limit(page_size)
+    if after_id is not None:
+        query = query.where(table.c.id > after_id)
+    return [tuple(row) for row in session.execute(query)]
+
+
+def attendance_details_page(session, page_size, after_id=None):
+    """Return (attendance id, student name, date, status) rows in id order."""
+    query = select(
+        Attendance.id, Student.name, Attendance.date, Attendance.status
+    ).join(
+        Student, Student.id == Attendance.student_id
+    ).order_by(
+        Attendance.id
+    ).limit(page_size)
+    if after_id is not None:
+        query = query.where(Attendance.id > after_id)
+    return [tuple(row) for row in session.execute(query)]
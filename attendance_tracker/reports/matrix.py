@@ -0,0 +1,183 @@
+"""Student x day attendance matrix for vectorized analytics.
+
+NumPy is optional: the rest of the application works without it, and
+load_matrix() raises ImportError with an install hint when it is missing.
+
+Cells hold the STATUS_CODES value for that student and day, or MISSING
+where nothing was recorded. Columns are the days that have at least one
+record, in date order, so weekends and holidays do not break streaks or
+count towards "the last M days".
+"""
+from itertools import islice
+
+from sqlalchemy import select
+
+from ..models import Student
+from ..storage import attendance_backend
+from ..utils import STATUS_CODES, date_to_day, day_to_date
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+MISSING = -1
+LOAD_CHUNK_SIZE = 100_000
+
+# 1970-01-01 (day 0) was a Thursday; shifting by 3 gives Monday == 0.
+_WEEKDAY_OFFSET = 3
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("attendance analytics need NumPy: pip install numpy")
+
+
+class AttendanceMatrix:
+    """Dense student x day matrix of status codes.
+
+    student_ids and days are sorted index arrays: row i belongs to student
+    student_ids[i] and column j to day number days[j] (see utils.date_to_day).
+    """
+
+    def __init__(self, codes, student_ids, days):
+        self.codes = codes
+        self.student_ids = student_ids
+        self.days = days
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def dates(self):
+        """Return the column dates as YYYY-MM-DD strings."""
+        return [day_to_date(int(day)) for day in self.days]
+
+    def rows_for(self, student_ids):
+        """Return row indexes for student IDs; raises KeyError for unknown IDs."""
+        wanted = np.asarray(student_ids, dtype=self.student_ids.dtype)
+        if not len(self.student_ids):
+            if len(wanted):
+                raise KeyError("unknown student ID")
+            return np.zeros(0, dtype=np.intp)
+        rows = np.searchsorted(self.student_ids, wanted)
+        rows = np.minimum(rows, len(self.student_ids) - 1)
+        if len(wanted) and not np.array_equal(self.student_ids[rows], wanted):
+            raise KeyError("unknown student ID")
+        return rows
+
+    def mask(self, status):
+        """Return a boolean matrix that is True where status was recorded."""
+        return self.codes == STATUS_CODES[status]
+
+    def counts(self):
+        """Return per-student (present, absent) count arrays."""
+        return self.mask("present").sum(axis=1), self.mask("absent").sum(axis=1)
+
+    def rates(self):
+        """Return each student's share of recorded days present (NaN with no records)."""
+        present, absent = self.counts()
+        total = present + absent
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, present / np.maximum(total, 1), np.nan)
+
+    def day_rates(self):
+        """Return the share of students present on each day (NaN with no records)."""
+        present = self.mask("present").sum(axis=0)
+        total = present + self.mask("absent").sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, present / np.maximum(total, 1), np.nan)
+
+    def weekday_rates(self):
+        """Return a length-7 array of attendance rates by weekday, Monday first."""
+        weekdays = (self.days + _WEEKDAY_OFFSET) % 7
+        present = np.bincount(weekdays, self.mask("present").sum(axis=0), minlength=7)
+        absent = np.bincount(weekdays, self.mask("absent").sum(axis=0), minlength=7)
+        total = present + absent
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, present / np.maximum(total, 1), np.nan)
+
+    def longest_streak(self, status="absent"):
+        """Return each student's longest run of consecutive days with status.
+
+        A day with no record for the student ends the run.
+        """
+        # One pass over the day columns: each student's current run grows
+        # on a hit and resets to zero otherwise.
+        columns = np.asfortranarray(self.mask(status))
+        run = np.zeros(self.shape[0], dtype=np.int32)
+        longest = np.zeros_like(run)
+        for day in range(self.shape[1]):
+            run += 1
+            run *= columns[:, day]
+            np.maximum(longest, run, out=longest)
+        return longest
+
+    def rolling_counts(self, window, status="absent"):
+        """Return how often status occurs in each trailing window of days.
+
+        Column j of the result covers days j .. j + window - 1.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        cumulative = np.zeros((self.shape[0], self.shape[1] + 1), dtype=np.int32)
+        np.cumsum(self.mask(status), axis=1, out=cumulative[:, 1:])
+        return cumulative[:, window:] - cumulative[:, :-window]
+
+    def absent_in_last(self, absences, days):
+        """Return IDs of students absent on at least `absences` of the last `days` days."""
+        recent = self.mask("absent")[:, -days:] if days else self.mask("absent")[:, :0]
+        return self.student_ids[recent.sum(axis=1) >= absences]
+
+    def below_rate(self, threshold):
+        """Return IDs of students whose attendance rate is below threshold."""
+        rates = self.rates()
+        with np.errstate(invalid="ignore"):
+            return self.student_ids[rates < threshold]
+
+
+def load_matrix(session, date_from=None, date_to=None):
+    """Load attendance from the configured storage backend into an AttendanceMatrix.
+
+    Every student gets a row, even with no records. Records come from the
+    backend's iter_day_records already encoded as day numbers and status
+    codes, and are converted to arrays in chunks and placed with index
+    arrays, so no ORM objects are built. Records of students no longer on
+    the roster are ignored.
+    """
+    _require_numpy()
+
+    student_ids = np.fromiter(
+        session.execute(select(Student.id).order_by(Student.id)).scalars(), dtype=np.int64
+    )
+    first_day = date_to_day(date_from) if date_from else None
+    last_day = date_to_day(date_to) if date_to else None
+
+    blocks = []
+    records = attendance_backend().iter_day_records(session, LOAD_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(records, LOAD_CHUNK_SIZE))
+        if not chunk:
+            break
+        block = np.fromiter(
+            (value for row in chunk for value in row), dtype=np.int32, count=3 * len(chunk)
+        ).reshape(-1, 3)
+        keep = np.ones(len(block), dtype=bool)
+        if first_day is not None:
+            keep &= block[:, 1] >= first_day
+        if last_day is not None:
+            keep &= block[:, 1] <= last_day
+        rows = np.minimum(np.searchsorted(student_ids, block[:, 0]), max(len(student_ids) - 1, 0))
+        if len(student_ids):
+            keep &= student_ids[rows] == block[:, 0]
+        else:
+            keep[:] = False
+        blocks.append(np.column_stack((rows[keep].astype(np.int32), block[keep, 1:])))
+
+    placed = np.concatenate(blocks) if blocks else np.zeros((0, 3), dtype=np.int32)
+    # One column per distinct recorded day, so a stray date years away
+    # from the rest adds a column rather than every day in between
+    days = np.unique(placed[:, 1]).astype(np.int64)
+    codes = np.full((len(student_ids), len(days)), MISSING, dtype=np.int8)
+    codes[placed[:, 0], np.searchsorted(days, placed[:, 1])] = placed[:, 2]
+    return AttendanceMatrix(codes, student_ids, days)
@@ -0,0 +1,75 @@
+from itertools import groupby
+
+from sqlalchemy import select
+
+from ..models import Student, Attendance
+
+DEFAULT_PAGE_SIZE = 20
+# Names only contain letters and spaces, so this sorts after any name
+# that starts with the upper bound of a name range.
+_NAME_CEILING = "\uffff"
+
+
+def _page_students(page_size, after_name=None, name_range=None, id_range=None):
+    """Build a query for one page of students ordered by name."""
+    query = select(Student.id, Student.name)
+    if after_name is not None:
+        query = query.where(Student.name > after_name)
+    if name_range:
+        low, high = name_range
+        if low:
+            query = query.where(Student.name >= low)
+        if high:
+            query = query.where(Student.name <= high + _NAME_CEILING)
+    if id_range:
+        low, high = id_range
+        if low is not None:
+            query = query.where(Student.id >= low)
+        if high is not None:
+            query = query.where(Student.id <= high)
+    return query.order_by(Student.name).limit(page_size)
+
+
+def student_records_page(session, page_size=DEFAULT_PAGE_SIZE, after_name=None,
+                         name_range=None, id_range=None):
+    """Return one page of students with their attendance records.
+
+    A single ordered join is streamed and grouped per student, so the cost
+    is one round trip per page instead of one query per student. Returns a
+    list of (student_id, name, [(date, status), ...]) tuples; students with
+    no records have an empty list. Pass the last name of a page as
+    after_name to fetch the next one.
+    """
+    students = _page_students(page_size, after_name, name_range, id_range).subquery()
+    query = select(
+        students.c.id, students.c.name, Attendance.date, Attendance.status
+    ).outerjoin(
+        Attendance, Attendance.student_id == students.c.id
+    ).order_by(
+        students.c.name, Attendance.date
+    )
+
+    page = []
+    rows = session.execute(query)
+    for (student_id, name), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        records = [(date, status) for _, _, date, status in group if date is not None]
+        page.append((student_id, name, records))
+    return page
+
+
+def iter_student_record_pages(session, page_size=DEFAULT_PAGE_SIZE,
+                              name_range=None, id_range=None, fetch_page=None):
+    """Yield successive pages from student_records_page until exhausted.
+
+    fetch_page replaces student_records_page, e.g. with a storage backend's.
+    """
+    fetch_page = fetch_page or student_records_page
+    after_name = None
+    while True:
+        page = fetch_page(session, page_size, after_name, name_range, id_range)
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        after_name = page[-1][1]
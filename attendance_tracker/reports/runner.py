@@ -0,0 +1,195 @@
+"""Generate the attendance export and per-student summary in parallel.
+
+The work is split into partitions (student ID ranges, months, or shard
+files with storage = sharded), and each partition runs in a
+ProcessPoolExecutor worker. Every worker opens its own read-only SQLite
+connection, writes its rows to a partial CSV and returns its per-student
+counts. The parent then joins the partial files in partition order and
+sums the counts into the summary.
+
+Workers read the attendance table directly, so reports need storage =
+rows, or storage = sharded partitioned by shard; other layouts are
+refused rather than reported as empty.
+"""
+import csv
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from sqlalchemy import select
+
+from ..models import AttendanceSummary, Student, get_engine, get_settings
+from ..transfer.exporter import CSV_HEADER
+from .stats import attendance_rate
+
+PARTITION_KINDS = ("students", "month", "shard")
+SUMMARY_HEADER = ("student_id", "name", "present", "absent", "rate")
+EXPORT_FILE = "attendance.csv"
+SUMMARY_FILE = "summary.csv"
+FETCH_SIZE = 10000
+
+# Per-process roster, so a worker reads the names once for all its partitions
+_worker_names = {}
+
+
+def _read_only(path):
+    """Open a SQLite file read-only, so a worker can never write or create it."""
+    return sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True)
+
+
+def default_partitioning():
+    """Return the partitioning used when none is given: "shard" for sharded storage."""
+    return "shard" if get_settings()["storage"] == "sharded" else "students"
+
+
+def _check_storage(by):
+    storage = get_settings()["storage"]
+    if by not in PARTITION_KINDS:
+        raise ValueError(f"Unknown partitioning {by!r}; use one of {', '.join(PARTITION_KINDS)}")
+    if storage == "sharded" and by != "shard":
+        raise ValueError("with storage = sharded the attendance rows are in the term shards; "
+                         "partition by shard")
+    if storage not in ("rows", "sharded"):
+        raise ValueError(f"parallel reports read the attendance table, which storage = {storage} "
+                         "does not use; run export or stats instead")
+
+
+def plan_partitions(session, by="students", count=8):
+    """Return a list of (label, database path, where clause, parameters).
+
+    "students" splits the roster into count contiguous ID ranges of equal
+    size, "month" gives one partition per month with records, and "shard"
+    one per term file of the sharded backend. Raises ValueError when the
+    configured storage keeps its rows elsewhere.
+    """
+    _check_storage(by)
+    database = os.path.abspath(get_engine().url.database)
+    if by == "students":
+        ids = session.execute(select(Student.id).order_by(Student.id)).scalars().all()
+        size = max(1, -(-len(ids) // count))
+        return [
+            (f"students {chunk[0]}-{chunk[-1]}", database,
+             "student_id BETWEEN ? AND ?", (chunk[0], chunk[-1]))
+            for chunk in (ids[start:start + size] for start in range(0, len(ids), size))
+        ]
+    if by == "month":
+        months = session.execute(
+            select(AttendanceSummary.month).distinct().order_by(AttendanceSummary.month)
+        ).scalars().all()
+        return [
+            (month, database, "date >= ? AND date <= ?", (month, month + "-~"))
+            for month in months
+        ]
+    if get_settings()["storage"] != "sharded":
+        raise ValueError("partitioning by shard needs storage = sharded")
+    from ..storage.sharded import get_router
+    router = get_router()
+    return [(str(term), router.path(term), "1 = 1", ()) for term in router.terms()]
+
+
+def run_partition(main_database, label, database, where, params, output_path):
+    """Write one partition's rows to output_path; returns (label, rows, counts).
+
+    Runs in a worker process. counts maps student_id to [present, absent].
+    """
+    names = _worker_names.get(main_database)
+    if names is None:
+        names_conn = _read_only(main_database)
+        try:
+            names = dict(names_conn.execute("SELECT id, name FROM students"))
+        finally:
+            names_conn.close()
+        _worker_names[main_database] = names
+
+    counts = {}
+    written = 0
+    conn = _read_only(database)
+    try:
+        cursor = conn.execute(
+            f"SELECT student_id, date, status FROM attendance WHERE {where} "
+            "ORDER BY student_id, date", params
+        )
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            while True:
+                chunk = cursor.fetchmany(FETCH_SIZE)
+                if not chunk:
+                    break
+                for student_id, date_str, status in chunk:
+                    name = names.get(student_id)
+                    if name is None:
+                        continue
+                    writer.writerow((name, date_str, status))
+                    entry = counts.setdefault(student_id, [0, 0])
+                    if status == "present":
+                        entry[0] += 1
+                    elif status == "absent":
+                        entry[1] += 1
+                    written += 1
+    finally:
+        conn.close()
+    return label, written, counts
+
+
+def run_reports(session, output_dir, by=None, workers=None, partitions=None):
+    """Build attendance.csv and summary.csv in output_dir with a process pool.
+
+    by defaults to default_partitioning(). Returns a dict with the output paths, row and partition counts, worker
+    count and elapsed seconds. Rows in attendance.csv are grouped by
+    partition, and by student and date within each one.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    by = by or default_partitioning()
+    plan = plan_partitions(session, by, partitions or workers * 4)
+    names = dict(session.execute(select(Student.id, Student.name)).all())
+    main_database = os.path.abspath(get_engine().url.database)
+
+    os.makedirs(output_dir, exist_ok=True)
+    export_path = os.path.join(output_dir, EXPORT_FILE)
+    summary_path = os.path.join(output_dir, SUMMARY_FILE)
+
+    totals = {}
+    rows = 0
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+        partial_paths = [os.path.join(tmp, f"part{number:05}.csv") for number in range(len(plan))]
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(run_partition, main_database, label, database, where, params, path)
+                for (label, database, where, params), path in zip(plan, partial_paths)
+            ]
+            for future in futures:
+                _, written, counts = future.result()
+                rows += written
+                for student_id, (present, absent) in counts.items():
+                    entry = totals.setdefault(student_id, [0, 0])
+                    entry[0] += present
+                    entry[1] += absent
+
+        with open(export_path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerow(CSV_HEADER)
+            for path in partial_paths:
+                with open(path, encoding="utf-8", newline="") as part:
+                    shutil.copyfileobj(part, f)
+
+    with open(summary_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        for student_id in sorted(names):
+            present, absent = totals.get(student_id, (0, 0))
+            rate = attendance_rate(present, absent)
+            writer.writerow((student_id, names[student_id], present, absent,
+                             "" if rate is None else f"{rate:.4f}"))
+
+    return {
+        "export": export_path,
+        "summary": summary_path,
+        "rows": rows,
+        "partitions": len(plan),
+        "workers": workers,
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,61 @@
+import heapq
+
+from sqlalchemy import select
+
+from ..models import Student
+from ..storage import attendance_backend
+
+
+def attendance_rate(present, absent):
+    """Return the share of recorded days present, or None with no records."""
+    total = present + absent
+    return present / total if total else None
+
+
+def _month_filter(column, month_from, month_to):
+    """Build conditions restricting a YYYY-MM or YYYY-MM-DD column to a month range."""
+    conditions = []
+    if month_from:
+        conditions.append(column >= month_from)
+    if month_to:
+        # "YYYY-MM-~" sorts after every date in that month
+        conditions.append(column <= month_to + "-~")
+    return conditions
+
+
+def _rate_order(row):
+    """Sort key for (id, name, present, absent, rate): lowest rate first, None last."""
+    rate = row[4]
+    return rate is None, rate or 0.0, row[1]
+
+
+def student_rates(session, month_from=None, month_to=None, limit=None):
+    """Return per-student (id, name, present, absent, rate), lowest rate first.
+
+    Counts come from the storage backend: the monthly summary table with
+    storage = rows and popcounts with bitmap, so the cost grows with the
+    number of students and months rather than the number of attendance
+    rows. Students with no records in the range come last with rate None.
+    """
+    counts = attendance_backend().student_counts(session, month_from, month_to)
+    rates = []
+    for student_id, name in session.execute(select(Student.id, Student.name)):
+        present, absent = counts.get(student_id, (0, 0))
+        rates.append((student_id, name, present, absent, attendance_rate(present, absent)))
+    if limit:
+        return heapq.nsmallest(limit, rates, key=_rate_order)
+    return sorted(rates, key=_rate_order)
+
+
+def monthly_totals(session, month_from=None, month_to=None):
+    """Return (month, present, absent, rate) for every month with records."""
+    counts = attendance_backend().monthly_counts(session, month_from, month_to)
+    return [
+        (month, p, a, attendance_rate(p, a))
+        for month, (p, a) in sorted(counts.items())
+    ]
+
+
+def daily_counts(session, month_from=None, month_to=None):
+    """Return (date, present, absent) for every date in the month range."""
+    return attendance_backend().daily_counts(session, month_from, month_to)
@@ -0,0 +1,121 @@
+import os
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from .models import Session, Student, RosterVersion, get_engine
+
+
+class RosterCache:
+    """Process-level cache of the student roster.
+
+    Holds an id -> name map and a name-sorted list of (name, id) pairs.
+    The cache is dropped by invalidate(), which add_student and the bulk
+    import call, and is revalidated whenever the database file (or its WAL)
+    changes on disk: the roster_version counter, which triggers bump on
+    every insert, update and delete on students, decides whether the
+    roster itself changed or only other tables were written. After the
+    engine is pointed at another database file the roster is always
+    reloaded, since counters of different files cannot be compared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = None
+        self._sorted = None
+        self._file_signature = None
+        self._roster_signature = None
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """Drop the cached roster so the next access reloads it."""
+        with self._lock:
+            self._names = None
+            self._sorted = None
+
+    def names(self):
+        """Return the id -> name map."""
+        return self._load()[0]
+
+    def sorted_names(self):
+        """Return (name, id) pairs sorted by name."""
+        return self._load()[1]
+
+    def get_name(self, student_id):
+        """Return the name for a student ID, or None if there is no such student."""
+        return self.names().get(student_id)
+
+    def stats(self):
+        """Return hit and miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _load(self):
+        with self._lock:
+            file_signature = _file_signature()
+            if self._names is not None:
+                if file_signature == self._file_signature:
+                    self.hits += 1
+                    return self._names, self._sorted
+                # The version is only comparable within one database file
+                same_database = (file_signature is not None and self._file_signature is not None
+                                 and file_signature[0] == self._file_signature[0])
+                roster_signature = _roster_signature() if same_database else None
+                if roster_signature is not None and roster_signature == self._roster_signature:
+                    self._file_signature = file_signature
+                    self.hits += 1
+                    return self._names, self._sorted
+
+            self.misses += 1
+            # Read the version before the roster, so a change in between
+            # causes a reload next time rather than being missed
+            roster_signature = _roster_signature()
+            session = Session()
+            try:
+                rows = session.execute(select(Student.id, Student.name)).all()
+            finally:
+                session.close()
+            self._names = dict(rows)
+            self._sorted = sorted((name, student_id) for student_id, name in rows)
+            self._roster_signature = roster_signature
+            self._file_signature = file_signature
+            return self._names, self._sorted
+
+
+def _file_signature():
+    """Return ((path, inode), (mtime, size) of the file, (mtime, size) of its WAL).
+
+    The first item identifies the database file, so a file recreated at
+    the same path counts as another database.
+    """
+    path = get_engine().url.database
+    if not path or path == ":memory:":
+        return None
+    path = os.path.abspath(path)
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        inode = None
+    signature = [(path, inode)]
+    for name in (path, path + "-wal"):
+        try:
+            stat = os.stat(name)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _roster_signature():
+    """Return the roster_version counter, or None if the database has none yet."""
+    session = Session()
+    try:
+        return session.execute(select(RosterVersion.version)).scalar()
+    except OperationalError:
+        return None
+    finally:
+        session.close()
+
+
+roster_cache = RosterCache()
@@ -0,0 +1,124 @@
+"""Find students by name through the students_fts index.
+
+search_students matches word prefixes: every word of the query must start
+a word of the name, in any order and ignoring case and accents, so "jo
+sm" finds "John Smith" and "Sam Jones". fuzzy_search_students tolerates
+typos by looking up indexed words close to each query word. Without FTS5
+(see models.name_index) both scan the cached roster instead.
+"""
+import difflib
+import re
+import unicodedata
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from .roster import roster_cache
+
+DEFAULT_LIMIT = 10
+FUZZY_TERMS_PER_WORD = 5
+FUZZY_CUTOFF = 0.6
+FUZZY_CANDIDATES = 200
+
+_PREFIX_SQL = text("""
+    SELECT rowid, name FROM students_fts
+    WHERE students_fts MATCH :match
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+_TERMS_SQL = text("""
+    SELECT term FROM students_fts_terms
+    WHERE term >= :low AND term < :high
+""")
+
+
+def _fold(value):
+    """Lower-case value and strip accents, as the index tokenizer does."""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _words(query):
+    return re.findall(r"\w+", _fold(query))
+
+
+def _quote(term, prefix=False):
+    return '"' + term.replace('"', '""') + '"' + ("*" if prefix else "")
+
+
+def _exact_first(rows, query):
+    """Move names equal to query, ignoring case and accents, to the front."""
+    folded = " ".join(_words(query))
+    return sorted(rows, key=lambda row: " ".join(_words(row[1])) != folded)
+
+
+def search_students(session, query, limit=DEFAULT_LIMIT):
+    """Return up to limit (id, name) pairs whose name words start with query's words.
+
+    Exact matches come first, then shorter names. An empty query matches
+    nothing.
+    """
+    words = _words(query)
+    if not words:
+        return []
+    match = " AND ".join(_quote(word, prefix=True) for word in words)
+    try:
+        rows = session.execute(_PREFIX_SQL, {"match": match, "limit": limit}).all()
+    except OperationalError:
+        return _exact_first(_scan(words, limit), query)
+    return _exact_first([tuple(row) for row in rows], query)
+
+
+def fuzzy_search_students(session, query, limit=DEFAULT_LIMIT):
+    """Return up to limit (id, name) pairs with names close to query, closest first.
+
+    Each query word is replaced by the indexed words most similar to it
+    that share its first letter, so a typo in the first letter is not
+    corrected.
+    """
+    words = _words(query)
+    if not words:
+        return []
+    try:
+        alternatives = []
+        for word in words:
+            terms = session.execute(_TERMS_SQL, {"low": word[0], "high": word[0] + "\U0010ffff"}).scalars().all()
+            close = difflib.get_close_matches(word, terms, FUZZY_TERMS_PER_WORD, FUZZY_CUTOFF)
+            if not close:
+                return []
+            alternatives.append(close)
+        match = " AND ".join("(" + " OR ".join(_quote(term) for term in close) + ")"
+                             for close in alternatives)
+        rows = session.execute(_PREFIX_SQL, {"match": match, "limit": FUZZY_CANDIDATES}).all()
+    except OperationalError:
+        rows = roster_cache.sorted_names()
+        rows = [(student_id, name) for name, student_id in rows]
+
+    scored = [(_similarity(words, name), name, student_id) for student_id, name in rows]
+    scored = [entry for entry in scored if entry[0] >= FUZZY_CUTOFF]
+    scored.sort(key=lambda entry: (-entry[0], entry[1]))
+    return [(student_id, name) for _, name, student_id in scored[:limit]]
+
+
+def _similarity(words, name):
+    """Mean, over query words, of the best match ratio against the name's words."""
+    name_words = _words(name)
+    if not name_words:
+        return 0.0
+    return sum(
+        max(difflib.SequenceMatcher(None, word, name_word).ratio() for name_word in name_words)
+        for word in words
+    ) / len(words)
+
+
+def _scan(words, limit):
+    """Prefix search over the cached roster, for databases without the index."""
+    found = []
+    for name, student_id in roster_cache.sorted_names():
+        name_words = _words(name)
+        if all(any(name_word.startswith(word) for name_word in name_words) for word in words):
+            found.append((student_id, name))
+            if len(found) == limit:
+                break
+    return found
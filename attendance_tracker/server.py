@@ -0,0 +1,516 @@
+"""JSON HTTP API for submitting and reading attendance from one central process.
+
+Start it with: python -m attendance_tracker serve --port 8000 --workers 8
+
+Endpoints:
+    GET  /students?after=NAME&limit=N      roster page, sorted by name
+    GET  /students/search?q=TEXT&limit=N   students whose name words start with TEXT,
+                                           or close matches when none do
+    POST /students                         {"name": "..."} or {"names": [...]}
+    POST /attendance                       {"student_id", "date", "status", "overwrite"}
+    POST /attendance/bulk                  {"date", "absent_ids", "overwrite"} marks everyone,
+                                           or {"records": [[id, date, status], ...]}
+    GET  /attendance?student_id=&from=&to=&after_id=&after_date=&limit=
+    GET  /stats?month=YYYY-MM
+    GET  /export                           streams the full CSV export
+    GET  /metrics                          request counts and latency percentiles
+
+Requests are served by a fixed thread pool. Each worker thread uses its own
+session from models.ScopedSession, and the engine's connection pool is
+sized to match the workers. Writes go through models.run_write, so a
+locked database is retried and only reported (503) if it stays locked. With
+group_commit, POST /attendance marks go through a WriteBuffer and are
+committed in batches instead of one transaction per request. Attendance
+is read and written through storage.attendance_backend(), so every path,
+GET /stats included, uses the configured storage.
+
+Connections are kept alive between requests, but one that stays idle for
+idle_timeout seconds is closed, so idle clients cannot hold every worker.
+"""
+import csv
+import io
+import json
+import signal
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import insert
+
+from .models import (
+    ScopedSession, Student, configure_engine, create_schema, run_write, WriteConflict
+)
+from .marking import mark_date
+from .roster import roster_cache
+from .search import search_students, fuzzy_search_students, DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT
+from .reports import monthly_totals
+from .storage import attendance_backend
+from .transfer.exporter import CSV_HEADER
+from .write_buffer import WriteBuffer, DEFAULT_MAX_BATCH, DEFAULT_MAX_DELAY
+from .utils import validate_date, validate_month, validate_name, format_date, percentile, STATUS_CODES
+
+DEFAULT_WORKERS = 8
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+LATENCY_WINDOW = 10000
+DEFAULT_IDLE_TIMEOUT = 5.0
+
+db_session = ScopedSession
+# Set by make_server when group commit is on
+write_buffer = None
+
+
+class ApiError(Exception):
+    """An error returned to the client as {"error": message}."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class LatencyStats:
+    """Per-endpoint request counts and a sliding window of latencies."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._latencies = defaultdict(lambda: deque(maxlen=self._window))
+        self._counts = defaultdict(int)
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._latencies[endpoint].append(seconds * 1000)
+            self._counts[endpoint] += 1
+
+    def snapshot(self):
+        """Return {endpoint: {count, p50_ms, p90_ms, p99_ms, max_ms}}."""
+        with self._lock:
+            data = {name: sorted(values) for name, values in self._latencies.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts[name],
+                "p50_ms": round(percentile(values, 50), 3),
+                "p90_ms": round(percentile(values, 90), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+            for name, values in data.items() if values
+        }
+
+
+def _int_param(params, name, default=None, maximum=None):
+    value = params.get(name, [None])[0]
+    if value in (None, ""):
+        return default
+    if not value.isdigit():
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' must be a non-negative integer")
+    value = int(value)
+    return min(value, maximum) if maximum else value
+
+
+def _limit_param(params, default, maximum):
+    limit = _int_param(params, "limit", default, maximum)
+    if limit < 1:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "'limit' must be at least 1")
+    return limit
+
+
+def _date_param(value, name):
+    date_obj, error = validate_date(value or "", allow_empty=False)
+    if error:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}': {error}")
+    return format_date(date_obj)
+
+
+def _status_param(value):
+    status = str(value or "").lower()
+    if status not in STATUS_CODES:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "'status' must be 'present' or 'absent'")
+    return status
+
+
+def _overwrite_param(body):
+    overwrite = body.get("overwrite", False)
+    if not isinstance(overwrite, bool):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'overwrite' must be true or false, not {overwrite!r}")
+    return overwrite
+
+
+def _is_int(value):
+    # JSON true and false arrive as bool, which is a subclass of int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _student_id_param(value):
+    if not _is_int(value):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"student ID must be an integer, not {value!r}")
+    if roster_cache.get_name(value) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"student ID {value!r} not found")
+    return value
+
+
+# ---------- Endpoints ----------
+
+def list_students(params, body):
+    """Return one page of the roster ordered by name."""
+    limit = _limit_param(params, DEFAULT_LIMIT, MAX_LIMIT)
+    after = params.get("after", [""])[0]
+    roster = roster_cache.sorted_names()
+    start = bisect_right(roster, (after, float("inf"))) if after else 0
+    page = roster[start:start + limit]
+    return {
+        "students": [{"id": student_id, "name": name} for name, student_id in page],
+        "next_after": page[-1][0] if len(page) == limit else None,
+        "total": len(roster),
+    }
+
+
+def find_students(params, body):
+    """Search the name index; falls back to fuzzy matches when nothing starts with q."""
+    query = params.get("q", [""])[0].strip()
+    if not query:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "give the name to search for as 'q'")
+    limit = _limit_param(params, DEFAULT_SEARCH_LIMIT, DEFAULT_LIMIT)
+    session = db_session()
+    matches = search_students(session, query, limit)
+    fuzzy = not matches
+    if fuzzy:
+        matches = fuzzy_search_students(session, query, limit)
+    return {
+        "students": [{"id": student_id, "name": name} for student_id, name in matches],
+        "fuzzy": fuzzy,
+    }
+
+
+def add_students(params, body):
+    """Add one or more students; duplicates are reported, not fatal."""
+    if "names" in body:
+        names = body["names"]
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'names' must be a list of strings")
+    elif "name" in body:
+        if not isinstance(body["name"], str):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'name' must be a string")
+        names = [body["name"]]
+    else:
+        names = []
+    if not names:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "give 'name' or 'names'")
+
+    valid_names, invalid = [], []
+    for name in names:
+        name = name.strip()
+        valid, error = validate_name(name)
+        if valid:
+            valid_names.append(name)
+        else:
+            invalid.append({"name": name, "error": error})
+
+    def insert_names(session):
+        added, duplicates = [], []
+        for name in valid_names:
+            result = session.execute(
+                insert(Student.__table__).prefix_with("OR IGNORE").values(name=name)
+            )
+            if result.rowcount:
+                added.append({"id": result.inserted_primary_key[0], "name": name})
+            else:
+                duplicates.append(name)
+        return added, duplicates
+
+    added, duplicates = run_write(insert_names) if valid_names else ([], [])
+    if added:
+        roster_cache.invalidate()
+    return {"added": added, "duplicates": duplicates, "invalid": invalid}
+
+
+def mark_one(params, body):
+    """Mark one student for one date."""
+    student_id = _student_id_param(body.get("student_id"))
+    date_str = _date_param(body.get("date"), "date")
+    status = _status_param(body.get("status"))
+    overwrite = _overwrite_param(body)
+
+    if write_buffer is not None:
+        marked = write_buffer.mark(student_id, date_str, status, overwrite)
+    else:
+        record = (student_id, date_str, status)
+        marked, _ = run_write(
+            lambda session: attendance_backend().mark_records(session, [record], overwrite)
+        )
+    if not marked:
+        raise ApiError(HTTPStatus.CONFLICT, "Attendance already recorded for this date.")
+    return {"marked": 1}
+
+
+def mark_bulk(params, body):
+    """Mark a list of records, or every student for one date."""
+    overwrite = _overwrite_param(body)
+
+    if "records" in body:
+        records = []
+        for item in body["records"]:
+            if not isinstance(item, (list, tuple)) or len(item) != 3:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "each record must be [student_id, date, status]")
+            student_id, date_str, status = item
+            records.append((_student_id_param(student_id), _date_param(date_str, "date"),
+                            _status_param(status)))
+        marked, skipped = run_write(
+            lambda session: attendance_backend().mark_records(session, records, overwrite)
+        )
+        return {"marked": marked, "skipped": skipped}
+
+    date_str = _date_param(body.get("date"), "date")
+    absent_ids = body.get("absent_ids") or []
+    if not isinstance(absent_ids, list) or not all(_is_int(i) for i in absent_ids):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "'absent_ids' must be a list of integers")
+    unknown_ids = sorted(set(absent_ids) - roster_cache.names().keys())
+    if unknown_ids:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"absent student IDs not found: {unknown_ids}")
+    marked, skipped, _ = run_write(
+        lambda session: mark_date(session, date_str, absent_ids, overwrite=overwrite)
+    )
+    return {"marked": marked, "skipped": skipped}
+
+
+def query_attendance(params, body):
+    """Return attendance records in (student_id, date) order with a keyset cursor."""
+    limit = _limit_param(params, DEFAULT_LIMIT * 10, MAX_LIMIT)
+    student_id = _int_param(params, "student_id")
+    after_id = _int_param(params, "after_id")
+    after_date = params.get("after_date", [""])[0]
+    date_from = _date_param(params["from"][0], "from") if "from" in params else None
+    date_to = _date_param(params["to"][0], "to") if "to" in params else None
+    after = (after_id, after_date) if after_id is not None else None
+
+    rows = attendance_backend().attendance_page(
+        db_session(), limit, student_id, date_from, date_to, after
+    )
+    records = [{"student_id": sid, "date": date, "status": status} for sid, date, status in rows]
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = {"after_id": rows[-1][0], "after_date": rows[-1][1]}
+    return {"records": records, "next": next_cursor}
+
+
+def get_stats(params, body):
+    """Return monthly present/absent totals."""
+    month = params.get("month", [None])[0]
+    if month:
+        month, error = validate_month(month)
+        if error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, error)
+    totals = monthly_totals(db_session(), month, month)
+    return {"months": [
+        {"month": m, "present": p, "absent": a, "rate": rate} for m, p, a, rate in totals
+    ]}
+
+
+ROUTES = {
+    ("GET", "/students"): list_students,
+    ("GET", "/students/search"): find_students,
+    ("POST", "/students"): add_students,
+    ("POST", "/attendance"): mark_one,
+    ("POST", "/attendance/bulk"): mark_bulk,
+    ("GET", "/attendance"): query_attendance,
+    ("GET", "/stats"): get_stats,
+}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "AttendanceTracker/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # The socket timeout bounds how long a kept-alive connection may sit
+        # idle; handle_one_request closes the connection when it expires.
+        self.timeout = self.server.idle_timeout
+        super().setup()
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        endpoint = f"{method} {url.path}"
+        try:
+            if method == "GET" and url.path == "/metrics":
+                metrics = self.server.latency.snapshot()
+                if write_buffer is not None:
+                    metrics["write_buffer"] = write_buffer.stats()
+                self._send_json(HTTPStatus.OK, metrics)
+            elif method == "GET" and url.path == "/export":
+                self._stream_export()
+            else:
+                handler = ROUTES.get((method, url.path))
+                if handler is None:
+                    endpoint = "unknown"
+                    raise ApiError(HTTPStatus.NOT_FOUND, f"no endpoint {method} {url.path}")
+                result = handler(parse_qs(url.query), self._read_json() if method == "POST" else {})
+                self._send_json(HTTPStatus.OK, result)
+        except ApiError as e:
+            db_session.rollback()
+            self._send_json(e.status, {"error": e.message})
+        except WriteConflict as e:
+            db_session.rollback()
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+        except Exception as e:
+            db_session.rollback()
+            self.log_error("error handling %s: %r", endpoint, e)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"})
+        finally:
+            db_session.remove()
+            self.server.latency.record(endpoint, time.perf_counter() - started)
+
+    def _read_json(self):
+        length = self.headers.get("Content-Length") or "0"
+        if not length.isdigit():
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer")
+        length = int(length)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body must be JSON") from None
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        return body
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_export(self):
+        """Stream the CSV export with chunked transfer encoding.
+
+        Once the headers are sent an error cannot become an error response,
+        so the stream is cut off without its final chunk and the connection
+        closed; clients see an incomplete body rather than a truncated file.
+        """
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        try:
+            for row in attendance_backend().iter_attendance_rows(db_session()):
+                writer.writerow(row)
+                if buffer.tell() >= 65536:
+                    self._write_chunk(buffer.getvalue().encode("utf-8"))
+                    buffer.seek(0)
+                    buffer.truncate()
+            self._write_chunk(buffer.getvalue().encode("utf-8"))
+        except Exception as e:
+            db_session.rollback()
+            self.close_connection = True
+            self.log_error("export aborted: %r", e)
+            return
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each connection to a fixed-size thread pool."""
+
+    # Kiosks connect in bursts; the socketserver default backlog is only 5
+    request_queue_size = 128
+
+    def __init__(self, address, handler, workers=DEFAULT_WORKERS, quiet=False,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        super().__init__(address, handler)
+        self.idle_timeout = idle_timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="attendance-http")
+        self.latency = LatencyStats()
+        self.quiet = quiet
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_in_worker, request, client_address)
+
+    def _process_in_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        global write_buffer
+        super().server_close()
+        self.pool.shutdown(wait=True)
+        if write_buffer is not None:
+            write_buffer.close()
+            self.write_buffer_stats = write_buffer.stats()
+            write_buffer = None
+
+
+def make_server(host="127.0.0.1", port=8000, workers=DEFAULT_WORKERS, quiet=False,
+                group_commit=False, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+                idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Create the API server, sizing the connection pool to the workers.
+
+    A connection idle for idle_timeout seconds is closed. With group_commit, single marks are queued in a WriteBuffer that
+    flushes max_batch marks or after max_delay seconds, whichever is first.
+    """
+    global write_buffer
+    # The write buffer's flush thread needs a connection of its own
+    configure_engine(pool_size=workers + (1 if group_commit else 0), max_overflow=0)
+    create_schema()
+    server = PooledHTTPServer((host, port), ApiHandler, workers, quiet, idle_timeout)
+    server.write_buffer_stats = None
+    if group_commit:
+        write_buffer = WriteBuffer(max_batch, max_delay)
+    return server
+
+
+def _stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(host="127.0.0.1", port=8000, workers=DEFAULT_WORKERS, quiet=False,
+          group_commit=False, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+          idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Run the API server until interrupted or sent SIGTERM."""
+    server = make_server(host, port, workers, quiet, group_commit, max_batch, max_delay, idle_timeout)
+    signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    print(f"Serving attendance API on http://{host}:{server.server_port} with {workers} workers"
+          + (f", group commit up to {max_batch} marks / {max_delay * 1000:g} ms" if group_commit else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        latency = server.latency.snapshot()
+        for endpoint, stats in sorted(latency.items()):
+            print(f"{endpoint:28} {stats['count']:8} requests  p50 {stats['p50_ms']:.1f} ms  "
+                  f"p99 {stats['p99_ms']:.1f} ms")
+        buffered = server.write_buffer_stats
+        if buffered and buffered["flushes"]:
+            print(f"Group commit: {buffered['records']} marks in {buffered['flushes']} flushes "
+                  f"(mean {buffered['batch_mean']}, max {buffered['batch_max']}), "
+                  f"flush p50 {buffered['flush_p50_ms']:.1f} ms, wait p99 {buffered['wait_p99_ms']:.1f} ms")
@@ -0,0 +1,29 @@
+BACKENDS = ("rows", "bitmap", "compact", "sharded")
+
+
+def attendance_backend(name=None):
+    """Return the attendance backend module named by the storage setting.
+
+    All backend modules provide mark_records, mark_all,
+    student_records_page, attendance_page, iter_attendance_rows,
+    iter_day_records, attendance_counts, student_counts, monthly_counts
+    and daily_counts. They are imported here rather than at module level
+    because they depend on marking, reports and transfer, which import
+    this package.
+    """
+    if name is None:
+        from ..models import get_settings
+        name = get_settings()["storage"]
+    if name == "rows":
+        from . import rows
+        return rows
+    if name == "bitmap":
+        from . import bitmap
+        return bitmap
+    if name == "compact":
+        from . import compact
+        return compact
+    if name == "sharded":
+        from . import sharded
+        return sharded
+    raise ValueError(f"Unknown storage backend {name!r}; use one of {', '.join(BACKENDS)}")
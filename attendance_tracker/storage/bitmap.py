@@ -0,0 +1,451 @@
+"""Attendance kept as one pair of bitsets per student and term.
+
+This module has the same functions as storage.rows (mark_records,
+mark_all, student_records_page, attendance_page, iter_attendance_rows,
+iter_day_records, attendance_counts, student_counts, monthly_counts,
+daily_counts), so the commands can use either backend. A term is a
+calendar year, and each term row holds two TERM_BYTES-long BLOBs: the
+days attendance was recorded and the days the student was present.
+Counts and rates are popcounts of those BLOBs.
+"""
+from datetime import date
+from functools import lru_cache
+from itertools import groupby
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models import AttendanceBitmap, Student, get_engine
+from ..reports.records import _page_students
+from ..utils import STATUS_CODES, date_to_day, day_to_date
+
+TERM_DAYS = 366
+TERM_BYTES = (TERM_DAYS + 7) // 8
+# Term rows built in memory before migrate_to_bitmap writes them out
+MIGRATE_FLUSH_TERMS = 5000
+# Term rows fetched at a time by attendance_page
+PAGE_TERM_ROWS = 500
+
+_MIGRATE_SQL = """
+    SELECT student_id,
+           CAST(strftime('%Y', date) AS INTEGER),
+           CAST(strftime('%j', date) AS INTEGER) - 1,
+           status = 'present'
+    FROM attendance
+    WHERE strftime('%j', date) IS NOT NULL
+      AND status IN ('present', 'absent')
+    ORDER BY student_id, date
+"""
+
+if hasattr(int, "bit_count"):
+    def _bit_count(value):
+        return value.bit_count()
+else:  # Python < 3.10
+    def _bit_count(value):
+        return bin(value).count("1")
+
+
+def _popcount(blob):
+    return _bit_count(int.from_bytes(blob, "little"))
+
+
+def term_start(term):
+    """Return the day number of the first day of a term."""
+    return date_to_day(date(term, 1, 1))
+
+
+def term_bit(date_str):
+    """Return (term, bit) for a YYYY-MM-DD date."""
+    term = int(date_str[:4])
+    return term, date_to_day(date_str) - term_start(term)
+
+
+@lru_cache(maxsize=None)
+def _month_masks(term):
+    """Return ((month, mask), ...) where mask selects a term's days in that month."""
+    start = date(term, 1, 1).toordinal()
+    bounds = [date(term, month, 1).toordinal() - start for month in range(1, 13)]
+    bounds.append(date(term + 1, 1, 1).toordinal() - start)
+    return tuple(
+        (f"{term}-{month:02d}", (1 << bounds[month]) - (1 << bounds[month - 1]))
+        for month in range(1, 13)
+    )
+
+
+def _term_months(term, month_from, month_to):
+    """Return the (month, mask) pairs of a term that fall in the month range."""
+    return [
+        (month, mask) for month, mask in _month_masks(term)
+        if (not month_from or month >= month_from) and (not month_to or month <= month_to)
+    ]
+
+
+def _term_range_query(query, month_from, month_to):
+    """Restrict a query on AttendanceBitmap to the terms a month range touches."""
+    if month_from:
+        query = query.where(AttendanceBitmap.term >= int(month_from[:4]))
+    if month_to:
+        query = query.where(AttendanceBitmap.term <= int(month_to[:4]))
+    return query
+
+
+def _has_bit(blob, bit):
+    return blob[bit >> 3] >> (bit & 7) & 1
+
+
+def _set_bit(blob, bit, on):
+    if on:
+        blob[bit >> 3] |= 1 << (bit & 7)
+    else:
+        blob[bit >> 3] &= ~(1 << (bit & 7)) & 0xFF
+
+
+def _set_bits(blob):
+    """Yield the positions of the set bits in a bitset, lowest first."""
+    for index, byte in enumerate(blob):
+        if not byte:
+            continue
+        for offset in range(8):
+            if byte >> offset & 1:
+                yield index * 8 + offset
+
+
+def decode_term(term, present, recorded):
+    """Yield (date, status) for every recorded day of a term, in date order."""
+    start = term_start(term)
+    for bit in _set_bits(recorded):
+        status = "present" if _has_bit(present, bit) else "absent"
+        yield day_to_date(start + bit), status
+
+
+def _upsert(executor, rows):
+    """Write {student_id, term, present, recorded} rows in one executemany.
+
+    executor is a Session or Connection.
+    """
+    if not rows:
+        return
+    stmt = sqlite_insert(AttendanceBitmap.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "term"],
+        set_={"present": stmt.excluded.present, "recorded": stmt.excluded.recorded},
+    )
+    executor.execute(stmt, rows)
+
+
+def _load_terms(session, keys):
+    """Return {(student_id, term): (present, recorded)} as bytearrays for the keys that exist."""
+    terms = {}
+    for term, group in groupby(sorted(keys, key=lambda key: key[1]), key=lambda key: key[1]):
+        student_ids = [student_id for student_id, _ in group]
+        rows = session.execute(
+            select(AttendanceBitmap.student_id, AttendanceBitmap.present, AttendanceBitmap.recorded)
+            .where(AttendanceBitmap.term == term, AttendanceBitmap.student_id.in_(student_ids))
+        )
+        for student_id, present, recorded in rows:
+            terms[student_id, term] = (bytearray(present), bytearray(recorded))
+    return terms
+
+
+def _apply(terms, key, bit, status, overwrite):
+    """Set one day in a term's bitsets; returns False if it was kept as recorded."""
+    if key not in terms:
+        terms[key] = (bytearray(TERM_BYTES), bytearray(TERM_BYTES))
+    present, recorded = terms[key]
+    if _has_bit(recorded, bit) and not overwrite:
+        return False
+    _set_bit(recorded, bit, True)
+    _set_bit(present, bit, status == "present")
+    return True
+
+
+def mark_records(session, records, overwrite=False):
+    """Record validated (student_id, date, status) records.
+
+    The affected term rows are read once, updated in memory and written
+    back in one executemany. Existing days are skipped, or replaced when
+    overwrite is true. The caller owns the transaction. Returns
+    (marked, skipped).
+    """
+    marks = [(student_id, *term_bit(date_str), status) for student_id, date_str, status in records]
+    terms = _load_terms(session, {(student_id, term) for student_id, term, _, _ in marks})
+
+    marked = skipped = 0
+    changed = set()
+    for student_id, term, bit, status in marks:
+        if _apply(terms, (student_id, term), bit, status, overwrite):
+            marked += 1
+            changed.add((student_id, term))
+        else:
+            skipped += 1
+
+    _upsert(session, [
+        {"student_id": student_id, "term": term,
+         "present": bytes(terms[student_id, term][0]), "recorded": bytes(terms[student_id, term][1])}
+        for student_id, term in changed
+    ])
+    return marked, skipped
+
+
+def mark_all(session, date_str, absent_ids=(), overwrite=False):
+    """Mark every student for one date, reading and writing each term row once.
+
+    Students listed in absent_ids are marked absent and everyone else
+    present. The caller owns the transaction. Returns
+    (marked, skipped, unknown_ids), as marking.mark_all does.
+    """
+    absent_ids = set(absent_ids)
+    term, bit = term_bit(date_str)
+    student_ids = session.execute(select(Student.id)).scalars().all()
+
+    terms = {
+        (student_id, term): (bytearray(present), bytearray(recorded))
+        for student_id, present, recorded in session.execute(
+            select(AttendanceBitmap.student_id, AttendanceBitmap.present, AttendanceBitmap.recorded)
+            .where(AttendanceBitmap.term == term)
+        )
+    }
+
+    rows = []
+    for student_id in student_ids:
+        status = "absent" if student_id in absent_ids else "present"
+        if _apply(terms, (student_id, term), bit, status, overwrite):
+            present, recorded = terms[student_id, term]
+            rows.append({"student_id": student_id, "term": term,
+                         "present": bytes(present), "recorded": bytes(recorded)})
+    _upsert(session, rows)
+
+    unknown_ids = absent_ids - set(student_ids)
+    return len(rows), len(student_ids) - len(rows), sorted(unknown_ids)
+
+
+def student_records_page(session, page_size, after_name=None, name_range=None, id_range=None):
+    """Return one page of (student_id, name, [(date, status), ...]) ordered by name."""
+    students = session.execute(_page_students(page_size, after_name, name_range, id_range)).all()
+    if not students:
+        return []
+
+    histories = {student_id: [] for student_id, _ in students}
+    rows = session.execute(
+        select(AttendanceBitmap.student_id, AttendanceBitmap.term,
+               AttendanceBitmap.present, AttendanceBitmap.recorded)
+        .where(AttendanceBitmap.student_id.in_(histories))
+        .order_by(AttendanceBitmap.student_id, AttendanceBitmap.term)
+    )
+    for student_id, term, present, recorded in rows:
+        histories[student_id].extend(decode_term(term, present, recorded))
+    return [(student_id, name, histories[student_id]) for student_id, name in students]
+
+
+def attendance_page(session, limit, student_id=None, date_from=None, date_to=None, after=None):
+    """Return up to limit (student_id, date, status) records in (student_id, date) order.
+
+    Term rows are read in order and decoded until the page is full; the
+    arguments are those of storage.rows.attendance_page.
+    """
+    query = select(
+        AttendanceBitmap.student_id, AttendanceBitmap.term,
+        AttendanceBitmap.present, AttendanceBitmap.recorded
+    ).order_by(AttendanceBitmap.student_id, AttendanceBitmap.term)
+    if student_id is not None:
+        query = query.where(AttendanceBitmap.student_id == student_id)
+    if date_from is not None:
+        query = query.where(AttendanceBitmap.term >= int(date_from[:4]))
+    if date_to is not None:
+        query = query.where(AttendanceBitmap.term <= int(date_to[:4]))
+    if after is not None:
+        query = query.where(AttendanceBitmap.student_id >= after[0])
+
+    records = []
+    result = session.execute(query.execution_options(yield_per=PAGE_TERM_ROWS))
+    try:
+        for sid, term, present, recorded in result:
+            for date_str, status in decode_term(term, present, recorded):
+                if date_from is not None and date_str < date_from:
+                    continue
+                if date_to is not None and date_str > date_to:
+                    break
+                if after is not None and (sid, date_str) <= tuple(after):
+                    continue
+                records.append((sid, date_str, status))
+                if len(records) == limit:
+                    return records
+    finally:
+        result.close()
+    return records
+
+
+def iter_attendance_rows(session, chunk_size=10000):
+    """Stream (name, date, status) rows ordered by student name and date."""
+    query = select(
+        Student.name, AttendanceBitmap.term, AttendanceBitmap.present, AttendanceBitmap.recorded
+    ).join(
+        AttendanceBitmap, Student.id == AttendanceBitmap.student_id
+    ).order_by(
+        Student.name, AttendanceBitmap.term
+    ).execution_options(yield_per=chunk_size)
+    for name, term, present, recorded in session.execute(query):
+        for date_str, status in decode_term(term, present, recorded):
+            yield name, date_str, status
+
+
+def iter_day_records(session, chunk_size=10000):
+    """Stream (student_id, day number, status code) ordered by student and day."""
+    query = select(
+        AttendanceBitmap.student_id, AttendanceBitmap.term,
+        AttendanceBitmap.present, AttendanceBitmap.recorded
+    ).order_by(
+        AttendanceBitmap.student_id, AttendanceBitmap.term
+    ).execution_options(yield_per=chunk_size)
+    for student_id, term, present, recorded in session.execute(query):
+        start = term_start(term)
+        for bit in _set_bits(recorded):
+            status = STATUS_CODES["present"] if _has_bit(present, bit) else STATUS_CODES["absent"]
+            yield student_id, start + bit, status
+
+
+def attendance_counts(session, term=None):
+    """Return {student_id: (present, absent)} from popcounts of the bitsets."""
+    query = select(AttendanceBitmap.student_id, AttendanceBitmap.present, AttendanceBitmap.recorded)
+    if term is not None:
+        query = query.where(AttendanceBitmap.term == term)
+
+    counts = {}
+    for student_id, present, recorded in session.execute(query):
+        present_days = _popcount(present)
+        recorded_days = _popcount(recorded)
+        previous = counts.get(student_id, (0, 0))
+        counts[student_id] = (previous[0] + present_days,
+                              previous[1] + recorded_days - present_days)
+    return counts
+
+
+def student_counts(session, month_from=None, month_to=None):
+    """Return {student_id: (present, absent)} for students with records in the month range.
+
+    Each term's bitsets are masked to the months in range and popcounted.
+    """
+    query = _term_range_query(
+        select(AttendanceBitmap.student_id, AttendanceBitmap.term,
+               AttendanceBitmap.present, AttendanceBitmap.recorded),
+        month_from, month_to
+    )
+    counts = {}
+    for student_id, term, present, recorded in session.execute(query):
+        present = int.from_bytes(present, "little")
+        recorded = int.from_bytes(recorded, "little")
+        if month_from or month_to:
+            mask = sum(mask for _, mask in _term_months(term, month_from, month_to))
+            present &= mask
+            recorded &= mask
+        recorded_days = _bit_count(recorded)
+        if not recorded_days:
+            continue
+        present_days = _bit_count(present)
+        previous = counts.get(student_id, (0, 0))
+        counts[student_id] = (previous[0] + present_days,
+                              previous[1] + recorded_days - present_days)
+    return counts
+
+
+def monthly_counts(session, month_from=None, month_to=None):
+    """Return {month: (present, absent)} for every month with records, from masked popcounts."""
+    query = _term_range_query(
+        select(AttendanceBitmap.term, AttendanceBitmap.present, AttendanceBitmap.recorded),
+        month_from, month_to
+    )
+    totals = {}
+    for term, present, recorded in session.execute(query):
+        present = int.from_bytes(present, "little")
+        recorded = int.from_bytes(recorded, "little")
+        for month, mask in _term_months(term, month_from, month_to):
+            recorded_days = _bit_count(recorded & mask)
+            if not recorded_days:
+                continue
+            present_days = _bit_count(present & mask)
+            previous = totals.get(month, (0, 0))
+            totals[month] = (previous[0] + present_days,
+                             previous[1] + recorded_days - present_days)
+    return totals
+
+
+def daily_counts(session, month_from=None, month_to=None):
+    """Return (date, present, absent) for every recorded date in the month range, in date order."""
+    query = _term_range_query(
+        select(AttendanceBitmap.term, AttendanceBitmap.present, AttendanceBitmap.recorded),
+        month_from, month_to
+    )
+    totals = {}
+    for term, present, recorded in session.execute(query):
+        mask = sum(mask for _, mask in _term_months(term, month_from, month_to))
+        recorded = (int.from_bytes(recorded, "little") & mask).to_bytes(TERM_BYTES, "little")
+        for bit in _set_bits(recorded):
+            key = (term, bit)
+            previous = totals.get(key, (0, 0))
+            if _has_bit(present, bit):
+                totals[key] = (previous[0] + 1, previous[1])
+            else:
+                totals[key] = (previous[0], previous[1] + 1)
+    return [
+        (day_to_date(term_start(term) + bit), p, a)
+        for (term, bit), (p, a) in sorted(totals.items())
+    ]
+
+
+def migrate_to_bitmap(engine=None, chunk_size=50000):
+    """Copy the attendance table into attendance_bitmap.
+
+    SQLite works out each row's term and day of the year, and rows are
+    streamed in (student_id, date) order, so each student's terms are built
+    in memory and written once. Days already in the bitmap table are kept
+    unless the attendance table has them too, so it can be re-run. Returns
+    (copied, skipped), where skipped counts rows whose date or status
+    cannot be encoded.
+    """
+    engine = engine or get_engine()
+    AttendanceBitmap.__table__.create(engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM attendance")).scalar()
+        rows = conn.execute(text(_MIGRATE_SQL)).yield_per(chunk_size)
+        copied = 0
+        terms = {}
+        for student_id, student_rows in groupby(rows, key=lambda row: row[0]):
+            for _, term, bit, is_present in student_rows:
+                key = (student_id, term)
+                if key not in terms:
+                    terms[key] = (bytearray(TERM_BYTES), bytearray(TERM_BYTES))
+                present, recorded = terms[key]
+                _set_bit(recorded, bit, True)
+                _set_bit(present, bit, is_present)
+                copied += 1
+            if len(terms) >= MIGRATE_FLUSH_TERMS:
+                _write_terms(conn, terms)
+                terms = {}
+        _write_terms(conn, terms)
+    return copied, total - copied
+
+
+def _write_terms(conn, terms):
+    """Write built term rows, merging with bitmap rows already stored."""
+    if not terms:
+        return
+    stored = conn.execute(
+        select(AttendanceBitmap.student_id, AttendanceBitmap.term,
+               AttendanceBitmap.present, AttendanceBitmap.recorded)
+        .where(AttendanceBitmap.student_id.in_({student_id for student_id, _ in terms}))
+    )
+    for student_id, term, present, recorded in stored:
+        if (student_id, term) not in terms:
+            continue
+        new_present, new_recorded = terms[student_id, term]
+        for index in range(TERM_BYTES):
+            keep = recorded[index] & ~new_recorded[index]
+            new_present[index] |= present[index] & keep
+            new_recorded[index] |= keep
+
+    _upsert(conn, [
+        {"student_id": student_id, "term": term, "present": bytes(present), "recorded": bytes(recorded)}
+        for (student_id, term), (present, recorded) in terms.items()
+    ])
+
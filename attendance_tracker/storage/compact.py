@@ -0,0 +1,280 @@
+"""Attendance kept in attendance_compact: integer day numbers and status codes.
+
+This module has the same functions as storage.rows (mark_records,
+mark_all, student_records_page, attendance_page, iter_attendance_rows,
+iter_day_records, attendance_counts, student_counts, monthly_counts,
+daily_counts), so the commands can use either backend. The table has no
+surrogate id and no rowid, so each student's records are one contiguous
+range of the (student_id, day) primary key. Dates are converted to day
+numbers on the way in and back to YYYY-MM-DD on the way out.
+"""
+from datetime import date
+from itertools import groupby
+
+from sqlalchemy import case, func, literal, select, text, true
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models import CompactAttendance, Student, get_engine
+from ..reports.records import _page_students
+from ..utils import STATUS_CODES, STATUS_NAMES, JULIAN_EPOCH, date_to_day, day_to_date
+
+_PRESENT = STATUS_CODES["present"]
+_ABSENT = STATUS_CODES["absent"]
+
+_COPY_SQL = f"""
+    INSERT OR REPLACE INTO attendance_compact (student_id, day, status)
+    SELECT student_id,
+           CAST(julianday(date) - {JULIAN_EPOCH} AS INTEGER),
+           CASE status WHEN 'present' THEN {_PRESENT} ELSE {_ABSENT} END
+    FROM attendance
+    WHERE julianday(date) IS NOT NULL
+      AND status IN ('present', 'absent')
+"""
+
+# Status codes are 0 and 1, so the present count is their sum
+_present = func.sum(CompactAttendance.status)
+_absent = func.count() - func.sum(CompactAttendance.status)
+
+
+def _month_start(month):
+    """Return the day number of the first day of a YYYY-MM month."""
+    return date_to_day(f"{month}-01")
+
+
+def _month_end(month):
+    """Return the day number of the first day after a YYYY-MM month."""
+    year, month = int(month[:4]), int(month[5:7])
+    return date_to_day(date(year + month // 12, month % 12 + 1, 1))
+
+
+def _day_filter(month_from, month_to):
+    """Build conditions restricting CompactAttendance.day to a month range."""
+    conditions = []
+    if month_from:
+        conditions.append(CompactAttendance.day >= _month_start(month_from))
+    if month_to:
+        conditions.append(CompactAttendance.day < _month_end(month_to))
+    return conditions
+
+
+def _after_day(date_str):
+    """Return the day number a (student_id, date) cursor continues after.
+
+    None means the rest of the student is skipped, as a cursor of "~" does
+    in storage.rows; an empty date skips none of the student's records.
+    """
+    if not date_str:
+        return -1 << 31
+    try:
+        return date_to_day(date_str)
+    except ValueError:
+        return None
+
+
+def _on_conflict(stmt, overwrite):
+    """Replace or keep existing (student_id, day) records."""
+    if overwrite:
+        return stmt.on_conflict_do_update(
+            index_elements=["student_id", "day"],
+            set_={"status": stmt.excluded.status},
+        )
+    return stmt.on_conflict_do_nothing(index_elements=["student_id", "day"])
+
+
+def mark_records(session, records, overwrite=False):
+    """Insert validated (student_id, date, status) records in one executemany.
+
+    Existing records are skipped, or replaced when overwrite is true. The
+    caller owns the transaction. Returns (marked, skipped).
+    """
+    rows = [
+        {"student_id": student_id, "day": date_to_day(date_str), "status": STATUS_CODES[status]}
+        for student_id, date_str, status in records
+    ]
+    if not rows:
+        return 0, 0
+    stmt = _on_conflict(sqlite_insert(CompactAttendance.__table__), overwrite)
+    marked = session.execute(stmt, rows).rowcount
+    return marked, len(rows) - marked
+
+
+def mark_all(session, date_str, absent_ids=(), overwrite=False):
+    """Mark every student for one date with a single INSERT ... SELECT.
+
+    Students listed in absent_ids are marked absent and everyone else
+    present. The caller owns the transaction. Returns
+    (marked, skipped, unknown_ids), as marking.mark_all does.
+    """
+    absent_ids = set(absent_ids)
+    if absent_ids:
+        status = case((Student.id.in_(absent_ids), _ABSENT), else_=_PRESENT)
+    else:
+        status = literal(_PRESENT)
+
+    # "WHERE true" keeps SQLite from parsing ON CONFLICT as a join constraint
+    rows = select(Student.id, literal(date_to_day(date_str)), status).where(true())
+    stmt = sqlite_insert(CompactAttendance.__table__).from_select(
+        ["student_id", "day", "status"], rows
+    )
+    stmt = _on_conflict(stmt, overwrite)
+
+    total = session.execute(select(func.count(Student.id))).scalar()
+    marked = session.execute(stmt).rowcount
+
+    unknown_ids = set()
+    if absent_ids:
+        found = set(session.execute(
+            select(Student.id).where(Student.id.in_(absent_ids))
+        ).scalars())
+        unknown_ids = absent_ids - found
+
+    return marked, total - marked, sorted(unknown_ids)
+
+
+def student_records_page(session, page_size, after_name=None, name_range=None, id_range=None):
+    """Return one page of (student_id, name, [(date, status), ...]) ordered by name."""
+    students = _page_students(page_size, after_name, name_range, id_range).subquery()
+    query = select(
+        students.c.id, students.c.name, CompactAttendance.day, CompactAttendance.status
+    ).outerjoin(
+        CompactAttendance, CompactAttendance.student_id == students.c.id
+    ).order_by(
+        students.c.name, CompactAttendance.day
+    )
+
+    page = []
+    rows = session.execute(query)
+    for (student_id, name), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        records = [
+            (day_to_date(day), STATUS_NAMES[status]) for _, _, day, status in group if day is not None
+        ]
+        page.append((student_id, name, records))
+    return page
+
+
+def attendance_page(session, limit, student_id=None, date_from=None, date_to=None, after=None):
+    """Return up to limit (student_id, date, status) records in (student_id, date) order.
+
+    The arguments are those of storage.rows.attendance_page.
+    """
+    query = select(CompactAttendance.student_id, CompactAttendance.day, CompactAttendance.status)
+    if student_id is not None:
+        query = query.where(CompactAttendance.student_id == student_id)
+    if date_from is not None:
+        query = query.where(CompactAttendance.day >= date_to_day(date_from))
+    if date_to is not None:
+        query = query.where(CompactAttendance.day <= date_to_day(date_to))
+    if after is not None:
+        after_id, after_date = after
+        after_day = _after_day(after_date)
+        if after_day is None:
+            query = query.where(CompactAttendance.student_id > after_id)
+        else:
+            query = query.where(
+                (CompactAttendance.student_id > after_id)
+                | ((CompactAttendance.student_id == after_id) & (CompactAttendance.day > after_day))
+            )
+    query = query.order_by(CompactAttendance.student_id, CompactAttendance.day).limit(limit)
+    return [
+        (sid, day_to_date(day), STATUS_NAMES[status]) for sid, day, status in session.execute(query)
+    ]
+
+
+def iter_attendance_rows(session, chunk_size=10000):
+    """Stream (name, date, status) rows ordered by student name and date."""
+    query = select(
+        Student.name, CompactAttendance.day, CompactAttendance.status
+    ).join(
+        CompactAttendance, Student.id == CompactAttendance.student_id
+    ).order_by(
+        Student.name, CompactAttendance.day
+    ).execution_options(yield_per=chunk_size)
+    for name, day, status in session.execute(query):
+        yield name, day_to_date(day), STATUS_NAMES[status]
+
+
+def iter_day_records(session, chunk_size=10000):
+    """Stream (student_id, day number, status code) ordered by student and day.
+
+    These are the stored columns, read in primary key order straight from
+    the DBAPI cursor.
+    """
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute("SELECT student_id, day, status FROM attendance_compact ORDER BY student_id, day")
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield from chunk
+    finally:
+        cursor.close()
+
+
+def attendance_counts(session, term=None):
+    """Return {student_id: (present, absent)}, optionally for one calendar year."""
+    query = select(CompactAttendance.student_id, _present, _absent).group_by(CompactAttendance.student_id)
+    if term is not None:
+        query = query.where(*_day_filter(f"{term}-01", f"{term}-12"))
+    return {student_id: (p, a) for student_id, p, a in session.execute(query)}
+
+
+def student_counts(session, month_from=None, month_to=None):
+    """Return {student_id: (present, absent)} for students with records in the month range.
+
+    Counts are a GROUP BY over the day range; there is no summary table.
+    """
+    query = select(
+        CompactAttendance.student_id, _present, _absent
+    ).where(
+        *_day_filter(month_from, month_to)
+    ).group_by(
+        CompactAttendance.student_id
+    )
+    return {student_id: (p, a) for student_id, p, a in session.execute(query)}
+
+
+def monthly_counts(session, month_from=None, month_to=None):
+    """Return {month: (present, absent)} for every month with records.
+
+    SQLite groups by the integer day and the few hundred days per year are
+    summed into months here, which is several times faster than converting
+    every row's day to a month in SQL.
+    """
+    totals = {}
+    for date_str, p, a in daily_counts(session, month_from, month_to):
+        previous = totals.get(date_str[:7], (0, 0))
+        totals[date_str[:7]] = (previous[0] + p, previous[1] + a)
+    return totals
+
+
+def daily_counts(session, month_from=None, month_to=None):
+    """Return (date, present, absent) for every recorded date in the month range, in date order."""
+    query = select(
+        CompactAttendance.day, _present, _absent
+    ).where(
+        *_day_filter(month_from, month_to)
+    ).group_by(
+        CompactAttendance.day
+    ).order_by(
+        CompactAttendance.day
+    )
+    return [(day_to_date(day), p, a) for day, p, a in session.execute(query)]
+
+
+def migrate_to_compact(engine=None):
+    """Copy the attendance table into attendance_compact.
+
+    The copy is a single INSERT ... SELECT run inside SQLite, so no rows
+    pass through Python. Records already in the compact table are kept
+    unless the attendance table has them too, so it can be re-run. Returns
+    (copied, skipped), where skipped counts rows whose date or status
+    cannot be encoded.
+    """
+    engine = engine or get_engine()
+    CompactAttendance.__table__.create(engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM attendance")).scalar()
+        copied = conn.execute(text(_COPY_SQL)).rowcount
+    return copied, total - copied
@@ -0,0 +1,122 @@
+"""The default attendance backend: one attendance row per student and day.
+
+Collects the row-table implementations under the names storage.bitmap
+uses, so commands can call either backend through attendance_backend().
+"""
+from sqlalchemy import case, func, select
+
+from ..marking import mark_records, mark_all
+from ..models import Attendance, AttendanceSummary
+from ..reports.records import student_records_page
+from ..reports.stats import _month_filter
+from ..transfer.exporter import iter_attendance_rows
+from ..utils import STATUS_CODES, JULIAN_EPOCH
+
+_DAY_RECORDS_SQL = f"""
+    SELECT student_id,
+           CAST(julianday(date) - {JULIAN_EPOCH} AS INTEGER),
+           CASE status WHEN 'present' THEN {STATUS_CODES['present']}
+                       ELSE {STATUS_CODES['absent']} END
+    FROM attendance
+    WHERE julianday(date) IS NOT NULL
+      AND status IN ('present', 'absent')
+    ORDER BY student_id, date
+"""
+
+
+def attendance_page(session, limit, student_id=None, date_from=None, date_to=None, after=None):
+    """Return up to limit (student_id, date, status) records in (student_id, date) order.
+
+    date_from and date_to are inclusive YYYY-MM-DD bounds; after is the
+    (student_id, date) of the last record of the previous page.
+    """
+    query = select(Attendance.student_id, Attendance.date, Attendance.status)
+    if student_id is not None:
+        query = query.where(Attendance.student_id == student_id)
+    if date_from is not None:
+        query = query.where(Attendance.date >= date_from)
+    if date_to is not None:
+        query = query.where(Attendance.date <= date_to)
+    if after is not None:
+        after_id, after_date = after
+        query = query.where(
+            (Attendance.student_id > after_id)
+            | ((Attendance.student_id == after_id) & (Attendance.date > after_date))
+        )
+    query = query.order_by(Attendance.student_id, Attendance.date).limit(limit)
+    return [tuple(row) for row in session.execute(query)]
+
+
+def iter_day_records(session, chunk_size=10000):
+    """Stream (student_id, day number, status code) ordered by student and day.
+
+    Rows come straight from the DBAPI cursor; records whose date or status
+    cannot be encoded are left out.
+    """
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(_DAY_RECORDS_SQL)
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield from chunk
+    finally:
+        cursor.close()
+
+
+def attendance_counts(session, term=None):
+    """Return {student_id: (present, absent)}, optionally for one calendar year."""
+    present = func.sum(case((Attendance.status == "present", 1), else_=0))
+    absent = func.sum(case((Attendance.status == "absent", 1), else_=0))
+    query = select(Attendance.student_id, present, absent).group_by(Attendance.student_id)
+    if term is not None:
+        query = query.where(Attendance.date.between(f"{term}-01-01", f"{term}-12-31"))
+    return {student_id: (p, a) for student_id, p, a in session.execute(query)}
+
+
+def student_counts(session, month_from=None, month_to=None):
+    """Return {student_id: (present, absent)} for students with records in the month range.
+
+    Counts come from the monthly summary table, so the cost grows with the
+    number of students and months rather than the number of attendance rows.
+    """
+    query = select(
+        AttendanceSummary.student_id,
+        func.sum(AttendanceSummary.present),
+        func.sum(AttendanceSummary.absent),
+    ).where(
+        *_month_filter(AttendanceSummary.month, month_from, month_to)
+    ).group_by(
+        AttendanceSummary.student_id
+    )
+    return {student_id: (p, a) for student_id, p, a in session.execute(query) if p or a}
+
+
+def monthly_counts(session, month_from=None, month_to=None):
+    """Return {month: (present, absent)} for every month with records, from the summary table."""
+    query = select(
+        AttendanceSummary.month,
+        func.sum(AttendanceSummary.present),
+        func.sum(AttendanceSummary.absent),
+    ).where(
+        *_month_filter(AttendanceSummary.month, month_from, month_to)
+    ).group_by(
+        AttendanceSummary.month
+    )
+    return {month: (p, a) for month, p, a in session.execute(query) if p or a}
+
+def daily_counts(session, month_from=None, month_to=None):
+    """Return (date, present, absent) for every recorded date in the month range, in date order."""
+    query = select(
+        Attendance.date,
+        func.sum(case((Attendance.status == "present", 1), else_=0)),
+        func.sum(case((Attendance.status == "absent", 1), else_=0)),
+    ).where(
+        *_month_filter(Attendance.date, month_from, month_to)
+    ).group_by(
+        Attendance.date
+    ).order_by(
+        Attendance.date
+    )
+    return [tuple(row) for row in session.execute(query)]
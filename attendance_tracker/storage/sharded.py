@@ -0,0 +1,373 @@
+"""Attendance split into one SQLite file per term.
+
+The students table stays in the main database. Attendance rows live in
+shard files next to it, one per term (calendar year), named by the
+shard_pattern setting: with the default "{stem}_{term}.db", attendance.db
+gets attendance_2025.db, attendance_2026.db and so on. Each shard has its
+own write lock, so marking one term never waits for another, and old terms
+stop growing.
+
+This module has the same functions as storage.rows and reuses them on
+shard sessions: ShardRouter picks the shard for each write, and reads that
+cross terms fan out to every shard and merge the results in order. Shards
+have no monthly summary table, which would slow every write, so
+statistics are counted from the attendance rows of the shards in range.
+Shard writes join the caller's transaction: they are committed when the
+main session commits and discarded when it rolls back or closes. When the
+caller's session was started with models.begin_write, each shard session
+begins with BEGIN IMMEDIATE, so only the written terms are locked.
+"""
+import glob
+import heapq
+import os
+import re
+import threading
+from itertools import groupby, islice
+
+from sqlalchemy import case, event, func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from ..models import Attendance, Student, get_engine, get_settings
+from ..models.base import build_engine
+from ..models.transactions import begin_immediate
+from ..reports.records import _page_students
+from ..reports.stats import _month_filter
+from . import rows
+
+# Students per fan-out round when streaming the whole export
+EXPORT_STUDENTS_PER_ROUND = 500
+
+
+class ShardRouter:
+    """Maps terms to shard files and keeps one engine per shard."""
+
+    def __init__(self, main_database, pattern, settings):
+        if not main_database or main_database == ":memory:":
+            raise ValueError("sharded storage needs a file-backed main database")
+        main_path = os.path.abspath(main_database)
+        self.directory = os.path.dirname(main_path)
+        self.stem = os.path.splitext(os.path.basename(main_path))[0]
+        self.pattern = pattern
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._sessionmakers = {}
+
+    def term_for(self, date_str):
+        """Return the term a YYYY-MM-DD date belongs to."""
+        return int(date_str[:4])
+
+    def path(self, term):
+        return os.path.join(self.directory, self.pattern.format(stem=self.stem, term=term))
+
+    def terms(self):
+        """Return the terms that have a shard file, in order."""
+        prefix, suffix = self.pattern.split("{term}")
+        prefix = prefix.format(stem=self.stem)
+        suffix = suffix.format(stem=self.stem)
+        found = set()
+        pattern = re.compile(re.escape(prefix) + r"(\d+)" + re.escape(suffix) + "$")
+        for path in glob.glob(os.path.join(glob.escape(self.directory), f"{glob.escape(prefix)}*")):
+            match = pattern.match(os.path.basename(path))
+            if match:
+                found.add(int(match.group(1)))
+        return sorted(found)
+
+    def sessionmaker(self, term):
+        """Return a session factory for a term's shard, creating the file on first use."""
+        with self._lock:
+            if term not in self._sessionmakers:
+                engine = build_engine({**self.settings, "url": f"sqlite:///{self.path(term)}"})
+                Attendance.__table__.create(engine, checkfirst=True)
+                self._sessionmakers[term] = sessionmaker(bind=engine)
+            return self._sessionmakers[term]
+
+    def dispose(self):
+        with self._lock:
+            for factory in self._sessionmakers.values():
+                factory.kw["bind"].dispose()
+            self._sessionmakers.clear()
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return the shard router for the shared engine's database."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            settings = get_settings()
+            database = make_url(str(get_engine().url)).database
+            _router = ShardRouter(database, settings["shard_pattern"], settings)
+        return _router
+
+
+def _commit_shards(session):
+    for shard in session.info.get("shard_sessions", {}).values():
+        shard.commit()
+
+
+def _close_shards(session, transaction):
+    if transaction.parent is not None:
+        return
+    for shard in session.info.pop("shard_sessions", {}).values():
+        shard.close()
+
+
+def _write_session(session, term):
+    """Return a shard session whose work commits and ends with session's."""
+    shards = session.info.setdefault("shard_sessions", {})
+    if term not in shards:
+        if not session.info.get("shard_listeners"):
+            event.listen(session, "before_commit", _commit_shards)
+            event.listen(session, "after_transaction_end", _close_shards)
+            session.info["shard_listeners"] = True
+        session.connection()  # so the main session has a transaction to end
+        shard = get_router().sessionmaker(term)()
+        if session.info.get("write_transaction"):
+            try:
+                begin_immediate(shard)
+            except BaseException:
+                shard.close()
+                raise
+        shards[term] = shard
+    return shards[term]
+
+
+def _terms_between(first, last):
+    """Return the terms with a shard whose dates can fall between first and last.
+
+    first and last are YYYY-MM or YYYY-MM-DD strings, or empty for no bound.
+    """
+    router = get_router()
+    return [
+        term for term in router.terms()
+        if (not first or term >= router.term_for(first))
+        and (not last or term <= router.term_for(last))
+    ]
+
+
+def _read_sessions(session, terms=None):
+    """Yield a session on each shard in term order.
+
+    Shards that session has already written to are read through the same
+    shard session, so uncommitted marks are visible; other shard sessions
+    are closed after use.
+    """
+    router = get_router()
+    writing = session.info.get("shard_sessions", {})
+    for term in router.terms() if terms is None else terms:
+        if term in writing:
+            yield writing[term]
+            continue
+        shard = router.sessionmaker(term)()
+        try:
+            yield shard
+        finally:
+            shard.close()
+
+
+def mark_records(session, records, overwrite=False):
+    """Record validated (student_id, date, status) records in their term shards.
+
+    Returns (marked, skipped), as marking.mark_records does.
+    """
+    router = get_router()
+    marked = skipped = 0
+    by_term = groupby(sorted(records, key=lambda record: record[1]),
+                      key=lambda record: router.term_for(record[1]))
+    for term, term_records in by_term:
+        term_marked, term_skipped = rows.mark_records(
+            _write_session(session, term), list(term_records), overwrite
+        )
+        marked += term_marked
+        skipped += term_skipped
+    return marked, skipped
+
+
+def mark_all(session, date_str, absent_ids=(), overwrite=False):
+    """Mark every student for one date in that term's shard.
+
+    The roster comes from the main database and is written to the shard
+    with one executemany. Returns (marked, skipped, unknown_ids).
+    """
+    absent_ids = set(absent_ids)
+    student_ids = session.execute(select(Student.id)).scalars().all()
+    records = [
+        (student_id, date_str, "absent" if student_id in absent_ids else "present")
+        for student_id in student_ids
+    ]
+    marked, skipped = mark_records(session, records, overwrite)
+    return marked, skipped, sorted(absent_ids - set(student_ids))
+
+
+def student_records_page(session, page_size, after_name=None, name_range=None, id_range=None):
+    """Return one page of (student_id, name, [(date, status), ...]) ordered by name.
+
+    Each shard is asked for the page's students in turn; shards are visited
+    in term order, so appending keeps every history in date order.
+    """
+    students = session.execute(_page_students(page_size, after_name, name_range, id_range)).all()
+    if not students:
+        return []
+
+    histories = {student_id: [] for student_id, _ in students}
+    query = select(
+        Attendance.student_id, Attendance.date, Attendance.status
+    ).where(
+        Attendance.student_id.in_(histories)
+    ).order_by(
+        Attendance.student_id, Attendance.date
+    )
+    for shard in _read_sessions(session):
+        for student_id, date_str, status in shard.execute(query):
+            histories[student_id].append((date_str, status))
+    return [(student_id, name, histories[student_id]) for student_id, name in students]
+
+
+def attendance_page(session, limit, student_id=None, date_from=None, date_to=None, after=None):
+    """Return up to limit (student_id, date, status) records in (student_id, date) order.
+
+    Each shard whose term falls within the dates returns a page of its own,
+    and the pages are merged; the arguments are those of
+    storage.rows.attendance_page.
+    """
+    pages = [
+        rows.attendance_page(shard, limit, student_id, date_from, date_to, after)
+        for shard in _read_sessions(session, _terms_between(date_from, date_to))
+    ]
+    return list(islice(heapq.merge(*pages), limit))
+
+
+def iter_attendance_rows(session, chunk_size=10000):
+    """Stream (name, date, status) rows ordered by student name and date.
+
+    Students are taken EXPORT_STUDENTS_PER_ROUND at a time in name order,
+    so memory use is bounded by one round of histories.
+    """
+    after_name = None
+    while True:
+        page = student_records_page(session, EXPORT_STUDENTS_PER_ROUND, after_name)
+        for _, name, records in page:
+            for date_str, status in records:
+                yield name, date_str, status
+        if len(page) < EXPORT_STUDENTS_PER_ROUND:
+            return
+        after_name = page[-1][1]
+
+
+def iter_day_records(session, chunk_size=10000):
+    """Stream (student_id, day number, status code) ordered by student and day.
+
+    Every shard is streamed in (student_id, date) order and the streams
+    are merged, so memory use does not depend on the number of records.
+    """
+    readers = [_read_sessions(session, [term]) for term in get_router().terms()]
+    try:
+        streams = [rows.iter_day_records(next(reader), chunk_size) for reader in readers]
+        yield from heapq.merge(*streams, key=lambda record: (record[0], record[1]))
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def attendance_counts(session, term=None):
+    """Return {student_id: (present, absent)}, summed across shards or for one term."""
+    router = get_router()
+    if term is not None and term not in router.terms():
+        return {}
+    counts = {}
+    for shard in _read_sessions(session, None if term is None else [term]):
+        for student_id, (present, absent) in rows.attendance_counts(shard).items():
+            previous = counts.get(student_id, (0, 0))
+            counts[student_id] = (previous[0] + present, previous[1] + absent)
+    return counts
+
+
+def _count_query(group_by, month_from, month_to):
+    """Build a present/absent count of a shard's attendance rows grouped by one column."""
+    return select(
+        group_by,
+        func.sum(case((Attendance.status == "present", 1), else_=0)),
+        func.sum(case((Attendance.status == "absent", 1), else_=0)),
+    ).where(
+        *_month_filter(Attendance.date, month_from, month_to)
+    ).group_by(
+        group_by
+    )
+
+
+def student_counts(session, month_from=None, month_to=None):
+    """Return {student_id: (present, absent)}, summed across the shards in range."""
+    query = _count_query(Attendance.student_id, month_from, month_to)
+    counts = {}
+    for shard in _read_sessions(session, _terms_between(month_from, month_to)):
+        for student_id, present, absent in shard.execute(query):
+            previous = counts.get(student_id, (0, 0))
+            counts[student_id] = (previous[0] + present, previous[1] + absent)
+    return counts
+
+
+def monthly_counts(session, month_from=None, month_to=None):
+    """Return {month: (present, absent)} for every month with records in the shards in range.
+
+    A month never spans two terms, so each shard's months are distinct.
+    """
+    query = _count_query(func.substr(Attendance.date, 1, 7), month_from, month_to)
+    counts = {}
+    for shard in _read_sessions(session, _terms_between(month_from, month_to)):
+        counts.update((month, (p, a)) for month, p, a in shard.execute(query) if p or a)
+    return counts
+
+
+def daily_counts(session, month_from=None, month_to=None):
+    """Return (date, present, absent) for every recorded date in the month range, in date order."""
+    counts = []
+    for shard in _read_sessions(session, _terms_between(month_from, month_to)):
+        counts.extend(rows.daily_counts(shard, month_from, month_to))
+    return counts
+
+
+def migrate_to_shards(engine=None):
+    """Copy the main attendance table into term shards with ATTACH DATABASE.
+
+    Each term is copied by a single INSERT ... SELECT from the main file
+    into the attached shard, so no rows pass through Python. Rows already
+    in a shard are kept, so it can be re-run. Returns {term: rows copied}.
+    """
+    engine = engine or get_engine()
+    router = get_router()
+    with engine.connect() as conn:
+        terms = [int(year) for year in conn.execute(text(
+            "SELECT DISTINCT substr(date, 1, 4) FROM attendance WHERE date GLOB '[0-9][0-9][0-9][0-9]-*'"
+        )).scalars()]
+
+    # ATTACH and DETACH cannot run inside a transaction, so the copy uses
+    # the DBAPI connection and commits each term explicitly.
+    copied = {}
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for term in sorted(terms):
+            router.sessionmaker(term)  # creates the shard and its table
+            cursor.execute("ATTACH DATABASE ? AS shard", (router.path(term),))
+            try:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO shard.attendance (student_id, date, status) "
+                    "SELECT student_id, date, status FROM main.attendance "
+                    "WHERE date >= ? AND date < ?",
+                    (f"{term}-01-01", f"{term + 1}-01-01"),
+                )
+                copied[term] = cursor.rowcount
+                raw.commit()
+            except BaseException:
+                raw.rollback()
+                raise
+            finally:
+                cursor.execute("DETACH DATABASE shard")
+        cursor.close()
+    finally:
+        raw.close()
+    return copied
@@ -0,0 +1,5 @@
+from .importer import import_roster, read_roster
+from .exporter import export_attendance, iter_attendance_rows
+from .columnar import export_columnar
+from .columnar_reader import ColumnarReader, ColumnarFormatError
+from .incremental import export_changes, prune_changes, get_watermark
@@ -0,0 +1,119 @@
+"""Columnar binary attendance export.
+
+File layout, all integers little-endian, sections aligned to 8 bytes:
+
+    header   HEADER struct: magic, version, student and record counts,
+             and the byte offset of every section below
+    index    one INDEX_ENTRY per student, sorted by student_id:
+             student_id, first record, record count, name offset, name length
+    names    UTF-8 student names, concatenated; the index points into it
+    student_id column   int32[record_count]
+    day column          int32[record_count], days since 1970-01-01
+    status column       int8[record_count], utils.STATUS_CODES values
+
+Records are ordered by (student_id, day), so each student's history is
+one contiguous slice of every column. transfer.columnar_reader reads the
+file through mmap without parsing the rest of it.
+"""
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+
+from sqlalchemy import select
+
+from ..models import Session, Student
+from ..storage import attendance_backend
+
+from .columnar_reader import MAGIC, VERSION, HEADER, INDEX_ENTRY
+
+ALIGNMENT = 8
+COLUMNS = (("student_id", "i", 4), ("day", "i", 4), ("status", "b", 1))
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _little_endian(values):
+    if struct.pack("=i", 1) != struct.pack("<i", 1):
+        values.byteswap()
+    return values
+
+
+def export_columnar(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write every attendance record to a columnar binary file.
+
+    The three columns are streamed to temporary files chunk by chunk,
+    then copied after the header, index and names, so memory use is
+    bounded by the roster size rather than the number of records. Records
+    come from the configured storage backend. The file is written under
+    a temporary name and renamed into place. Returns the number of
+    records written.
+    """
+    spools = [tempfile.TemporaryFile() for _ in COLUMNS]
+    try:
+        session = Session()
+        try:
+            students = session.execute(select(Student.id, Student.name).order_by(Student.id)).all()
+            counts = dict.fromkeys((student_id for student_id, _ in students), 0)
+
+            record_count = 0
+            chunk = []
+            for record in attendance_backend().iter_day_records(session, chunk_size):
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    record_count += _spool(chunk, spools, counts)
+                    chunk = []
+            record_count += _spool(chunk, spools, counts)
+        finally:
+            session.close()
+
+        index = bytearray()
+        names = bytearray()
+        first = 0
+        for student_id, name in students:
+            encoded = name.encode("utf-8")
+            index += INDEX_ENTRY.pack(student_id, first, counts[student_id], len(names), len(encoded))
+            names += encoded
+            first += counts[student_id]
+
+        offsets = []
+        offset = _aligned(HEADER.size)
+        for size in (len(index), len(names)) + tuple(record_count * width for _, _, width in COLUMNS):
+            offsets.append(offset)
+            offset = _aligned(offset + size)
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(students), record_count, *offsets))
+            for offset, data in zip(offsets, (index, names)):
+                f.seek(offset)
+                f.write(data)
+            for offset, spool in zip(offsets[2:], spools):
+                f.seek(offset)
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+            f.truncate(_aligned(f.tell()))
+        os.replace(temp_path, path)
+    finally:
+        for spool in spools:
+            spool.close()
+    return record_count
+
+
+def _spool(chunk, spools, counts):
+    """Append (student_id, day, status) records to the column spools.
+
+    Records for students missing from counts are dropped so the index
+    stays consistent. Returns the number of records written.
+    """
+    chunk = [record for record in chunk if record[0] in counts]
+    for position, ((_, typecode, _), spool) in enumerate(zip(COLUMNS, spools)):
+        values = array(typecode, (record[position] for record in chunk))
+        spool.write(_little_endian(values).tobytes())
+    for student_id, _, _ in chunk:
+        counts[student_id] += 1
+    return len(chunk)
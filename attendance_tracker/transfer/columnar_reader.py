@@ -0,0 +1,120 @@
+"""Read columnar attendance exports through mmap.
+
+Only the standard library is needed, so downstream jobs can copy this
+module without installing the application. Opening a file reads the
+header; looking up a student is a binary search of the index followed by
+one slice of each column, so no other part of the file is touched.
+
+    with ColumnarReader("attendance.atc") as reader:
+        for day, status in reader.history(42):
+            ...
+
+With NumPy, reader.column("day") can be passed to
+numpy.frombuffer(..., dtype="<i4") for zero-copy access to a whole column.
+"""
+import mmap
+import struct
+from datetime import date, timedelta
+
+MAGIC = b"ATTC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQQQQQ")
+INDEX_ENTRY = struct.Struct("<qQQQQ")
+COLUMN_FORMATS = {"student_id": ("i", 4), "day": ("i", 4), "status": ("b", 1)}
+EPOCH = date(1970, 1, 1)
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a file is not a columnar attendance export this reader understands."""
+
+
+class ColumnarReader:
+    """Memory-mapped reader for files written by transfer.columnar.export_columnar."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ColumnarFormatError(f"{path}: empty file") from None
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ColumnarFormatError(f"{path}: file too short")
+        (magic, version, _flags, self.student_count, self.record_count,
+         self._index_offset, self._names_offset, *column_offsets) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ColumnarFormatError(f"{path}: not a columnar attendance export")
+        if version != VERSION:
+            self.close()
+            raise ColumnarFormatError(f"{path}: unsupported version {version}")
+        self._column_offsets = dict(zip(COLUMN_FORMATS, column_offsets))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _entry(self, position):
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + position * INDEX_ENTRY.size)
+
+    def _find(self, student_id):
+        """Binary-search the index; returns the entry or raises KeyError."""
+        low, high = 0, self.student_count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            if entry[0] < student_id:
+                low = middle + 1
+            elif entry[0] > student_id:
+                high = middle
+            else:
+                return entry
+        raise KeyError(student_id)
+
+    def _name(self, entry):
+        start = self._names_offset + entry[3]
+        return self._map[start:start + entry[4]].decode("utf-8")
+
+    def _slice(self, column, first, count):
+        typecode, width = COLUMN_FORMATS[column]
+        offset = self._column_offsets[column] + first * width
+        return struct.unpack_from(f"<{count}{typecode}", self._map, offset)
+
+    def students(self):
+        """Yield (student_id, name, record count) for every student in ID order."""
+        for position in range(self.student_count):
+            entry = self._entry(position)
+            yield entry[0], self._name(entry), entry[2]
+
+    def name(self, student_id):
+        """Return a student's name; raises KeyError for unknown IDs."""
+        return self._name(self._find(student_id))
+
+    def history(self, student_id):
+        """Return [(day number, status code), ...] for one student in date order."""
+        _, first, count, _, _ = self._find(student_id)
+        return list(zip(self._slice("day", first, count), self._slice("status", first, count)))
+
+    def dated_history(self, student_id):
+        """Return [(YYYY-MM-DD, status code), ...] for one student in date order."""
+        return [((EPOCH + timedelta(days=day)).isoformat(), status)
+                for day, status in self.history(student_id)]
+
+    def column(self, column):
+        """Return a read-only memoryview over a whole column's little-endian bytes.
+
+        Release the view (and any arrays built on it) before close().
+        """
+        _, width = COLUMN_FORMATS[column]
+        offset = self._column_offsets[column]
+        return memoryview(self._map)[offset:offset + self.record_count * width]
@@ -0,0 +1,86 @@
+import csv
+import gzip
+import io
+import sys
+
+from sqlalchemy import select
+
+from ..models import Session, Student, Attendance
+from ..storage import attendance_backend
+
+DEFAULT_CHUNK_SIZE = 10000
+CSV_HEADER = ("Student", "Date", "Status")
+
+
+def iter_attendance_rows(session, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream (name, date, status) rows ordered by student name and date."""
+    query = select(
+        Student.name, Attendance.date, Attendance.status
+    ).join(
+        Attendance, Student.id == Attendance.student_id
+    ).order_by(
+        Student.name, Attendance.date
+    ).execution_options(yield_per=chunk_size)
+    return session.execute(query)
+
+
+def open_output(path, compress=None):
+    """Open a text stream for CSV output.
+
+    A path of None or "-" writes to stdout. Output is gzip-compressed when
+    compress is true, or when it is None and the path ends with ".gz".
+    """
+    to_stdout = path in (None, "-")
+    if compress is None:
+        compress = not to_stdout and path.endswith(".gz")
+
+    if to_stdout:
+        if not compress:
+            return _NonClosing(sys.stdout)
+        raw = gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb")
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+class _NonClosing:
+    """Context manager that leaves a shared stream such as stdout open."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __enter__(self):
+        return self.stream
+
+    def __exit__(self, *exc_info):
+        self.stream.flush()
+
+
+def export_attendance(path, compress=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream the joined attendance table to a CSV file or stdout.
+
+    Rows are fetched chunk_size at a time and written as they arrive, so
+    memory use does not grow with the size of the table. Rows come from the
+    configured storage backend. Returns the number of rows written; no file
+    is created when there is nothing to export.
+    """
+    session = Session()
+    try:
+        rows = iter(attendance_backend().iter_attendance_rows(session, chunk_size))
+        first = next(rows, None)
+        if first is None:
+            return 0
+
+        count = 0
+        with open_output(path, compress) as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerow(first)
+            count += 1
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+    finally:
+        session.close()
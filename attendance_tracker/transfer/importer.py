@@ -0,0 +1,129 @@
+import contextlib
+import csv
+import sys
+import time
+
+from sqlalchemy import insert, select
+
+from ..models import Session, Student
+from ..models.transactions import begin_immediate
+from ..models.name_index import resume_name_index, suspend_name_index
+from ..models.roster_version import resume_roster_version, suspend_roster_version
+from ..roster import roster_cache
+from ..utils import validate_name
+
+DEFAULT_BATCH_SIZE = 5000
+# Older SQLite builds cap a statement at 999 bound parameters.
+LOOKUP_CHUNK_SIZE = 900
+
+
+def _open_input(path):
+    """Open a CSV file for reading, or wrap stdin for "-"."""
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, newline="", encoding="utf-8")
+
+
+def read_roster(path):
+    """Yield (line_number, name) pairs from a roster CSV file.
+
+    The name is taken from a column headed "name" if the first row has one,
+    otherwise from the first column of every row. A path of "-" reads
+    stdin.
+    """
+    with _open_input(path) as f:
+        reader = csv.reader(f)
+        column = 0
+        for row in reader:
+            if reader.line_num == 1:
+                header = [cell.strip().lower() for cell in row]
+                if "name" in header:
+                    column = header.index("name")
+                    continue
+            if not row or len(row) <= column:
+                continue
+            yield reader.line_num, row[column].strip()
+
+
+def _existing_names(session, names):
+    """Return the subset of names already present in the students table."""
+    found = set()
+    for start in range(0, len(names), LOOKUP_CHUNK_SIZE):
+        chunk = names[start:start + LOOKUP_CHUNK_SIZE]
+        found.update(session.execute(
+            select(Student.name).where(Student.name.in_(chunk))
+        ).scalars())
+    return found
+
+
+def _flush_batch(session, batch, summary):
+    """Insert one batch of names, recording the ones that already exist."""
+    existing = _existing_names(session, batch)
+    summary["duplicates"].extend(name for name in batch if name in existing)
+    new_names = [name for name in batch if name not in existing]
+    if new_names:
+        session.execute(
+            insert(Student.__table__).prefix_with("OR IGNORE"),
+            [{"name": name} for name in new_names]
+        )
+        summary["imported"] += len(new_names)
+
+
+def import_roster(path, batch_size=DEFAULT_BATCH_SIZE):
+    """Bulk import student names from a CSV file in a single transaction.
+
+    Rows with invalid names are skipped, and names that already exist (in the
+    database or earlier in the file) are reported as duplicates instead of
+    aborting the load. Once a full batch has been read, the name index is
+    rebuilt and the roster version bumped once at the end instead of for
+    every row.
+
+    The transaction starts with BEGIN IMMEDIATE, so the existing names are
+    read under the write lock and the first insert cannot fail with
+    "database is locked" after another writer commits. It is not retried,
+    because the input may be stdin.
+    """
+    summary = {"imported": 0, "duplicates": [], "invalid": [], "rows": 0}
+    started = time.perf_counter()
+    seen = set()
+    batch = []
+    suspended = None
+    version_suspended = False
+
+    session = Session()
+    try:
+        # Students live in the main database with every storage backend,
+        # so its lock is taken even when storage is sharded
+        begin_immediate(session)
+        for line_num, name in read_roster(path):
+            summary["rows"] += 1
+            valid, error = validate_name(name)
+            if not valid:
+                summary["invalid"].append((line_num, name, error))
+                continue
+            if name in seen:
+                summary["duplicates"].append(name)
+                continue
+            seen.add(name)
+            batch.append(name)
+            if len(batch) >= batch_size:
+                if suspended is None:
+                    suspended = suspend_name_index(session.connection())
+                    version_suspended = suspend_roster_version(session.connection())
+                _flush_batch(session, batch, summary)
+                batch = []
+        if batch:
+            _flush_batch(session, batch, summary)
+        if suspended:
+            resume_name_index(session.connection(), suspended)
+        resume_roster_version(session.connection(), version_suspended)
+        session.commit()
+        roster_cache.invalidate()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
@@ -0,0 +1,139 @@
+"""Incremental attendance export driven by the attendance_changes log.
+
+Triggers on the attendance table append every insert, update and delete
+to attendance_changes with an ever-increasing seq (see models.changes).
+Each consumer of the export has a watermark in export_watermarks: the
+highest seq it has been sent. An incremental export writes the current
+state of every (student, date) changed after the watermark, in change
+order, then moves the watermark forward, so its cost depends on the
+number of changes rather than the size of the table.
+
+A consumer without a watermark gets a full snapshot first. Deleted
+records are written with the status "deleted".
+"""
+import csv
+
+from sqlalchemy import select, func, delete
+from sqlalchemy.dialects.sqlite import insert
+
+from ..models import (
+    Session, Student, Attendance, AttendanceChange, ExportWatermark, get_settings, run_write
+)
+from .exporter import open_output
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_CONSUMER = "default"
+CHANGES_HEADER = ("Student ID", "Student", "Date", "Status")
+DELETED = "deleted"
+
+
+def _snapshot_rows(session, chunk_size):
+    query = select(
+        Attendance.student_id, Student.name, Attendance.date, Attendance.status
+    ).join(
+        Student, Student.id == Attendance.student_id
+    ).order_by(
+        Attendance.student_id, Attendance.date
+    ).execution_options(yield_per=chunk_size)
+    return session.execute(query)
+
+
+def _changed_rows(session, since, until, chunk_size):
+    """Yield the latest change to each (student, date) in (since, until], in seq order."""
+    latest = select(
+        func.max(AttendanceChange.seq).label("seq")
+    ).where(
+        AttendanceChange.seq > since, AttendanceChange.seq <= until
+    ).group_by(
+        AttendanceChange.student_id, AttendanceChange.date
+    ).subquery()
+    query = select(
+        AttendanceChange.student_id, Student.name, AttendanceChange.date, AttendanceChange.status
+    ).join(
+        latest, latest.c.seq == AttendanceChange.seq
+    ).outerjoin(
+        Student, Student.id == AttendanceChange.student_id
+    ).order_by(
+        AttendanceChange.seq
+    ).execution_options(yield_per=chunk_size)
+    for student_id, name, date_str, status in session.execute(query):
+        yield student_id, name or "", date_str, status or DELETED
+
+
+def get_watermark(session, consumer=DEFAULT_CONSUMER):
+    """Return the last seq exported to consumer, or None if it has none."""
+    return session.execute(
+        select(ExportWatermark.seq).where(ExportWatermark.consumer == consumer)
+    ).scalar()
+
+
+def _set_watermark(session, consumer, seq):
+    statement = insert(ExportWatermark).values(consumer=consumer, seq=seq)
+    session.execute(statement.on_conflict_do_update(
+        index_elements=[ExportWatermark.consumer],
+        set_={"seq": statement.excluded.seq, "exported_at": func.current_timestamp()},
+    ))
+
+
+def export_changes(path, consumer=DEFAULT_CONSUMER, since=None, compress=None,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write the records changed since consumer's watermark to a CSV file or stdout.
+
+    since overrides the stored watermark for this run. Without either, the
+    whole table is written. The rows are read in one snapshot without
+    locking out writers; once the file is written, the watermark is moved
+    to the last change included in a separate models.run_write transaction,
+    which waits for and retries a locked database. A failed export, or
+    WriteConflict from that update, means the same changes are exported
+    again next time. Returns a dict with the row count, the since and until
+    sequence numbers and whether it was a full snapshot; no file is
+    created when nothing changed.
+    """
+    if get_settings()["storage"] != "rows":
+        raise ValueError("incremental export needs storage = rows; "
+                         "the change log only tracks the attendance table")
+
+    session = Session()
+    try:
+        # The first read starts the transaction, so until and the rows
+        # below come from the same snapshot of the database.
+        until = session.execute(select(func.max(AttendanceChange.seq))).scalar() or 0
+        stored = get_watermark(session, consumer)
+        # After a prune the log can be empty while the watermark is not
+        until = max(until, stored or 0)
+        if since is None:
+            since = stored
+        if since is not None and since > until:
+            raise ValueError(f"watermark {since} is ahead of the change log (last change {until})")
+
+        full = since is None
+        rows = iter(_snapshot_rows(session, chunk_size) if full
+                    else _changed_rows(session, since, until, chunk_size))
+        count = 0
+        first = next(rows, None)
+        if first is not None:
+            with open_output(path, compress) as f:
+                writer = csv.writer(f)
+                writer.writerow(CHANGES_HEADER)
+                writer.writerow(first)
+                count += 1
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+    finally:
+        session.close()
+
+    run_write(lambda session: _set_watermark(session, consumer, until))
+    return {"rows": count, "since": since, "until": until, "full": full}
+
+
+def prune_changes(session):
+    """Delete change log entries every consumer has already exported.
+
+    Returns the number of entries deleted. Nothing is pruned until at
+    least one consumer has a watermark. seq values are never reused.
+    """
+    low = session.execute(select(func.min(ExportWatermark.seq))).scalar()
+    if low is None:
+        return 0
+    return session.execute(delete(AttendanceChange).where(AttendanceChange.seq <= low)).rowcount
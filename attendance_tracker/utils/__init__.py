@@ -1 +1,4 @@
-from .helpers import validate_date, format_date, validate_name
\ No newline at end of file
+from .helpers import (
+    validate_date, validate_month, format_date, validate_name, parse_student_range, parse_id_list,
+    STATUS_CODES, STATUS_NAMES, JULIAN_EPOCH, date_to_day, day_to_date, percentile
+)
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 def validate_date(date_str, allow_empty=True):
     """Validate date string format and return datetime object."""
@@ -13,6 +13,14 @@ def validate_date(date_str, allow_empty=True):
     except ValueError:
         return None, "Invalid date format. Please use YYYY-MM-DD."
 
+def validate_month(month_str):
+    """Validate a YYYY-MM month string."""
+    try:
+        datetime.strptime(month_str, "%Y-%m")
+    except ValueError:
+        return None, "Invalid month format. Please use YYYY-MM."
+    return month_str, None
+
 def format_date(date_obj):
     """Format date object to string."""
     return date_obj.strftime("%Y-%m-%d")
@@ -21,4 +29,61 @@ def validate_name(name):
     """Validate student name."""
     if not name or not all(c.isalpha() or c.isspace() for c in name):
         return False, "Invalid name. Use alphabetic characters and spaces only."
-    return True, None
\ No newline at end of file
+    return True, None
+
+def parse_student_range(range_str):
+    """Parse a student range such as '10-50' (IDs) or 'A-M' (names).
+
+    Returns (name_range, id_range, error); either end of a range may be
+    left empty, e.g. 'M-' or '-100'.
+    """
+    if not range_str:
+        return None, None, None
+    if "-" not in range_str:
+        return None, None, "Invalid range. Use FROM-TO, e.g. 1-100 or A-M."
+
+    low, high = (part.strip() for part in range_str.split("-", 1))
+    if all(part.isdigit() or not part for part in (low, high)):
+        return None, (int(low) if low else None, int(high) if high else None), None
+    if all(c.isalpha() or c.isspace() for c in low + high):
+        return (low or None, high or None), None, None
+    return None, None, "Invalid range. Use FROM-TO, e.g. 1-100 or A-M."
+
+
+def parse_id_list(ids_str):
+    """Parse a comma- or space-separated list of student IDs."""
+    ids = set()
+    for part in ids_str.replace(",", " ").split():
+        if not part.isdigit():
+            return None, f"Invalid student ID '{part}'. Use numbers only."
+        ids.add(int(part))
+    return ids, None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+# Compact encodings for the bitmap backend, columnar export and analytics:
+# attendance dates as day numbers since the Unix epoch and statuses as
+# small integers.
+EPOCH = datetime(1970, 1, 1).date()
+# julianday() of 1970-01-01, so julianday(date) - JULIAN_EPOCH in SQL is the
+# same day number that date_to_day computes in Python.
+JULIAN_EPOCH = 2440587.5
+STATUS_CODES = {"absent": 0, "present": 1}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+
+
+def date_to_day(date_value):
+    """Convert a date object or YYYY-MM-DD string to a day number."""
+    if isinstance(date_value, str):
+        date_value = datetime.strptime(date_value, "%Y-%m-%d").date()
+    return (date_value - EPOCH).days
+
+
+def day_to_date(day):
+    """Convert a day number back to a YYYY-MM-DD string."""
+    return format_date(EPOCH + timedelta(days=day))
@@ -0,0 +1,212 @@
+"""Group commit for single attendance marks from many threads.
+
+Kiosks check students in one at a time, and with one transaction per mark
+every check-in waits for SQLite's write lock and a disk sync. WriteBuffer
+queues marks in memory and a background thread writes them in batches,
+one transaction per batch. The thread takes up to max_batch marks as soon
+as it is free, after lingering until the oldest has waited max_delay
+seconds if fewer are queued; marks that arrive while a batch is being
+written make up the next one, so batches grow with the load. Each caller
+gets a Future that resolves to True when its record was written, or False
+when one already existed for that student and date (or an earlier mark in
+the same batch claimed it).
+
+    buffer = WriteBuffer()
+    marked = buffer.mark(student_id, "2025-05-30", "present")
+    ...
+    buffer.close()   # writes whatever is still queued
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+
+from .models import Session, begin_write, run_write, WriteConflict
+from .storage import attendance_backend
+from .utils import percentile
+
+DEFAULT_MAX_BATCH = 500
+DEFAULT_MAX_DELAY = 0.0    # seconds
+STATS_WINDOW = 1000        # flushes kept for the size and latency percentiles
+
+
+class WriteBufferClosed(RuntimeError):
+    """Raised when a mark is submitted after close()."""
+
+
+class WriteBuffer:
+    """Thread-safe queue of attendance marks written in batched transactions."""
+
+    def __init__(self, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY, session_factory=Session):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._session_factory = session_factory
+        self._wakeup = threading.Condition()
+        # (record, overwrite, future, queued_at)
+        self._pending = []
+        self._flush_now = False
+        self._closed = False
+
+        self.flushes = 0
+        self.records = 0
+        self.conflicts = 0
+        self.failures = 0
+        self._sizes = deque(maxlen=STATS_WINDOW)
+        self._flush_ms = deque(maxlen=STATS_WINDOW)
+        self._wait_ms = deque(maxlen=STATS_WINDOW)
+
+        self._thread = threading.Thread(target=self._run, name="attendance-write-buffer", daemon=True)
+        self._thread.start()
+
+    def submit(self, student_id, date_str, status, overwrite=False):
+        """Queue one validated mark; returns a Future of whether it was written."""
+        future = Future()
+        with self._wakeup:
+            if self._closed:
+                raise WriteBufferClosed("write buffer is closed")
+            self._pending.append(((student_id, date_str, status), overwrite, future, time.perf_counter()))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._wakeup.notify()
+        return future
+
+    def mark(self, student_id, date_str, status, overwrite=False, timeout=None):
+        """Queue one mark and wait for its batch; returns True if it was written."""
+        return self.submit(student_id, date_str, status, overwrite).result(timeout)
+
+    def flush(self):
+        """Write everything queued so far and wait for it."""
+        with self._wakeup:
+            futures = [future for _, _, future, _ in self._pending]
+            self._flush_now = True
+            self._wakeup.notify()
+        wait(futures)
+
+    def close(self, timeout=None):
+        """Stop accepting marks, write the ones still queued and stop the thread."""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if not self._pending:
+                    return
+                deadline = self._pending[0][3] + self.max_delay
+                while len(self._pending) < self.max_batch and not (self._closed or self._flush_now):
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                if not self._pending:
+                    self._flush_now = False
+            self._write(batch)
+
+    def _write(self, batch):
+        """Write a batch in one transaction and resolve its futures.
+
+        If the transaction fails, every mark is retried in a transaction
+        of its own, so one bad record only fails its own caller.
+        """
+        started = time.perf_counter()
+        try:
+            results = self._commit([(record, overwrite) for record, overwrite, _, _ in batch])
+        except Exception as e:
+            # Retrying one by one cannot help when the database stays locked
+            if len(batch) == 1 or isinstance(e, WriteConflict):
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                with self._wakeup:
+                    self.failures += len(batch)
+                return
+            for item in batch:
+                self._write([item])
+            return
+        finished = time.perf_counter()
+
+        for (_, _, future, _), marked in zip(batch, results):
+            future.set_result(marked)
+        with self._wakeup:
+            self.flushes += 1
+            self.records += len(batch)
+            self.conflicts += results.count(False)
+            self._sizes.append(len(batch))
+            self._flush_ms.append((finished - started) * 1000)
+            self._wait_ms.extend((finished - queued_at) * 1000 for _, _, _, queued_at in batch)
+
+    def _commit(self, items):
+        """Mark each (record, overwrite) in one transaction; returns whether each was written.
+
+        Marks are deduplicated in memory, where a later mark without
+        overwrite loses to any earlier one for the same student and date,
+        and the rest are written with one executemany per overwrite mode.
+        Only if the database refuses some of them is the batch redone one
+        mark at a time to find out which. The transaction is retried while
+        the database is locked by another process (see models.run_write).
+        """
+        return run_write(lambda session: self._mark_batch(session, items),
+                         session_factory=self._session_factory)
+
+    def _mark_batch(self, session, items):
+        backend = attendance_backend()
+        seen = set()
+        results = []
+        keep, replace = [], []
+        for record, overwrite in items:
+            key = record[:2]
+            if overwrite:
+                replace.append(record)
+                results.append(True)
+            elif key in seen:
+                results.append(False)
+            else:
+                keep.append(record)
+                results.append(True)
+            seen.add(key)
+
+        marked, _ = backend.mark_records(session, keep)
+        if marked == len(keep):
+            backend.mark_records(session, replace, overwrite=True)
+            return results
+
+        session.rollback()
+        begin_write(session)
+        results = []
+        for record, overwrite in items:
+            marked, _ = backend.mark_records(session, [record], overwrite)
+            results.append(bool(marked))
+        return results
+
+    def stats(self):
+        """Return flush counts, batch sizes and latencies in milliseconds.
+
+        flush_*_ms is the time to write and commit one batch; wait_*_ms is
+        the time from submitting a mark to its result, over the last
+        STATS_WINDOW marks.
+        """
+        with self._wakeup:
+            sizes = sorted(self._sizes)
+            flush_ms = sorted(self._flush_ms)
+            wait_ms = sorted(self._wait_ms)
+            stats = {
+                "flushes": self.flushes,
+                "records": self.records,
+                "conflicts": self.conflicts,
+                "failures": self.failures,
+                "pending": len(self._pending),
+            }
+        if sizes:
+            stats.update({
+                "batch_mean": round(sum(sizes) / len(sizes), 1),
+                "batch_max": sizes[-1],
+                "flush_p50_ms": round(percentile(flush_ms, 50), 3),
+                "flush_p99_ms": round(percentile(flush_ms, 99), 3),
+                "wait_p50_ms": round(percentile(wait_ms, 50), 3),
+                "wait_p99_ms": round(percentile(wait_ms, 99), 3),
+            })
+        return stats
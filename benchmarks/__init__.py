@@ -0,0 +1,6 @@
+"""Benchmarks for the attendance tracker.
+
+python -m benchmarks runs every interactive command against synthetic
+databases and writes the timings to JSON; see benchmarks/__main__.py.
+The bench_*.py scripts measure individual features.
+"""
@@ -0,0 +1,116 @@
+"""Benchmark every interactive command against synthetic databases.
+
+Run from the repository root:
+    python -m benchmarks --students 1000 10000 --days 365 --json results.json
+    python -m benchmarks --students 1000 --compare results.json
+
+Each size gets its own temporary SQLite file. Commands are driven through
+patched input()/print(), so the timings cover the real command code
+without terminal output. SQL statements per command are counted through
+attendance_tracker.profiling.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import sqlalchemy
+
+from .synthetic import build_database
+from .commands import command_cases, time_command
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, days, repeat, selected, keep_dir=None):
+    """Build each dataset, time the selected commands and return the results."""
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "days": days,
+            "repeat": repeat,
+        },
+        "datasets": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = keep_dir or tmp
+        for students in sizes:
+            path = os.path.join(workdir, f"bench_{students}x{days}.db")
+            print(f"Building {students} students x {days} days...", flush=True)
+            dataset = build_database(path, students, days)
+            print(f"  {dataset['rows']:,} rows, {dataset['db_bytes'] / 2**20:.1f} MiB "
+                  f"in {dataset['build_seconds']:.1f}s", flush=True)
+
+            timings = {}
+            for name, (func, answers) in command_cases(dataset, workdir).items():
+                if selected and name not in selected:
+                    continue
+                timings[name] = time_command(func, answers, repeat)
+                print(f"  {name:22} {timings[name]['median_seconds'] * 1000:10.1f} ms "
+                      f"{timings[name]['queries']:6} queries", flush=True)
+
+            dataset["commands"] = timings
+            results["datasets"].append(dataset)
+    return results
+
+
+def compare(results, baseline):
+    """Print the change in median time against an earlier results file."""
+    old = {(d["students"], d["days"]): d["commands"] for d in baseline["datasets"]}
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for dataset in results["datasets"]:
+        previous = old.get((dataset["students"], dataset["days"]))
+        if not previous:
+            continue
+        print(f"  {dataset['students']} students x {dataset['days']} days")
+        for name, timing in dataset["commands"].items():
+            if name not in previous:
+                continue
+            before = previous[name]["median_seconds"]
+            after = timing["median_seconds"]
+            change = (after - before) / before if before else 0
+            print(f"    {name:22} {before * 1000:10.1f} -> {after * 1000:10.1f} ms ({change:+.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000],
+                        help="roster sizes to generate (default: 1000 10000)")
+    parser.add_argument("--days", type=int, default=365, help="school days per student (default: 365)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per command (default: 3)")
+    parser.add_argument("--commands", nargs="+", help="only run these commands")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="compare against an earlier results file")
+    parser.add_argument("--keep", help="build databases in this directory and keep them")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.students, args.days, args.repeat, args.commands, args.keep)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Compare the attendance row table with the bitmap backend.
+
+Run from the repository root: python benchmarks/bench_bitmap.py [students] [days]
+Builds a synthetic database in a temporary directory, migrates a copy to
+attendance_bitmap, and reports file sizes and the time to count present
+and absent days per student with each backend.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from attendance_tracker.storage import attendance_backend
+from attendance_tracker.storage.bitmap import migrate_to_bitmap
+from benchmarks.synthetic import build_database
+
+
+def shrink(path, keep):
+    """Drop every attendance table except keep, then VACUUM."""
+    conn = sqlite3.connect(path)
+    for table in ("attendance", "attendance_monthly", "attendance_bitmap", "attendance_compact"):
+        if table != keep:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def time_counts(path, backend, repeat=3):
+    """Return the best time in milliseconds for attendance_counts()."""
+    engine = create_engine(f"sqlite:///{path}")
+    best = float("inf")
+    with Session(engine) as session:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            counts = attendance_backend(backend).attendance_counts(session)
+            best = min(best, time.perf_counter() - started)
+    engine.dispose()
+    return best * 1000, sum(present for present, _ in counts.values())
+
+
+def main(students=2000, days=365):
+    with tempfile.TemporaryDirectory() as tmp:
+        rows_path = os.path.join(tmp, "rows.db")
+        bitmap_path = os.path.join(tmp, "bitmap.db")
+
+        dataset = build_database(rows_path, students, days)
+        shutil.copy(rows_path, bitmap_path)
+
+        engine = create_engine(f"sqlite:///{bitmap_path}")
+        started = time.perf_counter()
+        copied, _ = migrate_to_bitmap(engine)
+        engine.dispose()
+        print(f"Migrated {copied} rows in {time.perf_counter() - started:.2f}s")
+
+        rows_size = shrink(rows_path, "attendance")
+        bitmap_size = shrink(bitmap_path, "attendance_bitmap")
+        print(f"File size: rows {rows_size / 2**20:.1f} MiB, "
+              f"bitmap {bitmap_size / 2**20:.2f} MiB ({rows_size / bitmap_size:.0f}x smaller)")
+
+        rows_ms, rows_present = time_counts(rows_path, "rows")
+        bitmap_ms, bitmap_present = time_counts(bitmap_path, "bitmap")
+        assert rows_present == bitmap_present, "backends disagree"
+        print(f"Counts for {dataset['students']} students: rows {rows_ms:.1f} ms, "
+              f"bitmap {bitmap_ms:.1f} ms ({rows_ms / bitmap_ms:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
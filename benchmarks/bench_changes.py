@@ -0,0 +1,81 @@
+"""Compare incremental (change log) exports with full exports.
+
+Run from the repository root:
+    python benchmarks/bench_changes.py [--students N] [--days N] [--changed N ...]
+
+Builds a synthetic database, takes the first full snapshot, then for each
+count re-marks that many records and times the incremental export. Also
+times mark_all for one new day with and without the change triggers.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import build_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--changed", type=int, nargs="+", default=[100, 5000, 50000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "changes.db")
+        dataset = build_database(path, args.students, args.days)
+        os.environ["ATTENDANCE_URL"] = f"sqlite:///{path}"
+
+        from sqlalchemy import text
+        from attendance_tracker.marking import mark_all, mark_records
+        from attendance_tracker.models import Session, get_engine
+        from attendance_tracker.models.changes import CHANGE_TRIGGERS
+        from attendance_tracker.transfer import export_attendance, export_changes
+
+        out = os.path.join(tmp, "out.csv")
+        print(f"{dataset['rows']:,} rows")
+        started = time.perf_counter()
+        export_attendance(out)
+        print(f"  full export_attendance        {time.perf_counter() - started:7.3f}s")
+        started = time.perf_counter()
+        export_changes(out)
+        print(f"  first export_changes (full)   {time.perf_counter() - started:7.3f}s")
+
+        day = dataset["last_day"]
+        for changed in args.changed:
+            records = [(student_id % args.students + 1, day, "absent" if round_ % 2 else "present")
+                       for round_, student_id in enumerate(range(changed))]
+            session = Session()
+            try:
+                mark_records(session, records, overwrite=True)
+                session.commit()
+            finally:
+                session.close()
+            started = time.perf_counter()
+            result = export_changes(out)
+            print(f"  export_changes, {changed:6} changes  {time.perf_counter() - started:7.3f}s "
+                  f"({result['rows']} rows)")
+
+        for label, install in (("with triggers", True), ("without", False)):
+            with get_engine().begin() as conn:
+                for name in ("insert", "update", "delete"):
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS attendance_changes_{name}"))
+                if install:
+                    for trigger in CHANGE_TRIGGERS:
+                        conn.execute(text(trigger))
+            session = Session()
+            try:
+                started = time.perf_counter()
+                mark_all(session, f"2099-01-0{1 if install else 2}")
+                session.commit()
+            finally:
+                session.close()
+            print(f"  mark_all {label:14}      {time.perf_counter() - started:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
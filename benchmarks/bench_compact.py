@@ -0,0 +1,105 @@
+"""Compare the attendance row table with the compact backend.
+
+Run from the repository root: python benchmarks/bench_compact.py [students] [days]
+Builds a synthetic database in a temporary directory, migrates a copy to
+attendance_compact, and reports file sizes and query times with each
+backend: one student's month of records, present and absent counts per
+student, and the (student, day, status) stream that the NumPy matrix and
+columnar export read.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from attendance_tracker.models import Attendance
+from attendance_tracker.storage import attendance_backend
+from attendance_tracker.storage.compact import migrate_to_compact
+from benchmarks.synthetic import build_database
+
+
+def shrink(path, keep):
+    """Drop every attendance table except keep, then VACUUM."""
+    conn = sqlite3.connect(path)
+    for table in ("attendance", "attendance_monthly", "attendance_bitmap", "attendance_compact"):
+        if table != keep:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def time_query(path, query, repeat):
+    """Return (best time in milliseconds, result) of query(session) over repeat runs."""
+    engine = create_engine(f"sqlite:///{path}")
+    best = float("inf")
+    with Session(engine) as session:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = query(session)
+            best = min(best, time.perf_counter() - started)
+    engine.dispose()
+    return best * 1000, result
+
+
+def main(students=2000, days=365):
+    with tempfile.TemporaryDirectory() as tmp:
+        rows_path = os.path.join(tmp, "rows.db")
+        compact_path = os.path.join(tmp, "compact.db")
+
+        dataset = build_database(rows_path, students, days)
+        shutil.copy(rows_path, compact_path)
+
+        engine = create_engine(f"sqlite:///{compact_path}")
+        started = time.perf_counter()
+        copied, _ = migrate_to_compact(engine)
+        engine.dispose()
+        print(f"Migrated {copied} rows in {time.perf_counter() - started:.2f}s")
+
+        # A month of the middle student's records, from the first recorded date
+        engine = create_engine(f"sqlite:///{rows_path}")
+        with Session(engine) as session:
+            first = session.execute(select(Attendance.date).order_by(Attendance.date).limit(1)).scalar()
+        engine.dispose()
+        month = (first, first[:8] + "28")
+        student = dataset["students"] // 2
+
+        rows_size = shrink(rows_path, "attendance")
+        compact_size = shrink(compact_path, "attendance_compact")
+        print(f"File size: rows {rows_size / 2**20:.1f} MiB, "
+              f"compact {compact_size / 2**20:.1f} MiB ({compact_size / rows_size:.0%})")
+
+        queries = {
+            "one student, one month": (
+                lambda backend: lambda session: attendance_backend(backend).attendance_page(
+                    session, 100, student, *month),
+                200,
+            ),
+            "counts per student": (
+                lambda backend: lambda session: attendance_backend(backend).attendance_counts(session),
+                3,
+            ),
+            "day records for analytics": (
+                lambda backend: lambda session: sum(
+                    status for _, _, status in attendance_backend(backend).iter_day_records(session)),
+                3,
+            ),
+        }
+        for label, (query, repeat) in queries.items():
+            rows_ms, rows_result = time_query(rows_path, query("rows"), repeat)
+            compact_ms, compact_result = time_query(compact_path, query("compact"), repeat)
+            assert rows_result == compact_result, "backends disagree"
+            print(f"{label}: rows {rows_ms:.3f} ms, compact {compact_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
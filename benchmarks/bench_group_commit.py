@@ -0,0 +1,97 @@
+"""Compare one commit per check-in with the group-commit WriteBuffer.
+
+Run from the repository root:
+    python benchmarks/bench_group_commit.py [--students N] [--threads N] [--synchronous FULL] [--batch-ms 5]
+
+Each of --threads threads marks its share of the roster for one day, one
+student at a time, first with a transaction per mark and then through a
+WriteBuffer. Every student is submitted twice in the buffered run, so half
+the marks must come back as conflicts.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import build_database
+
+
+def run_threads(threads, students, mark):
+    """Run mark(student_id) for every student across threads; returns (seconds, results)."""
+    results = []
+    lock = threading.Lock()
+
+    def worker(ids):
+        marked = [mark(student_id) for student_id in ids]
+        with lock:
+            results.extend(marked)
+
+    workers = [threading.Thread(target=worker, args=(range(start, students + 1, threads),))
+               for start in range(1, threads + 1)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLite synchronous pragma (default: NORMAL)")
+    parser.add_argument("--batch-ms", type=float, default=None, help="WriteBuffer max_delay in milliseconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkins.db")
+        build_database(path, args.students, 1)
+        os.environ["ATTENDANCE_URL"] = f"sqlite:///{path}"
+        os.environ["ATTENDANCE_SYNCHRONOUS"] = args.synchronous
+
+        from attendance_tracker.marking import mark_records
+        from attendance_tracker.models import Session, configure_engine
+        from attendance_tracker.write_buffer import WriteBuffer, DEFAULT_MAX_DELAY
+
+        configure_engine(pool_size=args.threads + 1, max_overflow=0)
+
+        def mark_directly(student_id):
+            session = Session()
+            try:
+                marked, _ = mark_records(session, [(student_id, "2099-01-01", "present")])
+                session.commit()
+            finally:
+                session.close()
+            return bool(marked)
+
+        seconds, results = run_threads(args.threads, args.students, mark_directly)
+        print(f"{args.students} check-ins from {args.threads} threads, synchronous={args.synchronous}")
+        print(f"  commit per mark   {seconds:6.2f}s  {args.students / seconds:8,.0f} marks/s  "
+              f"({results.count(True)} written)")
+
+        buffer = WriteBuffer(max_delay=DEFAULT_MAX_DELAY if args.batch_ms is None else args.batch_ms / 1000)
+
+        def mark_buffered(student_id):
+            first = buffer.submit(student_id, "2099-01-02", "present")
+            second = buffer.submit(student_id, "2099-01-02", "absent")
+            return first.result(), second.result()
+
+        seconds, results = run_threads(args.threads, args.students, mark_buffered)
+        buffer.close()
+        stats = buffer.stats()
+        written = sum(first for first, _ in results)
+        duplicates = sum(not second for _, second in results)
+        print(f"  group commit      {seconds:6.2f}s  {args.students * 2 / seconds:8,.0f} marks/s  "
+              f"({written} written, {duplicates} duplicates refused)")
+        print(f"    {stats['flushes']} flushes, mean batch {stats['batch_mean']}, max {stats['batch_max']}, "
+              f"flush p50 {stats['flush_p50_ms']} ms, wait p50 {stats['wait_p50_ms']} ms / "
+              f"p99 {stats['wait_p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Time the NumPy attendance matrix: loading and vectorized queries.
+
+Run from the repository root:
+    python benchmarks/bench_matrix.py [--students N] [--days N] [--load-students N]
+
+Queries run on a random students x days matrix built in memory (50000 x 400
+by default). Loading is timed separately on a synthetic SQLite database
+with --load-students rows, since building a 20-million-row file takes
+minutes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from attendance_tracker.reports.matrix import AttendanceMatrix, load_matrix
+from attendance_tracker.utils import STATUS_CODES
+
+QUERIES = {
+    "rates": lambda m: m.rates(),
+    "weekday_rates": lambda m: m.weekday_rates(),
+    "longest absence streak": lambda m: m.longest_streak("absent"),
+    "rolling 20-day absences": lambda m: m.rolling_counts(20, "absent"),
+    "absent 3 of last 10 days": lambda m: m.absent_in_last(3, 10),
+    "below 90% rate": lambda m: m.below_rate(0.9),
+}
+
+
+def random_matrix(students, days, absent_share=0.08, seed=1):
+    """Return an AttendanceMatrix with random absences on weekdays."""
+    rng = np.random.default_rng(seed)
+    absent = rng.random((students, days)) < absent_share
+    codes = np.where(absent, STATUS_CODES["absent"], STATUS_CODES["present"]).astype(np.int8)
+    calendar = np.arange(19723, 19723 + days * 7 // 5 + 7)
+    weekdays = calendar[(calendar + 3) % 7 < 5][:days]
+    return AttendanceMatrix(codes, np.arange(1, students + 1), weekdays)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def time_load(students, days):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from benchmarks.synthetic import build_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "matrix.db")
+        dataset = build_database(path, students, days)
+        engine = create_engine(f"sqlite:///{path}")
+        with Session(engine) as session:
+            started = time.perf_counter()
+            matrix = load_matrix(session)
+            elapsed = time.perf_counter() - started
+        engine.dispose()
+    print(f"load_matrix: {dataset['rows']:,} rows into {matrix.shape} in {elapsed * 1000:.0f} ms "
+          f"({dataset['rows'] / elapsed:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--load-students", type=int, default=5000,
+                        help="students in the database used to time loading (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    matrix = random_matrix(args.students, args.days)
+    print(f"Matrix {matrix.shape}, {matrix.codes.nbytes / 2**20:.1f} MiB")
+    total = 0
+    for label, query in QUERIES.items():
+        elapsed = best_of(lambda: query(matrix), args.repeat)
+        total += elapsed
+        print(f"  {label:28} {elapsed:8.1f} ms")
+    print(f"  {'all queries':28} {total:8.1f} ms")
+
+    if args.load_students:
+        time_load(args.load_students, args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measure how the parallel report runner scales with worker processes.
+
+Run from the repository root:
+    python benchmarks/bench_reports.py [--students N] [--days N] [--workers 1 2 4 8]
+
+Builds a synthetic database, times the serial CSV export once, then times
+run_reports() for each worker count.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import build_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--by", default="students")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reports.db")
+        dataset = build_database(path, args.students, args.days)
+        os.environ["ATTENDANCE_URL"] = f"sqlite:///{path}"
+
+        from attendance_tracker.models import Session
+        from attendance_tracker.reports import run_reports
+        from attendance_tracker.transfer import export_attendance
+
+        started = time.perf_counter()
+        export_attendance(os.path.join(tmp, "serial.csv"))
+        serial = time.perf_counter() - started
+        print(f"{dataset['rows']:,} rows, {os.cpu_count()} CPUs")
+        print(f"  serial export_attendance   {serial:6.2f}s")
+
+        for workers in args.workers:
+            session = Session()
+            try:
+                result = run_reports(session, os.path.join(tmp, f"out{workers}"), args.by, workers)
+            finally:
+                session.close()
+            print(f"  run_reports {workers:2} workers     {result['elapsed']:6.2f}s "
+                  f"({result['rows'] / result['elapsed']:,.0f} rows/s, {result['partitions']} partitions)")
+
+
+if __name__ == "__main__":
+    main()
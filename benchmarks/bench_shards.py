@@ -0,0 +1,76 @@
+"""Compare concurrent writers on one database file with term shards.
+
+Run from the repository root:
+    python benchmarks/bench_shards.py [--students N] [--writers N] [--days N]
+
+Each writer process marks the whole roster for --days dates of its own
+term, one models.run_write transaction per date, as the commands do. With
+storage = rows every writer shares the single file's write lock; with
+storage = sharded each term has its own file and lock. The slowest
+transaction shows how long a writer waited behind other terms.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def writer(url, storage, term, days):
+    """Mark every student for days dates in term; returns the slowest transaction's seconds."""
+    os.environ["ATTENDANCE_URL"] = url
+    os.environ["ATTENDANCE_STORAGE"] = storage
+    from attendance_tracker.models import run_write
+    from attendance_tracker.storage import attendance_backend
+
+    backend = attendance_backend()
+    slowest = 0.0
+    for offset in range(days):
+        date_str = (date(term, 1, 1) + timedelta(days=offset)).isoformat()
+        started = time.perf_counter()
+        run_write(lambda session: backend.mark_all(session, date_str))
+        slowest = max(slowest, time.perf_counter() - started)
+    return slowest
+
+
+def run(storage, students, writers, days, tmp):
+    from sqlalchemy import create_engine, insert
+    from attendance_tracker.models import Student, create_schema
+
+    path = os.path.join(tmp, f"{storage}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    create_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Student.__table__), [{"name": f"Student {i}"} for i in range(students)])
+    engine.dispose()
+
+    url = f"sqlite:///{path}"
+    terms = [2020 + i for i in range(writers)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(writers) as pool:
+        slowest = max(pool.map(writer, [url] * writers, [storage] * writers, terms, [days] * writers))
+    elapsed = time.perf_counter() - started
+    rows = students * writers * days
+    print(f"{storage:8} {writers} writers: {elapsed:6.2f}s, {rows / elapsed:10,.0f} rows/s, "
+          f"slowest transaction {slowest * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--days", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for storage in ("rows", "sharded"):
+            run(storage, args.students, args.writers, args.days, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measure startup cost: cold package import and a first batch command.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs N] [--json results.json]
+
+Each measurement starts a fresh interpreter, so it includes module import,
+engine creation and the schema check. With --json the medians are written
+to a file that can be compared between commits.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "python startup": ["-c", "pass"],
+    "import attendance_tracker": ["-c", "import attendance_tracker"],
+    "batch --help": ["-m", "attendance_tracker", "--help"],
+    "batch stats (first command)": ["-m", "attendance_tracker", "stats", "--lowest", "0"],
+    "batch mark": ["-m", "attendance_tracker", "mark", "--ids", "1", "--date", "2024-01-01",
+                   "--overwrite"],
+}
+
+
+def time_run(args, env):
+    """Return wall time in milliseconds for one interpreter run."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="write median timings to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   PYTHONPATH=ROOT,
+                   ATTENDANCE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        subprocess.run([sys.executable, "-m", "attendance_tracker", "import", "-"],
+                       input="name\nAnn Lee\n", text=True, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+        results = {}
+        for label, case_args in CASES.items():
+            times = [time_run(case_args, env) for _ in range(args.runs)]
+            results[label] = round(statistics.median(times), 1)
+            print(f"{label:30} median {results[label]:7.1f} ms  min {min(times):7.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "startup", "runs": args.runs, "median_ms": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Time the interactive commands with scripted input and silenced output."""
+import builtins
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from attendance_tracker import profiling
+from attendance_tracker.cli import commands
+
+from .synthetic import synthetic_name
+
+
+class _Script:
+    """Replacement for input() that returns prepared answers in order."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+
+    def __call__(self, prompt=""):
+        # Stop paging and other open-ended prompts once the script runs out
+        return self.answers.pop(0) if self.answers else "q"
+
+
+@contextmanager
+def scripted(answers):
+    """Patch input() and print() for one command; yields the print counter."""
+    lines = [0]
+
+    def quiet_print(*args, **kwargs):
+        lines[0] += 1
+
+    saved = builtins.input, builtins.print
+    builtins.input, builtins.print = _Script(answers), quiet_print
+    try:
+        yield lines
+    finally:
+        builtins.input, builtins.print = saved
+
+
+def command_cases(dataset, workdir):
+    """Return {name: (function, answers_for_run)} for a built dataset.
+
+    answers_for_run takes the run number so write commands can use a
+    fresh student or date each time.
+    """
+    students = dataset["students"]
+    before_first = date.fromisoformat(dataset["first_day"]) - timedelta(days=1)
+    roster = os.path.join(workdir, "new_roster.csv")
+    with open(roster, "w") as f:
+        f.write("name\n")
+        f.writelines(f"Bench Import {chr(ord('a') + i % 26)}{chr(ord('a') + i // 26 % 26)}\n"
+                     for i in range(500))
+
+    return {
+        "list_students": (commands.list_students, lambda run: []),
+        "mark_attendance": (
+            commands.mark_attendance,
+            lambda run: [str(run % students + 1), before_first.isoformat(), "present"],
+        ),
+        "mark_attendance_by_name": (
+            commands.mark_attendance,
+            lambda run: [synthetic_name(students - run % students),
+                         (before_first - timedelta(days=1)).isoformat(), "present"],
+        ),
+        "mark_all_present": (
+            commands.mark_all_present,
+            lambda run: [(before_first - timedelta(days=run + 1)).isoformat(), "1, 2, 3", "y"],
+        ),
+        "view_attendance": (commands.view_attendance, lambda run: ["50", "", "q"]),
+        "show_statistics": (commands.show_statistics, lambda run: [dataset["last_day"][:7]]),
+        "export_to_csv": (
+            commands.export_to_csv,
+            lambda run: [os.path.join(workdir, "export.csv")],
+        ),
+        "check_database": (commands.check_database, lambda run: []),
+        "view_database_tables": (commands.view_database_tables, lambda run: ["", "", "q", "q"]),
+        "import_students": (commands.import_students, lambda run: [roster]),
+    }
+
+
+def time_command(func, answers_for_run, repeat):
+    """Run a command repeat times; return median/min seconds, printed lines and queries."""
+    profiling.enable(slow_query_ms=0)
+    times = []
+    lines = queries = 0
+    for run in range(repeat):
+        with scripted(answers_for_run(run)) as printed, \
+                profiling.track(func.__name__, report=False) as stats:
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        lines = printed[0]
+        queries = stats.queries
+    return {
+        "median_seconds": round(statistics.median(times), 6),
+        "min_seconds": round(min(times), 6),
+        "runs": repeat,
+        "printed_lines": lines,
+        "queries": queries,
+    }
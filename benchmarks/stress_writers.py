@@ -0,0 +1,110 @@
+"""Check that concurrent writer processes do not lose attendance marks.
+
+Run from the repository root:
+    python benchmarks/stress_writers.py [--writers 8] [--marks 300] [--busy-timeout 50]
+
+Each writer process marks --marks students for a date of its own, one
+transaction per mark, reading the roster count first like the interactive
+commands do. "retrying" writes through models.run_write (BEGIN IMMEDIATE,
+busy timeout and jittered retries); "plain" uses a deferred transaction
+and gives up on the first error, as mark_attendance used to. The stored
+rows are then counted, so any lost write shows up in the last column.
+A short --busy-timeout makes lock contention more likely.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import build_database
+
+
+def writer(mode, writer_id, marks):
+    """Mark students 1..marks for this writer's date; returns (written, failed, attempts)."""
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import OperationalError
+
+    from attendance_tracker.marking import mark_records
+    from attendance_tracker.models import Session, Student, run_write, WriteConflict
+
+    date_str = (date(2099, 1, 1) + timedelta(days=writer_id)).isoformat()
+    written = failed = attempts = 0
+
+    def new_session():
+        nonlocal attempts
+        attempts += 1
+        return Session()
+
+    def work(session, student_id):
+        session.execute(select(func.count(Student.id))).scalar()
+        return mark_records(session, [(student_id, date_str, "present")])[0]
+
+    for student_id in range(1, marks + 1):
+        if mode == "retrying":
+            try:
+                written += run_write(lambda session: work(session, student_id), session_factory=new_session)
+            except WriteConflict:
+                failed += 1
+            continue
+        session = new_session()
+        try:
+            written += work(session, student_id)
+            session.commit()
+        except OperationalError:
+            session.rollback()
+            failed += 1
+        finally:
+            session.close()
+    return written, failed, attempts
+
+
+def run(mode, writers, marks, path):
+    from attendance_tracker.models import get_engine
+    from sqlalchemy import text
+
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM attendance WHERE date >= '2099-01-01'"))
+    started = time.perf_counter()
+    with Pool(writers) as pool:
+        results = pool.starmap(writer, [(mode, number, marks) for number in range(writers)])
+    elapsed = time.perf_counter() - started
+    with get_engine().connect() as conn:
+        stored = conn.execute(text("SELECT COUNT(*) FROM attendance WHERE date >= '2099-01-01'")).scalar()
+
+    expected = writers * marks
+    failed = sum(result[1] for result in results)
+    retries = sum(result[2] for result in results) - expected
+    print(f"  {mode:9} {elapsed:6.2f}s  {expected:6} marks  {stored:6} stored  "
+          f"{failed:5} failed  {retries:5} retried  {expected - stored:5} lost")
+    return expected - stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--marks", type=int, default=300, help="marks per writer")
+    parser.add_argument("--busy-timeout", type=int, default=50, help="milliseconds (default: 50)")
+    parser.add_argument("--modes", nargs="+", choices=("retrying", "plain"), default=["retrying", "plain"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.db")
+        build_database(path, args.marks, 1)
+        # Worker processes inherit these and build their own engines
+        os.environ["ATTENDANCE_URL"] = f"sqlite:///{path}"
+        os.environ["ATTENDANCE_BUSY_TIMEOUT"] = str(args.busy_timeout)
+        from attendance_tracker.models import configure_engine
+        configure_engine()
+
+        print(f"{args.writers} writer processes, busy_timeout {args.busy_timeout} ms")
+        lost = {mode: run(mode, args.writers, args.marks, path) for mode in args.modes}
+    return 1 if lost.get("retrying") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Generate synthetic attendance databases of a given size."""
+import os
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from attendance_tracker.models import Base, configure_engine, create_schema, get_engine
+
+FIRST_NAMES = ("Ann", "Bob", "Cara", "Dan", "Eve", "Finn", "Gus", "Hana", "Ivy", "Jon",
+               "Kim", "Lee", "Max", "Nia", "Omar", "Pia", "Quin", "Rae", "Sam", "Tia")
+
+
+def synthetic_name(index):
+    """Return a unique alphabetic name for a student index."""
+    letters = []
+    n = index
+    while True:
+        n, rem = divmod(n, 26)
+        letters.append(chr(ord("a") + rem))
+        if not n:
+            break
+    return f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {''.join(letters).title()}"
+
+
+def school_days(count, end=None):
+    """Return count weekdays ending a week before end (default: today)."""
+    day = (end or date.today()) - timedelta(days=7)
+    days = []
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def build_database(path, students, days, absent_every=13, batch=50000):
+    """Create a database at path with students x days attendance records.
+
+    Rows are written with raw executemany and journaling off, then the
+    summary table and triggers are installed in one pass. The package
+    engine is pointed at the new file. Returns build statistics.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    started = time.perf_counter()
+
+    configure_engine(url=f"sqlite:///{path}")
+    Base.metadata.create_all(get_engine())
+    get_engine().dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executemany("INSERT INTO students (id, name) VALUES (?, ?)",
+                     ((i, synthetic_name(i)) for i in range(1, students + 1)))
+    dates = school_days(days)
+    rows = []
+    for student_id in range(1, students + 1):
+        for offset, day in enumerate(dates):
+            status = "absent" if (student_id * 7 + offset) % absent_every == 0 else "present"
+            rows.append((student_id, day, status))
+        if len(rows) >= batch:
+            conn.executemany("INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)", rows)
+            rows = []
+    if rows:
+        conn.executemany("INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    create_schema(force=True)
+    return {
+        "students": students,
+        "days": days,
+        "rows": students * days,
+        "first_day": dates[0],
+        "last_day": dates[-1],
+        "build_seconds": round(time.perf_counter() - started, 3),
+        "db_bytes": os.path.getsize(path),
+    }
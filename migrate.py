@@ -1,63 +1,145 @@
-import sqlite3
+import argparse
 import os
-from attendance_tracker.models import Session, Base, engine, Student, Attendance
+import sqlite3
+import sys
+import time
+from urllib.parse import quote
+
+from sqlalchemy import insert, text
+
+from attendance_tracker.models import Base, Student, Attendance, configure_engine, get_engine
+
+CHUNK_SIZE = 10000
+
+# Tables to copy, in dependency order, with the columns to read.
+TABLES = (
+    (Student.__table__, ("id", "name")),
+    (Attendance.__table__, ("id", "student_id", "date", "status")),
+)
+
+CHECKPOINT_DDL = """
+    CREATE TABLE IF NOT EXISTS migration_checkpoints (
+        source TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        last_id INTEGER NOT NULL,
+        PRIMARY KEY (source, table_name)
+    )
+"""
+
+def read_checkpoint(conn, source, table_name):
+    """Return the last id copied for a table, or 0 if none."""
+    last_id = conn.execute(
+        text("SELECT last_id FROM migration_checkpoints WHERE source = :source AND table_name = :table"),
+        {"source": source, "table": table_name}
+    ).scalar()
+    return last_id or 0
+
+def write_checkpoint(conn, source, table_name, last_id):
+    """Record the last id copied for a table."""
+    conn.execute(
+        text("INSERT OR REPLACE INTO migration_checkpoints (source, table_name, last_id) "
+             "VALUES (:source, :table, :last_id)"),
+        {"source": source, "table": table_name, "last_id": last_id}
+    )
+
+def copy_table(old_cursor, engine, source, table, columns, chunk_size, restart):
+    """Copy one table in primary key order, committing a checkpoint per chunk."""
+    column_list = ", ".join(columns)
+    total = old_cursor.execute(f"SELECT COUNT(*) FROM {table.name}").fetchone()[0]
+
+    with engine.begin() as conn:
+        if restart:
+            write_checkpoint(conn, source, table.name, 0)
+        last_id = read_checkpoint(conn, source, table.name)
+
+    done = old_cursor.execute(
+        f"SELECT COUNT(*) FROM {table.name} WHERE id <= ?", (last_id,)
+    ).fetchone()[0]
+    if done:
+        print(f"Resuming {table.name} after id {last_id} ({done} of {total} rows already copied)")
+
+    insert_stmt = insert(table).prefix_with("OR IGNORE")
+    started = time.perf_counter()
+    copied = 0
+
+    while True:
+        rows = old_cursor.execute(
+            f"SELECT {column_list} FROM {table.name} WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            break
+
+        last_id = rows[-1][0]
+        with engine.begin() as conn:
+            conn.execute(insert_stmt, [dict(zip(columns, row)) for row in rows])
+            write_checkpoint(conn, source, table.name, last_id)
+
+        copied += len(rows)
+        elapsed = time.perf_counter() - started
+        rate = copied / elapsed if elapsed else 0
+        sys.stdout.write(f"\r{table.name}: {done + copied}/{total} rows ({rate:,.0f} rows/s)")
+        sys.stdout.flush()
+
+    if copied:
+        print()
+    print(f"Migrated {done + copied} {table.name} rows.")
+
+def migrate_data(source_path, dest_url=None, chunk_size=CHUNK_SIZE, restart=False):
+    """Copy students and attendance from an old database into the package database.
+
+    Rows are streamed in primary key order and inserted in chunks, skipping
+    rows that already exist. Each chunk commits together with a checkpoint,
+    so an interrupted run picks up where it stopped.
+    """
+    if dest_url:
+        configure_engine(url=dest_url)
+    engine = get_engine()
+
+    source = os.path.abspath(source_path)
+    dest = engine.url.database
+    if dest and os.path.abspath(dest) == source:
+        print("Source and destination must be different databases.")
+        return
+    if not os.path.exists(source):
+        print(f"Source database not found: {source}")
+        return
 
-def migrate_data():
-    """Migrate data from old SQLite database to new SQLAlchemy structure."""
-    # Initialize the new database
     Base.metadata.create_all(engine)
-    
-    # Connect to the old database
-    old_conn = sqlite3.connect("attendance.db")
+    with engine.begin() as conn:
+        conn.execute(text(CHECKPOINT_DDL))
+
+    # Open the source read-only so a mistake can never modify it
+    old_conn = sqlite3.connect(f"file:{quote(os.path.abspath(source))}?mode=ro", uri=True)
     old_cursor = old_conn.cursor()
-    
-    # Create a session for the new database
-    session = Session()
-    
+
     try:
-        # Migrate students
-        print("Migrating students...")
-        old_cursor.execute("SELECT id, name FROM students")
-        students = old_cursor.fetchall()
-        
-        for student_id, name in students:
-            # Check if student already exists
-            existing = session.query(Student).filter_by(id=student_id).first()
-            if not existing:
-                student = Student(id=student_id, name=name)
-                session.add(student)
-        
-        session.commit()
-        print(f"Migrated {len(students)} students.")
-        
-        # Migrate attendance records
-        print("Migrating attendance records...")
-        old_cursor.execute("SELECT id, student_id, date, status FROM attendance")
-        records = old_cursor.fetchall()
-        
-        for record_id, student_id, date, status in records:
-            # Check if record already exists
-            existing = session.query(Attendance).filter_by(id=record_id).first()
-            if not existing:
-                attendance = Attendance(
-                    id=record_id,
-                    student_id=student_id,
-                    date=date,
-                    status=status
-                )
-                session.add(attendance)
-        
-        session.commit()
-        print(f"Migrated {len(records)} attendance records.")
-        
+        for table, columns in TABLES:
+            copy_table(old_cursor, engine, source, table, columns, chunk_size, restart)
         print("Migration complete!")
+    except KeyboardInterrupt:
+        print("\nMigration interrupted. Run the same command again to resume.")
     except Exception as e:
-        session.rollback()
-        print(f"Error during migration: {e}")
+        print(f"\nError during migration: {e}")
+        print("Completed chunks were kept. Run the same command again to resume.")
     finally:
-        # Close connections
         old_conn.close()
-        session.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Copy data from an old attendance database into the package database."
+    )
+    parser.add_argument("source", help="path of the old SQLite database")
+    parser.add_argument("dest", nargs="?",
+                        help="path of the destination database (default: the configured database)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"rows per transaction (default: {CHUNK_SIZE})")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore saved checkpoints and start from the beginning")
+    args = parser.parse_args()
+
+    dest_url = f"sqlite:///{os.path.abspath(args.dest)}" if args.dest else None
+    migrate_data(args.source, dest_url, args.chunk_size, args.restart)
 
 if __name__ == "__main__":
-    migrate_data()
\ No newline at end of file
+    main()
@@ -0,0 +1,15 @@
+from attendance_tracker.storage.bitmap import migrate_to_bitmap
+
+def main():
+    """Copy attendance records into the attendance_bitmap table."""
+    print("Copying attendance records to the bitmap layout...")
+    copied, skipped = migrate_to_bitmap()
+    print(f"Copied {copied} attendance records.")
+    
+    if skipped:
+        print(f"Skipped {skipped} records with an invalid date or status.")
+    
+    print("Migration complete! Set storage = bitmap to use it.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from attendance_tracker.storage.compact import migrate_to_compact
+
+def main():
+    """Copy attendance records into the compact attendance_compact table."""
+    print("Copying attendance records to the compact layout...")
+    copied, skipped = migrate_to_compact()
+    print(f"Copied {copied} attendance records.")
+    
+    if skipped:
+        print(f"Skipped {skipped} records with an invalid date or status.")
+    
+    print("Migration complete! Set storage = compact to use it.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from attendance_tracker.storage.sharded import migrate_to_shards, get_router
+
+def main():
+    """Copy attendance records into one shard file per term."""
+    print("Copying attendance records to term shards...")
+    copied = migrate_to_shards()
+    
+    for term, count in copied.items():
+        print(f"  {term}: {count} records -> {get_router().path(term)}")
+    print(f"Copied {sum(copied.values())} attendance records.")
+    
+    print("Migration complete! Set storage = sharded to use it.")
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,67 @@
-import sqlite3
+"""Mark all students present for a date, except the listed absentees.
+
+Run from the repository root:
+    python other/mark_attendance_script.py 25/05/2025 1,3
+
+Uses the package database settings (ATTENDANCE_URL or attendance.ini) and
+replaces any attendance already recorded for the date.
+"""
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance_tracker.marking import mark_date
+from attendance_tracker.models import create_schema, run_write
+from attendance_tracker.roster import roster_cache
+from attendance_tracker.utils import parse_id_list
+
+
 def mark_all_students_present_with_exceptions(date_str, absent_student_ids):
     """
     Mark all students present for a specific date, except for specified students who will be marked absent.
     
     Args:
-        date_str: Date string in YYYY-MM-DD format
-        absent_student_ids: List of student IDs to mark as absent
+        date_str: Date string in DD/MM/YYYY format
+        absent_student_ids: Collection of student IDs to mark as absent
     """
-    conn = sqlite3.connect("../attendance.db")
-    cursor = conn.cursor()
-    
     # Validate date format
     try:
         attendance_date = datetime.strptime(date_str, "%d/%m/%Y").strftime("%Y-%m-%d")
     except ValueError:
         print("Invalid date format. Please use DD/MM/YYYY format.")
-        conn.close()
         return
     
-    # Get all student IDs
-    cursor.execute("SELECT id, name FROM students")
-    students = cursor.fetchall()
-    
-    if not students:
+    names = roster_cache.names()
+    if not names:
         print("No students found in the database.")
-        conn.close()
         return
     
-    # First, delete any existing attendance records for this date
-    cursor.execute("DELETE FROM attendance WHERE date = ?", (attendance_date,))
+    absent_student_ids = set(absent_student_ids)
+    _, _, unknown_ids = run_write(
+        lambda session: mark_date(session, attendance_date, absent_student_ids, overwrite=True)
+    )
     
-    # Mark attendance for all students
-    present_count = 0
     absent_count = 0
-    
-    for student_id, student_name in students:
-        status = "absent" if student_id in absent_student_ids else "present"
-        
-        cursor.execute(
-            "INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)",
-            (student_id, attendance_date, status)
-        )
-        
-        if status == "present":
-            present_count += 1
-        else:
-            absent_count += 1
-            print(f"Marked {student_name} (ID: {student_id}) as absent")
-    
-    conn.commit()
-    conn.close()
+    for student_id in sorted(absent_student_ids - set(unknown_ids)):
+        absent_count += 1
+        print(f"Marked {names[student_id]} (ID: {student_id}) as absent")
+    for student_id in unknown_ids:
+        print(f"Ignored unknown student ID {student_id}")
     
     print(f"\nAttendance for {date_str} (stored as {attendance_date}):")
-    print(f"- {present_count} students marked present")
+    print(f"- {len(names) - absent_count} students marked present")
     print(f"- {absent_count} students marked absent")
 
-# Mark all students present for 25/05/2025, except for two students (IDs 1 and 3)
-# who will be marked absent
-mark_all_students_present_with_exceptions("25/05/2025", [1, 3])
\ No newline at end of file
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python other/mark_attendance_script.py DD/MM/YYYY ABSENT_IDS")
+        sys.exit(2)
+    absent_ids, error = parse_id_list(sys.argv[2])
+    if error:
+        print(error)
+        sys.exit(2)
+    create_schema()
+    mark_all_students_present_with_exceptions(sys.argv[1], absent_ids)
@@ -14,4 +14,4 @@ pipenv install
 echo "Setup complete!"
 echo "To activate the virtual environment, run: pipenv shell"
 echo "Then run the application with: python run.py"
-echo "To migrate existing data, run: python migrate.py"
\ No newline at end of file
+echo "To migrate existing data, run: python migrate.py OLD_DB [NEW_DB]"
\ No newline at end of file
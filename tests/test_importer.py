@@ -0,0 +1,30 @@
+import sqlite3
+import threading
+
+from attendance_tracker.models import configure_engine, create_schema
+from attendance_tracker.transfer import import_roster
+
+
+def test_import_waits_for_a_concurrent_writer(tmp_path, monkeypatch):
+    database = tmp_path / "attendance.db"
+    monkeypatch.setenv("ATTENDANCE_URL", f"sqlite:///{database}")
+    configure_engine()
+    create_schema()
+    roster = tmp_path / "roster.csv"
+    roster.write_text("name\nAnn Lee\nBob Ray\n")
+
+    # Another writer holds the lock when the import starts and commits soon after
+    other = sqlite3.connect(database, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    other.execute("INSERT INTO students (name) VALUES ('Cara Moe')")
+    commit = threading.Timer(0.3, lambda: other.execute("COMMIT"))
+    commit.start()
+    try:
+        summary = import_roster(str(roster))
+    finally:
+        commit.join()
+        other.close()
+        configure_engine()
+
+    assert summary["imported"] == 2
+    assert summary["duplicates"] == []
@@ -0,0 +1,92 @@
+import pytest
+
+from attendance_tracker.models import Session, Student, configure_engine, create_schema, run_write
+from attendance_tracker.reports import (
+    daily_counts, load_matrix, monthly_totals, student_rates, table_counts
+)
+from attendance_tracker.storage import attendance_backend, sharded
+from attendance_tracker.storage.compact import migrate_to_compact
+
+
+@pytest.fixture(params=["rows", "bitmap", "compact", "sharded"])
+def storage(request, tmp_path, monkeypatch):
+    """Create an empty database using each storage backend in turn."""
+    monkeypatch.setenv("ATTENDANCE_URL", f"sqlite:///{tmp_path / 'attendance.db'}")
+    monkeypatch.setenv("ATTENDANCE_STORAGE", request.param)
+    monkeypatch.setattr(sharded, "_router", None)
+    configure_engine()
+    create_schema()
+    yield request.param
+    if sharded._router is not None:
+        sharded._router.dispose()
+    configure_engine()
+
+
+def _mark_sample():
+    """Two students, two dates in May and one in June, marked the way the commands do."""
+    def write(session):
+        session.add_all([Student(name="Ann Lee"), Student(name="Bob Ray")])
+        session.flush()
+        backend = attendance_backend()
+        backend.mark_all(session, "2025-05-30", {2})
+        backend.mark_records(session, [(1, "2025-05-29", "absent"), (2, "2025-06-02", "present")])
+    run_write(write)
+
+
+def test_reports_count_the_configured_storage(storage):
+    _mark_sample()
+    session = Session()
+    try:
+        assert table_counts(session) == (2, 4)
+        assert monthly_totals(session) == [("2025-05", 1, 2, 1 / 3), ("2025-06", 1, 0, 1.0)]
+        assert daily_counts(session, "2025-05", "2025-05") == [("2025-05-29", 0, 1), ("2025-05-30", 1, 1)]
+        assert student_rates(session, "2025-05", "2025-05") == [
+            (2, "Bob Ray", 0, 1, 0.0), (1, "Ann Lee", 1, 1, 0.5)
+        ]
+        assert student_rates(session, limit=1) == [(1, "Ann Lee", 1, 1, 0.5)]
+    finally:
+        session.close()
+
+
+def test_matrix_loads_the_configured_storage(storage):
+    pytest.importorskip("numpy")
+    _mark_sample()
+    session = Session()
+    try:
+        matrix = load_matrix(session)
+        may = load_matrix(session, "2025-05-01", "2025-05-31")
+    finally:
+        session.close()
+    assert matrix.dates() == ["2025-05-29", "2025-05-30", "2025-06-02"]
+    assert matrix.counts()[0].tolist() == [1, 1]
+    assert matrix.counts()[1].tolist() == [1, 1]
+    assert may.dates() == ["2025-05-29", "2025-05-30"]
+    assert may.absent_in_last(1, 2).tolist() == [1, 2]
+
+
+def test_compact_migration_keeps_the_reports(tmp_path, monkeypatch):
+    monkeypatch.setenv("ATTENDANCE_URL", f"sqlite:///{tmp_path / 'attendance.db'}")
+    monkeypatch.setenv("ATTENDANCE_STORAGE", "rows")
+    configure_engine()
+    create_schema()
+    _mark_sample()
+    session = Session()
+    try:
+        before = (table_counts(session), monthly_totals(session), student_rates(session))
+    finally:
+        session.close()
+
+    assert migrate_to_compact() == (4, 0)
+    # Running it again leaves the copy as it was
+    assert migrate_to_compact() == (4, 0)
+    monkeypatch.setenv("ATTENDANCE_STORAGE", "compact")
+    configure_engine()
+    session = Session()
+    try:
+        assert (table_counts(session), monthly_totals(session), student_rates(session)) == before
+        assert attendance_backend().attendance_page(session, 2, after=(1, "~")) == [
+            (2, "2025-05-30", "absent"), (2, "2025-06-02", "present")
+        ]
+    finally:
+        session.close()
+        configure_engine()
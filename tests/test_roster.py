@@ -0,0 +1,22 @@
+from attendance_tracker.models import Student, configure_engine, create_schema, run_write
+from attendance_tracker.roster import roster_cache
+
+
+def _roster_database(path, names):
+    """Point the engine at a new database holding names."""
+    configure_engine(url=f"sqlite:///{path}")
+    create_schema()
+    run_write(lambda session: session.add_all(Student(name=name) for name in names))
+
+
+def test_switching_databases_reloads_the_roster(tmp_path):
+    roster_cache.invalidate()
+    try:
+        # One insert each, so both roster_version counters are equal
+        _roster_database(tmp_path / "first.db", ["Ann Lee"])
+        assert roster_cache.names() == {1: "Ann Lee"}
+        _roster_database(tmp_path / "second.db", ["Bob Ray"])
+        assert roster_cache.names() == {1: "Bob Ray"}
+    finally:
+        configure_engine()
+        roster_cache.invalidate()
@@ -0,0 +1,137 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from attendance_tracker import server as api
+from attendance_tracker.models import Session, configure_engine, run_write
+from attendance_tracker.roster import roster_cache
+from attendance_tracker.storage import attendance_backend, sharded
+
+
+@pytest.fixture
+def running_server(request, tmp_path, monkeypatch):
+    """Start a two-worker API server on a temporary database.
+
+    The storage setting is "rows" unless the test is parametrized
+    indirectly with another backend.
+    """
+    monkeypatch.setenv("ATTENDANCE_URL", f"sqlite:///{tmp_path / 'attendance.db'}")
+    monkeypatch.setenv("ATTENDANCE_STORAGE", getattr(request, "param", "rows"))
+    monkeypatch.setattr(sharded, "_router", None)
+    roster_cache.invalidate()
+    server = api.make_server(port=0, workers=2, quiet=True, idle_timeout=0.5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    if sharded._router is not None:
+        sharded._router.dispose()
+    configure_engine()
+
+
+def _request(server, method, path, body=None, headers=None, timeout=3):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=timeout)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
+
+def test_idle_connections_do_not_block_new_requests(running_server):
+    # One idle kept-alive connection per worker
+    idle = [socket.create_connection(("127.0.0.1", running_server.server_port)) for _ in range(2)]
+    try:
+        status, payload = _request(running_server, "GET", "/students")
+    finally:
+        for sock in idle:
+            sock.close()
+    assert status == 200
+    assert payload["total"] == 0
+
+
+def test_negative_content_length_is_rejected(running_server):
+    status, payload = _request(running_server, "POST", "/students", body=b"",
+                               headers={"Content-Length": "-1"})
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+
+
+@pytest.mark.parametrize("student_id", [True, False, "1", 1.0])
+def test_non_integer_student_id_is_rejected(running_server, student_id):
+    _request(running_server, "POST", "/students", body=json.dumps({"name": "Ann Lee"}))
+    body = json.dumps({"student_id": student_id, "date": "2025-05-30", "status": "present"})
+    status, _ = _request(running_server, "POST", "/attendance", body=body)
+    assert status == 400
+
+
+@pytest.mark.parametrize("running_server", ["rows", "bitmap", "compact", "sharded"], indirect=True)
+def test_api_and_commands_share_the_configured_storage(running_server):
+    _request(running_server, "POST", "/students", body=json.dumps({"names": ["Ann Lee", "Bob Ray"]}))
+    mark = {"student_id": 1, "date": "2024-12-31", "status": "absent"}
+    assert _request(running_server, "POST", "/attendance", body=json.dumps(mark))[0] == 200
+    # Marked the way the commands do
+    run_write(lambda session: attendance_backend().mark_all(session, "2025-01-02", {2}))
+
+    session = Session()
+    try:
+        assert attendance_backend().attendance_counts(session) == {1: (1, 1), 2: (0, 1)}
+    finally:
+        session.close()
+
+    status, payload = _request(running_server, "GET", "/attendance?limit=2")
+    assert status == 200
+    assert payload["records"] == [
+        {"student_id": 1, "date": "2024-12-31", "status": "absent"},
+        {"student_id": 1, "date": "2025-01-02", "status": "present"},
+    ]
+    status, payload = _request(running_server, "GET", "/attendance?after_id=1&after_date=2025-01-02")
+    assert payload == {"records": [{"student_id": 2, "date": "2025-01-02", "status": "absent"}],
+                       "next": None}
+    status, payload = _request(running_server, "GET", "/stats")
+    assert payload == {"months": [
+        {"month": "2024-12", "present": 0, "absent": 1, "rate": 0.0},
+        {"month": "2025-01", "present": 1, "absent": 1, "rate": 0.5},
+    ]}
+
+    conn = http.client.HTTPConnection("127.0.0.1", running_server.server_port, timeout=3)
+    conn.request("GET", "/export")
+    lines = conn.getresponse().read().decode("utf-8").splitlines()
+    conn.close()
+    assert lines[1:] == ["Ann Lee,2024-12-31,absent", "Ann Lee,2025-01-02,present",
+                         "Bob Ray,2025-01-02,absent"]
+
+
+@pytest.mark.parametrize("body", [{"names": "Bob"}, {"names": ["Bob Ray", 7]}, {"name": ["Bob Ray"]}])
+def test_names_must_be_strings(running_server, body):
+    status, _ = _request(running_server, "POST", "/students", body=json.dumps(body))
+    assert status == 400
+    assert _request(running_server, "GET", "/students")[1]["total"] == 0
+
+
+@pytest.mark.parametrize("path", ["/students?limit=0", "/students/search?q=a&limit=0",
+                                  "/attendance?limit=0"])
+def test_zero_limit_is_rejected(running_server, path):
+    status, payload = _request(running_server, "GET", path)
+    assert status == 400
+    assert "limit" in payload["error"]
+
+
+@pytest.mark.parametrize("overwrite", ["no", "false", 1, None])
+def test_overwrite_must_be_a_boolean(running_server, overwrite):
+    _request(running_server, "POST", "/students", body=json.dumps({"name": "Ann Lee"}))
+    mark = {"student_id": 1, "date": "2025-05-30", "status": "present"}
+    assert _request(running_server, "POST", "/attendance", body=json.dumps(mark))[0] == 200
+
+    absent = {**mark, "status": "absent", "overwrite": overwrite}
+    assert _request(running_server, "POST", "/attendance", body=json.dumps(absent))[0] == 400
+    bulk = {"date": "2025-05-30", "absent_ids": [1], "overwrite": overwrite}
+    assert _request(running_server, "POST", "/attendance/bulk", body=json.dumps(bulk))[0] == 400
+    records = _request(running_server, "GET", "/attendance")[1]["records"]
+    assert records == [{"student_id": 1, "date": "2025-05-30", "status": "present"}]
@@ -1,6 +1,12 @@
 import sqlite3
 import os
 from datetime import datetime
+from itertools import groupby
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from attendance_tracker.models import configure_engine, run_write, WriteConflict
 
 # ---------- Database Setup ----------
 def initialize_db():
@@ -28,6 +34,10 @@ def initialize_db():
     conn.commit()
     conn.close()
 
+    # Writes go through run_write, which retries while another program
+    # holds the lock, so point the shared engine at the same file
+    configure_engine(url="sqlite:///attendance.db")
+
 # ---------- List Students ----------
 def list_students():
     conn = sqlite3.connect("attendance.db")
@@ -53,17 +63,15 @@ def add_student():
         print("Invalid name. Use alphabetic characters and spaces only.")
         return
 
-    conn = sqlite3.connect("attendance.db")
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("INSERT INTO students (name) VALUES (?)", (name,))
-        conn.commit()
+        run_write(lambda session: session.execute(
+            text("INSERT INTO students (name) VALUES (:name)"), {"name": name}
+        ))
         print(f"Student '{name}' added.")
-    except sqlite3.IntegrityError:
+    except IntegrityError:
         print("This student already exists.")
-    finally:
-        conn.close()
+    except WriteConflict as e:
+        print(f"Student not added: {e}")
 
 # ---------- Mark Attendance ----------
 def mark_attendance():
@@ -110,67 +118,100 @@ def mark_attendance():
             return
 
     status = input("Status (present/absent): ").lower()
+    conn.close()
     if status not in ("present", "absent"):
         print("Invalid status. Use 'present' or 'absent'.")
-        conn.close()
         return
 
     try:
-        cursor.execute(
-            "INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)",
-            (student_id, str(attendance_date), status)
-        )
-        conn.commit()
+        run_write(lambda session: session.execute(
+            text("INSERT INTO attendance (student_id, date, status) VALUES (:student_id, :date, :status)"),
+            {"student_id": student_id, "date": str(attendance_date), "status": status}
+        ))
         print("Attendance marked.")
-    except sqlite3.IntegrityError:
+    except IntegrityError:
         print("Attendance already recorded for this date.")
-    finally:
-        conn.close()
+    except WriteConflict as e:
+        print(f"Attendance not saved: {e}")
 
 # ---------- View Attendance Records ----------
 def view_attendance():
+    page_input = input("Students per page [leave blank for 20]: ").strip()
+    try:
+        page_size = int(page_input) if page_input else 20
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        print("Invalid page size. Use a positive number.")
+        return
+
+    range_input = input("Student ID range (e.g. 1-100) [leave blank for all]: ").strip()
+    low_id, high_id = None, None
+    if range_input:
+        try:
+            low, high = (part.strip() for part in range_input.split("-", 1))
+            low_id = int(low) if low else None
+            high_id = int(high) if high else None
+        except ValueError:
+            print("Invalid range. Use FROM-TO, e.g. 1-100.")
+            return
+
     conn = sqlite3.connect("attendance.db")
     cursor = conn.cursor()
     
     print("\n===== ATTENDANCE RECORDS =====\n")
     
-    # Get list of all students
-    cursor.execute("SELECT id, name FROM students ORDER BY name")
-    students = cursor.fetchall()
-    
-    if not students:
-        print("No students in database.")
-        conn.close()
-        return
-    
-    # For each student, show their attendance
-    for student_id, student_name in students:
-        print(f"Student: {student_name} (ID: {student_id})")
-        
+    # One ordered join per page of students, grouped as it streams in,
+    # instead of one attendance query per student
+    last_name = ""
+    total_students = 0
+    total_records = 0
+    while True:
         cursor.execute("""
-            SELECT date, status FROM attendance 
-            WHERE student_id = ? 
-            ORDER BY date
-        """, (student_id,))
+            SELECT s.id, s.name, a.date, a.status
+            FROM (
+                SELECT id, name FROM students
+                WHERE name > ?
+                  AND (? IS NULL OR id >= ?)
+                  AND (? IS NULL OR id <= ?)
+                ORDER BY name
+                LIMIT ?
+            ) AS s
+            LEFT JOIN attendance a ON a.student_id = s.id
+            ORDER BY s.name, a.date
+        """, (last_name, low_id, low_id, high_id, high_id, page_size))
         
-        records = cursor.fetchall()
-        
-        if records:
-            print("  Date       | Status")
-            print("  -----------|--------")
-            for date, status in records:
-                print(f"  {date} | {status}")
-        else:
-            print("  No attendance records")
+        page_students = 0
+        for (student_id, student_name), records in groupby(cursor, key=lambda row: row[:2]):
+            print(f"Student: {student_name} (ID: {student_id})")
+            records = [(date, status) for _, _, date, status in records if date is not None]
+            if records:
+                print("  Date       | Status")
+                print("  -----------|--------")
+                for date, status in records:
+                    print(f"  {date} | {status}")
+                total_records += len(records)
+            else:
+                print("  No attendance records")
+            
+            print("")  # Empty line between students
+            page_students += 1
+            last_name = student_name
         
-        print("")  # Empty line between students
+        total_students += page_students
+        if page_students < page_size:
+            break
+        if input("Press Enter for the next page, or q to stop: ").strip().lower() == "q":
+            break
+    
+    conn.close()
+    
+    if not total_students:
+        print("No students in database.")
+        return
     
     # Show summary
-    cursor.execute("SELECT COUNT(*) FROM attendance")
-    total_records = cursor.fetchone()[0]
     print(f"Total attendance records: {total_records}")
-    
-    conn.close()
 
 # ---------- Check Database ----------
 def check_database():
@@ -224,10 +265,10 @@ def mark_all_present():
     # Check if there are any students
     cursor.execute("SELECT COUNT(*) FROM students")
     student_count = cursor.fetchone()[0]
+    conn.close()
     
     if student_count == 0:
         print("No students found. Add some first.")
-        conn.close()
         return
     
     # Get date
@@ -239,34 +280,23 @@ def mark_all_present():
             attendance_date = datetime.strptime(date_input, "%Y-%m-%d").date()
             if attendance_date > datetime.now().date():
                 print("Date can't be in the future.")
-                conn.close()
                 return
         except ValueError:
             print("Invalid date format.")
-            conn.close()
             return
     
-    # Get all student IDs
-    cursor.execute("SELECT id, name FROM students")
-    students = cursor.fetchall()
-    
-    # Mark all students present
-    marked_count = 0
-    skipped_count = 0
-    
-    for student_id, student_name in students:
-        try:
-            cursor.execute(
-                "INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)",
-                (student_id, str(attendance_date), "present")
-            )
-            marked_count += 1
-        except sqlite3.IntegrityError:
-            # Student already has attendance for this date
-            skipped_count += 1
-    
-    conn.commit()
-    conn.close()
+    # Mark all students present in one statement, skipping students who
+    # already have attendance for this date
+    try:
+        marked_count = run_write(lambda session: session.execute(text("""
+            INSERT INTO attendance (student_id, date, status)
+            SELECT id, :date, 'present' FROM students WHERE true
+            ON CONFLICT(student_id, date) DO NOTHING
+        """), {"date": str(attendance_date)}).rowcount)
+    except WriteConflict as e:
+        print(f"Attendance not saved: {e}")
+        return
+    skipped_count = student_count - marked_count
     
     print(f"\nMarked {marked_count} students present for {attendance_date}")
     if skipped_count > 0: